@@ -2,15 +2,17 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Callable
 from pathlib import Path
 
 import voluptuous as vol
 
 from homeassistant.components.http import StaticPathConfig
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, Platform
+from homeassistant.core import Event, HomeAssistant, ServiceCall, callback
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_track_time_change
 
 from .const import (
     DOMAIN,
@@ -29,6 +31,9 @@ _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.BINARY_SENSOR, Platform.BUTTON, Platform.SWITCH]
 
+# Heure de l'import incrémental nocturne (heures, minutes)
+NIGHTLY_IMPORT_TIME = (3, 15)
+
 # Schémas des services
 SERVICE_START_CYCLE_SCHEMA = vol.Schema(
     {
@@ -156,6 +161,26 @@ SERVICE_IMPORT_HISTORICAL_CYCLES_SCHEMA = vol.Schema(
         vol.Optional("period_end"): cv.string,
         vol.Optional("dry_run", default=False): cv.boolean,
         vol.Optional("replace_existing", default=False): cv.boolean,
+        vol.Optional("source", default="auto"): vol.In(["auto", "states", "statistics"]),
+        vol.Optional("incremental", default=False): cv.boolean,
+    }
+)
+
+SERVICE_BATCH_IMPORT_HISTORICAL_CYCLES_SCHEMA = vol.Schema(
+    {
+        vol.Optional("entity_id"): cv.entity_ids,
+        vol.Optional("period_start"): cv.string,
+        vol.Optional("period_end"): cv.string,
+        vol.Optional("dry_run", default=False): cv.boolean,
+        vol.Optional("replace_existing", default=False): cv.boolean,
+        vol.Optional("source", default="auto"): vol.In(["auto", "states", "statistics"]),
+        vol.Optional("incremental", default=False): cv.boolean,
+    }
+)
+
+SERVICE_CANCEL_IMPORT_SCHEMA = vol.Schema(
+    {
+        vol.Required("entity_id"): cv.entity_id,
     }
 )
 
@@ -209,6 +234,36 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.data[DOMAIN]["global_config"] = global_config
         _LOGGER.info("Global AI configuration manager initialized")
     
+    # Prix du kWh partagé par tous les appareils (entité suivie une seule fois)
+    if "price_service" not in hass.data[DOMAIN]:
+        from .price import PriceService
+        price_service = PriceService(hass)
+        price_service.async_configure(
+            hass.data[DOMAIN]["global_config"].get_global_price_config()
+        )
+        hass.data[DOMAIN]["price_service"] = price_service
+    
+    # Base compacte des cycles terminés, indépendante de la purge du Recorder
+    if "cycle_store" not in hass.data[DOMAIN]:
+        from .cycle_store import CycleStore
+        cycle_store = CycleStore(hass)
+        try:
+            await cycle_store.async_setup()
+        except Exception as err:
+            _LOGGER.error(
+                "Cycle store unavailable (%s), cycle history will use the Recorder only",
+                err,
+            )
+        else:
+            hass.data[DOMAIN]["cycle_store"] = cycle_store
+            
+            async def _async_close_cycle_store(_event: Event) -> None:
+                await cycle_store.async_close()
+            
+            hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_STOP, _async_close_cycle_store
+            )
+    
     # Initialize dashboard managers if not already done
     if "dashboard_config_manager" not in hass.data[DOMAIN]:
         from .dashboard_config import DashboardConfigManager
@@ -324,6 +379,21 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Stocker le coordinator
     hass.data[DOMAIN][entry.entry_id] = coordinator
     
+    # Rafraîchissement groupé de tous les appareils par le hub
+    if "hub" not in hass.data[DOMAIN]:
+        from .hub import SmartApplianceHub
+        hass.data[DOMAIN]["hub"] = SmartApplianceHub(hass)
+    entry.async_on_unload(hass.data[DOMAIN]["hub"].async_register(coordinator))
+    
+    # Suivi événementiel des capteurs (le polling ne sert plus que de garde-fou)
+    entry.async_on_unload(coordinator.async_stop_event_tracking)
+    if coordinator.event_driven:
+        coordinator.async_start_event_tracking()
+    
+    # Mise à jour de usage_allowed aux limites des plages autorisées
+    entry.async_on_unload(coordinator.async_stop_usage_schedule_tracking)
+    coordinator.async_track_usage_schedule()
+    
     # Charger les platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     
@@ -336,6 +406,17 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         await async_setup_services(hass)
         _LOGGER.info("Smart Appliance Monitor services registered (15 services including history)")
     
+    # Commandes websocket utilisées par les cartes Lovelace (une seule fois)
+    if "_websocket_registered" not in hass.data[DOMAIN]:
+        from .websocket_api import async_register_websocket_commands
+        async_register_websocket_commands(hass)
+        hass.data[DOMAIN]["_websocket_registered"] = True
+    
+    # Import incrémental nocturne des appareils qui l'ont activé (une seule fois)
+    if "_nightly_import_unsub" not in hass.data[DOMAIN]:
+        hass.data[DOMAIN]["_nightly_import_unsub"] = _async_setup_nightly_import(hass)
+    entry.async_on_unload(lambda: _async_stop_nightly_import(hass))
+    
     # Register frontend resources for custom Lovelace cards (once)
     if not hasattr(hass.data[DOMAIN], "_frontend_registered"):
         await _register_frontend_resources(hass)
@@ -385,11 +466,22 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        # Écrire l'état en attente avant un éventuel rechargement de l'entrée
+        await coordinator.async_shutdown()
     
     return unload_ok
 
 
+@callback
+def _async_reconfigure_price_service(hass: HomeAssistant) -> None:
+    """Apply the global price configuration to the shared price service."""
+    price_service = hass.data.get(DOMAIN, {}).get("price_service")
+    global_config = hass.data.get(DOMAIN, {}).get("global_config")
+    if price_service is not None and global_config is not None:
+        price_service.async_configure(global_config.get_global_price_config())
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry when options change."""
     await hass.config_entries.async_reload(entry.entry_id)
@@ -488,14 +580,15 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         
         # Force state to RUNNING (for testing purposes only)
         from .const import STATE_RUNNING, EVENT_CYCLE_STARTED
+        from .cycle_record import CycleRecord
         from datetime import datetime
         
         coordinator.state_machine.state = STATE_RUNNING
-        coordinator.state_machine.current_cycle = {
-            "start_time": datetime.now(),
-            "start_energy": coordinator.data.get("energy", 0),
-            "peak_power": coordinator.data.get("power", 0),
-        }
+        coordinator.state_machine.current_cycle = CycleRecord(
+            start_energy=coordinator.data.get("energy", 0),
+            peak_power=coordinator.data.get("power", 0),
+        )
+        coordinator.state_machine.current_cycle.start_time = datetime.now()
         
         await coordinator._handle_event(EVENT_CYCLE_STARTED)
         await coordinator.async_request_refresh()
@@ -827,6 +920,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                     updates["global_price_entity"] = price_entity
                 
                 await global_config.async_update(updates)
+                _async_reconfigure_price_service(hass)
                 
                 # Reload global config for all coordinators
                 for coord in coordinators:
@@ -1217,6 +1311,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         if updates:
             await global_config.async_update(updates)
             _LOGGER.info("Global configuration updated: %s", updates)
+            _async_reconfigure_price_service(hass)
             
             # Reload config for all coordinators
             for entry_id, coordinator in hass.data.get(DOMAIN, {}).items():
@@ -1380,7 +1475,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             f"{DOMAIN}_cycle_history",
             {
                 "appliance_name": coordinator.appliance_name,
-                "cycles": cycles,
+                "cycles": [cycle.as_dict() for cycle in cycles],
                 "statistics": stats,
             },
         )
@@ -1439,8 +1534,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
     
     async def handle_import_historical_cycles(call: ServiceCall) -> None:
         """Handle import_historical_cycles service call."""
-        from datetime import datetime
-        from .import_history import HistoricalCycleImporter
+        from datetime import datetime, timedelta
         from .history import CycleHistoryManager
         
         entity_id = call.data["entity_id"]
@@ -1448,12 +1542,22 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         period_end = call.data.get("period_end")
         dry_run = call.data.get("dry_run", False)
         replace_existing = call.data.get("replace_existing", False)
+        source = call.data.get("source", "auto")
+        incremental = call.data.get("incremental", False)
         
         coordinator = _get_coordinator_from_entity_id(hass, entity_id)
         if coordinator is None:
             _LOGGER.error("Unable to find coordinator for entity %s", entity_id)
             return
         
+        running_imports = hass.data[DOMAIN].setdefault("imports", {})
+        if coordinator.entry.entry_id in running_imports:
+            _LOGGER.warning(
+                "An import is already running for '%s'",
+                coordinator.appliance_name,
+            )
+            return
+        
         # Parse datetime strings
         if period_start:
             period_start = datetime.fromisoformat(period_start)
@@ -1463,16 +1567,26 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         # Check if cycles already exist in this period
         existing_cycles_count = 0
         if replace_existing:  # Vérifier aussi en dry-run pour informer l'utilisateur
-            history_manager = CycleHistoryManager(
-                hass,
-                coordinator.entry.entry_id,
-                coordinator.appliance_name,
-            )
-            existing_cycles = await history_manager.async_get_cycles(
-                period_start=period_start,
-                period_end=period_end,
-            )
-            existing_cycles_count = len(existing_cycles)
+            cycle_store = hass.data[DOMAIN].get("cycle_store")
+            if cycle_store is not None:
+                # Comptage indexé, sans relire l'historique
+                count_end = period_end or datetime.now()
+                existing_cycles_count = await cycle_store.async_count_cycles(
+                    coordinator.entry.entry_id,
+                    period_start or count_end - timedelta(days=30),
+                    count_end,
+                )
+            else:
+                history_manager = CycleHistoryManager(
+                    hass,
+                    coordinator.entry.entry_id,
+                    coordinator.appliance_name,
+                )
+                existing_cycles = await history_manager.async_get_cycles(
+                    period_start=period_start,
+                    period_end=period_end,
+                )
+                existing_cycles_count = len(existing_cycles)
             
             if existing_cycles_count > 0:
                 if not dry_run:
@@ -1497,27 +1611,21 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         )
         
         # Create importer
-        importer = HistoricalCycleImporter(
-            hass=hass,
-            appliance_id=coordinator.entry.entry_id,
-            appliance_name=coordinator.appliance_name,
-            appliance_type=coordinator.appliance_type,
-            power_sensor=coordinator.power_sensor,
-            energy_sensor=coordinator.energy_sensor,
-            start_threshold=coordinator.start_threshold,
-            stop_threshold=coordinator.stop_threshold,
-            start_delay=coordinator.start_delay,
-            stop_delay=coordinator.stop_delay,
-            price_kwh=coordinator.price_kwh,
-        )
+        importer = _create_history_importer(hass, coordinator)
         
-        # Import cycles
-        result = await importer.async_import_cycles(
-            period_start=period_start,
-            period_end=period_end,
-            dry_run=dry_run,
-            replace_existing=replace_existing,
-        )
+        # Import cycles (annulable via cancel_import)
+        running_imports[coordinator.entry.entry_id] = importer
+        try:
+            result = await importer.async_import_cycles(
+                period_start=period_start,
+                period_end=period_end,
+                dry_run=dry_run,
+                replace_existing=replace_existing,
+                source=source,
+                incremental=incremental,
+            )
+        finally:
+            running_imports.pop(coordinator.entry.entry_id, None)
         
         # Add info about replaced cycles
         if replace_existing and existing_cycles_count > 0:
@@ -1530,6 +1638,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 "appliance_name": coordinator.appliance_name,
                 "success": result["success"],
                 "cycles_detected": result["cycles_detected"],
+                "cancelled": result.get("cancelled", False),
                 "dry_run": dry_run,
             },
         )
@@ -1543,6 +1652,14 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 f"**Période**: {period_str}",
                 f"**Cycles détectés**: {result['cycles_detected']}",
             ]
+            if result.get("low_precision_cycles"):
+                message.append(
+                    f"**Cycles approximés** (statistiques long terme): {result['low_precision_cycles']}"
+                )
+            if result.get("cancelled"):
+                message.append(
+                    f"**⚠️ Import annulé** après le {result['processed_until'][:10]}"
+                )
             
             # Afficher les cycles existants même en dry-run
             if replace_existing:
@@ -1603,6 +1720,127 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             "dry-run" if dry_run else "saved",
         )
     
+    async def handle_batch_import_historical_cycles(call: ServiceCall) -> None:
+        """Handle batch_import_historical_cycles service call."""
+        from datetime import datetime
+        from .import_history import BatchCycleImporter
+        
+        period_start = call.data.get("period_start")
+        period_end = call.data.get("period_end")
+        dry_run = call.data.get("dry_run", False)
+        replace_existing = call.data.get("replace_existing", False)
+        source = call.data.get("source", "auto")
+        incremental = call.data.get("incremental", False)
+        
+        # Tous les appareils si aucune entité n'est indiquée
+        if call.data.get("entity_id"):
+            coordinators = [
+                coordinator
+                for entity_id in call.data["entity_id"]
+                if (coordinator := _get_coordinator_from_entity_id(hass, entity_id))
+            ]
+        else:
+            coordinators = [
+                coord for coord in hass.data.get(DOMAIN, {}).values()
+                if isinstance(coord, SmartApplianceCoordinator)
+            ]
+        
+        running_imports = hass.data[DOMAIN].setdefault("imports", {})
+        coordinators = list(
+            {coordinator.entry.entry_id: coordinator for coordinator in coordinators}.values()
+        )
+        busy = [c for c in coordinators if c.entry.entry_id in running_imports]
+        for coordinator in busy:
+            _LOGGER.warning(
+                "An import is already running for '%s', skipped from the batch",
+                coordinator.appliance_name,
+            )
+        coordinators = [c for c in coordinators if c not in busy]
+        if not coordinators:
+            _LOGGER.error("No appliance to import")
+            return
+        
+        if period_start:
+            period_start = datetime.fromisoformat(period_start)
+        if period_end:
+            period_end = datetime.fromisoformat(period_end)
+        
+        importers = [_create_history_importer(hass, coordinator) for coordinator in coordinators]
+        for importer in importers:
+            running_imports[importer.appliance_id] = importer
+        try:
+            results = await BatchCycleImporter(hass, importers).async_import_cycles(
+                period_start=period_start,
+                period_end=period_end,
+                dry_run=dry_run,
+                replace_existing=replace_existing,
+                source=source,
+                incremental=incremental,
+            )
+        finally:
+            for importer in importers:
+                running_imports.pop(importer.appliance_id, None)
+        
+        mode_str = "Analyse (dry-run)" if dry_run else ("Réimport" if replace_existing else "Import")
+        message = [f"**{mode_str} des cycles - {len(coordinators)} appareils**\n"]
+        for coordinator in coordinators:
+            result = results[coordinator.entry.entry_id]
+            hass.bus.async_fire(
+                f"{DOMAIN}_import_completed",
+                {
+                    "appliance_name": coordinator.appliance_name,
+                    "success": result["success"],
+                    "cycles_detected": result["cycles_detected"],
+                    "cancelled": result.get("cancelled", False),
+                    "dry_run": dry_run,
+                },
+            )
+            if not result["success"]:
+                message.append(
+                    f"- ❌ {coordinator.appliance_name}: {result.get('error', 'Unknown error')}"
+                )
+            else:
+                line = f"- {coordinator.appliance_name}: {result['cycles_detected']} cycles"
+                if result.get("cancelled"):
+                    line += f" (annulé après le {result['processed_until'][:10]})"
+                message.append(line)
+        
+        if dry_run:
+            message.append("\n⚠️ **Mode analyse**: Les cycles n'ont pas été sauvegardés.")
+        
+        await hass.services.async_call(
+            "persistent_notification",
+            "create",
+            {
+                "title": f"{'📊' if dry_run else '✅'} Import groupé",
+                "message": "\n".join(message),
+                "notification_id": "import_history_batch",
+            },
+        )
+        
+        _LOGGER.info(
+            "Batch historical import completed for %d appliances: %d cycles detected",
+            len(coordinators),
+            sum(result["cycles_detected"] for result in results.values()),
+        )
+    
+    async def handle_cancel_import(call: ServiceCall) -> None:
+        """Handle cancel_import service call."""
+        entity_id = call.data["entity_id"]
+        
+        coordinator = _get_coordinator_from_entity_id(hass, entity_id)
+        if coordinator is None:
+            _LOGGER.error("Unable to find coordinator for entity %s", entity_id)
+            return
+        
+        importer = hass.data[DOMAIN].get("imports", {}).get(coordinator.entry.entry_id)
+        if importer is None:
+            _LOGGER.warning("No import running for '%s'", coordinator.appliance_name)
+            return
+        
+        importer.cancel()
+        _LOGGER.info("Import cancellation requested for '%s'", coordinator.appliance_name)
+    
     async def handle_generate_dashboard_yaml(call: ServiceCall) -> None:
         """Handle generate_dashboard_yaml service call."""
         output_path = call.data.get("output_path")
@@ -1862,6 +2100,20 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         schema=SERVICE_IMPORT_HISTORICAL_CYCLES_SCHEMA,
     )
     
+    hass.services.async_register(
+        DOMAIN,
+        "batch_import_historical_cycles",
+        handle_batch_import_historical_cycles,
+        schema=SERVICE_BATCH_IMPORT_HISTORICAL_CYCLES_SCHEMA,
+    )
+    
+    hass.services.async_register(
+        DOMAIN,
+        "cancel_import",
+        handle_cancel_import,
+        schema=SERVICE_CANCEL_IMPORT_SCHEMA,
+    )
+    
     # Dashboard management services
     hass.services.async_register(
         DOMAIN,
@@ -1884,7 +2136,98 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         schema=SERVICE_TOGGLE_VIEW_SCHEMA,
     )
     
-    _LOGGER.info("Services Smart Appliance Monitor enregistrés (20 services)")
+    _LOGGER.info("Services Smart Appliance Monitor enregistrés (22 services)")
+
+
+@callback
+def _async_setup_nightly_import(hass: HomeAssistant) -> Callable[[], None]:
+    """Schedule the nightly incremental import of the appliances that enable it.
+    
+    The first run of an appliance, without watermark, reads the last 30 days.
+    Cycles overlapping a stored cycle (e.g. recorded live) are skipped by the
+    cycle store, so only the gaps of live monitoring are imported. Without the
+    cycle store nothing would be persisted and the same cycle events would be
+    fired every night, so the job does nothing.
+    """
+    
+    async def _async_nightly_import(_now) -> None:
+        from .import_history import BatchCycleImporter
+        
+        if hass.data[DOMAIN].get("cycle_store") is None:
+            _LOGGER.debug("Nightly import skipped: cycle store not available")
+            return
+        
+        running_imports = hass.data[DOMAIN].setdefault("imports", {})
+        coordinators = [
+            coord for coord in hass.data.get(DOMAIN, {}).values()
+            if isinstance(coord, SmartApplianceCoordinator)
+            and coord.nightly_import
+            and coord.entry.entry_id not in running_imports
+        ]
+        if not coordinators:
+            return
+        
+        # Chaque appareil reprend là où son dernier import s'est arrêté
+        importers = [_create_history_importer(hass, coordinator) for coordinator in coordinators]
+        for importer in importers:
+            running_imports[importer.appliance_id] = importer
+        try:
+            results = await BatchCycleImporter(hass, importers).async_import_cycles(
+                incremental=True
+            )
+        finally:
+            for importer in importers:
+                running_imports.pop(importer.appliance_id, None)
+        
+        _LOGGER.info(
+            "Nightly import completed for %d appliances: %d new cycles",
+            len(importers),
+            sum(result["cycles_detected"] for result in results.values()),
+        )
+    
+    return async_track_time_change(
+        hass,
+        _async_nightly_import,
+        hour=NIGHTLY_IMPORT_TIME[0],
+        minute=NIGHTLY_IMPORT_TIME[1],
+        second=0,
+    )
+
+
+@callback
+def _async_stop_nightly_import(hass: HomeAssistant) -> None:
+    """Remove the nightly import listener once the last appliance is unloaded."""
+    domain_data = hass.data.get(DOMAIN, {})
+    if any(
+        isinstance(coord, SmartApplianceCoordinator) for coord in domain_data.values()
+    ):
+        return
+    unsub = domain_data.pop("_nightly_import_unsub", None)
+    if unsub is not None:
+        unsub()
+
+
+def _create_history_importer(hass: HomeAssistant, coordinator: SmartApplianceCoordinator):
+    """Create the historical cycle importer of an appliance."""
+    from .import_history import HistoricalCycleImporter
+    
+    price_service = hass.data[DOMAIN].get("price_service")
+    return HistoricalCycleImporter(
+        hass=hass,
+        appliance_id=coordinator.entry.entry_id,
+        appliance_name=coordinator.appliance_name,
+        appliance_type=coordinator.appliance_type,
+        power_sensor=coordinator.power_sensor,
+        energy_sensor=coordinator.energy_sensor,
+        start_threshold=coordinator.start_threshold,
+        stop_threshold=coordinator.stop_threshold,
+        start_delay=coordinator.start_delay,
+        stop_delay=coordinator.stop_delay,
+        price_kwh=coordinator.price_kwh,
+        price_entity=price_service.price_entity if price_service else None,
+        alert_duration=coordinator.state_machine.alert_duration,
+        unplugged_timeout=coordinator.state_machine.unplugged_timeout,
+    )
 
 
 def _get_coordinator_from_entity_id(hass: HomeAssistant, entity_id: str) -> SmartApplianceCoordinator | None:
@@ -0,0 +1,208 @@
+"""Rolling cycle statistics for Smart Appliance Monitor anomaly detection."""
+from __future__ import annotations
+
+import bisect
+import math
+from collections import deque
+from collections.abc import Iterable
+from typing import Any
+
+# Minimum number of finished cycles before scoring a running cycle
+MIN_CYCLES_FOR_SCORING = 3
+
+# Number of recent finished cycles the baseline is computed over
+ANOMALY_WINDOW_CYCLES = 30
+
+
+class RunningStatistics:
+    """Mean, variance and quantiles of the last values of one metric.
+
+    Welford's update is applied when a value enters the window and reversed
+    when it leaves, and a sorted copy of the window gives exact quantiles.
+    """
+
+    def __init__(self, window: int = ANOMALY_WINDOW_CYCLES) -> None:
+        """Initialize empty statistics.
+
+        Args:
+            window: Number of most recent values kept
+        """
+        self.window = window
+        self._values: deque[float] = deque()
+        self._sorted: list[float] = []
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    @property
+    def count(self) -> int:
+        """Return the number of values in the window."""
+        return len(self._values)
+
+    @property
+    def variance(self) -> float:
+        """Return the population variance."""
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        """Return the population standard deviation."""
+        return math.sqrt(self.variance)
+
+    @property
+    def minimum(self) -> float | None:
+        """Return the smallest value in the window."""
+        return self._sorted[0] if self._sorted else None
+
+    @property
+    def maximum(self) -> float | None:
+        """Return the largest value in the window."""
+        return self._sorted[-1] if self._sorted else None
+
+    @property
+    def values(self) -> list[float]:
+        """Return the values in the window, oldest first."""
+        return list(self._values)
+
+    def quantile(self, quantile: float) -> float | None:
+        """Return a quantile of the window, or None when it is empty.
+
+        Args:
+            quantile: Quantile between 0 and 1
+        """
+        if not self._sorted:
+            return None
+        return self._sorted[round(quantile * (len(self._sorted) - 1))]
+
+    def add(self, value: float) -> None:
+        """Add an observation, dropping the oldest one when the window is full.
+
+        Args:
+            value: Observed value
+        """
+        if len(self._values) >= self.window:
+            self._remove(self._values.popleft())
+
+        self._values.append(value)
+        bisect.insort(self._sorted, value)
+
+        delta = value - self.mean
+        self.mean += delta / len(self._values)
+        self._m2 += delta * (value - self.mean)
+
+    def _remove(self, value: float) -> None:
+        """Reverse the update made when a value entered the window."""
+        del self._sorted[bisect.bisect_left(self._sorted, value)]
+
+        count = len(self._values)
+        if count == 0:
+            self.mean = 0.0
+            self._m2 = 0.0
+            return
+        delta = value - self.mean
+        self.mean -= delta / count
+        self._m2 = max(0.0, self._m2 - delta * (value - self.mean))
+
+
+class CycleStatistics:
+    """Statistics of the last finished cycles of one appliance.
+
+    Updated once per finished cycle, so scoring a running cycle does not
+    depend on the size of the cycle history. Only the last
+    ANOMALY_WINDOW_CYCLES cycles count, so the baseline follows the
+    appliance as its usage changes.
+    """
+
+    def __init__(self, window: int = ANOMALY_WINDOW_CYCLES) -> None:
+        """Initialize empty statistics.
+
+        Args:
+            window: Number of most recent cycles kept
+        """
+        self.duration = RunningStatistics(window)
+        self.energy = RunningStatistics(window)
+
+    @property
+    def count(self) -> int:
+        """Return the number of cycles in the window."""
+        return self.duration.count
+
+    def add_cycle(self, duration: float, energy: float) -> None:
+        """Record a finished cycle.
+
+        Args:
+            duration: Cycle duration in minutes
+            energy: Cycle energy in kWh
+        """
+        self.duration.add(duration)
+        self.energy.add(energy)
+
+    def score(self, duration: float, energy: float) -> float:
+        """Score how far a cycle deviates from the average cycle (0-100).
+
+        Args:
+            duration: Cycle duration in minutes
+            energy: Cycle energy in kWh
+
+        Returns:
+            Score, 0 while fewer than MIN_CYCLES_FOR_SCORING cycles are known
+        """
+        if self.count < MIN_CYCLES_FOR_SCORING:
+            return 0
+
+        avg_duration = self.duration.mean
+        avg_energy = self.energy.mean
+        duration_deviation = (
+            abs(duration - avg_duration) / avg_duration if avg_duration > 0 else 0
+        )
+        energy_deviation = (
+            abs(energy - avg_energy) / avg_energy if avg_energy > 0 else 0
+        )
+        return round(min(100, (duration_deviation + energy_deviation) * 50), 1)
+
+    def summary(self) -> dict[str, Any]:
+        """Return the statistics exposed as entity attributes."""
+        return {
+            "cycles_analyzed": self.count,
+            "avg_duration": round(self.duration.mean, 1),
+            "std_duration": round(self.duration.std, 1),
+            "median_duration": _rounded(self.duration.quantile(0.5), 1),
+            "p90_duration": _rounded(self.duration.quantile(0.9), 1),
+            "avg_energy": round(self.energy.mean, 3),
+            "std_energy": round(self.energy.std, 3),
+            "median_energy": _rounded(self.energy.quantile(0.5), 3),
+            "p90_energy": _rounded(self.energy.quantile(0.9), 3),
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serialisable representation."""
+        return {
+            "cycles": [
+                [duration, energy]
+                for duration, energy in zip(self.duration.values, self.energy.values)
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> CycleStatistics:
+        """Restore statistics saved with as_dict()."""
+        stats = cls()
+        for duration, energy in data["cycles"]:
+            stats.add_cycle(float(duration), float(energy))
+        return stats
+
+    @classmethod
+    def from_history(cls, cycles: Iterable[dict[str, Any]]) -> CycleStatistics:
+        """Build statistics from a list of finished cycles.
+
+        Args:
+            cycles: Cycles with "duration" and "energy" keys
+        """
+        stats = cls()
+        for cycle in cycles:
+            stats.add_cycle(cycle.get("duration", 0), cycle.get("energy", 0))
+        return stats
+
+
+def _rounded(value: float | None, digits: int) -> float | None:
+    """Round an optional value."""
+    return round(value, digits) if value is not None else None
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+from datetime import datetime
 from typing import Any
 
 from homeassistant.components.binary_sensor import (
@@ -67,6 +68,7 @@ class SmartApplianceRunningBinarySensor(SmartApplianceEntity, BinarySensorEntity
 
     _attr_device_class = BinarySensorDeviceClass.RUNNING
     _attr_translation_key = "running"
+    _coordinator_fields = ("state", "current_cycle")
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the binary sensor."""
@@ -95,6 +97,7 @@ class SmartApplianceAlertDurationBinarySensor(SmartApplianceEntity, BinarySensor
 
     _attr_device_class = BinarySensorDeviceClass.PROBLEM
     _attr_translation_key = "alert_duration"
+    _coordinator_fields = ("state", "cycle_duration")
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the binary sensor."""
@@ -128,7 +131,6 @@ class SmartApplianceAlertDurationBinarySensor(SmartApplianceEntity, BinarySensor
         attributes = {}
         
         if self.is_on and self.coordinator.data.get("current_cycle"):
-            from datetime import datetime
             cycle = self.coordinator.data["current_cycle"]
             start_time = cycle.get("start_time")
             if start_time:
@@ -144,6 +146,7 @@ class SmartApplianceUnpluggedBinarySensor(SmartApplianceEntity, BinarySensorEnti
 
     _attr_device_class = BinarySensorDeviceClass.PROBLEM
     _attr_translation_key = "unplugged"
+    _coordinator_fields = ("unplugged", "time_at_zero")
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the binary sensor."""
@@ -157,8 +160,6 @@ class SmartApplianceUnpluggedBinarySensor(SmartApplianceEntity, BinarySensorEnti
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return additional state attributes."""
-        from datetime import datetime
-        
         time_at_zero = self.coordinator.state_machine.get_time_at_zero_power(datetime.now())
         unplugged_timeout = self.coordinator.state_machine.unplugged_timeout
         
@@ -174,6 +175,7 @@ class SmartApplianceEnergyLimitBinarySensor(SmartApplianceEntity, BinarySensorEn
 
     _attr_device_class = BinarySensorDeviceClass.PROBLEM
     _attr_translation_key = "energy_limit_exceeded"
+    _coordinator_fields = ("daily_stats", "monthly_stats", "current_cycle", "energy_limits_enabled")
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the binary sensor."""
@@ -220,6 +222,7 @@ class SmartApplianceBudgetBinarySensor(SmartApplianceEntity, BinarySensorEntity)
 
     _attr_device_class = BinarySensorDeviceClass.PROBLEM
     _attr_translation_key = "budget_exceeded"
+    _coordinator_fields = ("monthly_stats", "energy_limits_enabled")
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the binary sensor."""
@@ -252,6 +255,7 @@ class SmartApplianceUsageAllowedBinarySensor(SmartApplianceEntity, BinarySensorE
     """Binary sensor indiquant si l'utilisation est autorisée selon la planification."""
 
     _attr_translation_key = "usage_allowed"
+    _coordinator_fields = ("usage_allowed",)
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the binary sensor."""
@@ -260,19 +264,21 @@ class SmartApplianceUsageAllowedBinarySensor(SmartApplianceEntity, BinarySensorE
     @property
     def is_on(self) -> bool:
         """Return True if usage is allowed."""
-        if not self.coordinator.scheduling_enabled:
-            return True
-        
-        return self.coordinator._is_usage_allowed()
+        return self.coordinator.data.get("usage_allowed", True)
     
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return additional state attributes."""
+        next_allowed = self.coordinator.schedule.next_allowed_start(datetime.now())
+        
         return {
             "allowed_start": self.coordinator.allowed_hours_start,
             "allowed_end": self.coordinator.allowed_hours_end,
+            "allowed_windows": self.coordinator.allowed_windows,
+            "schedule_overrides": self.coordinator.schedule_overrides,
             "blocked_days": self.coordinator.blocked_days,
             "scheduling_mode": self.coordinator.scheduling_mode,
+            "next_allowed_start": next_allowed.isoformat() if next_allowed else None,
         }
 
 
@@ -281,6 +287,7 @@ class SmartApplianceAnomalyBinarySensor(SmartApplianceEntity, BinarySensorEntity
 
     _attr_device_class = BinarySensorDeviceClass.PROBLEM
     _attr_translation_key = "anomaly_detected"
+    _coordinator_fields = ("state", "anomaly_score")
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the binary sensor."""
@@ -311,7 +318,7 @@ class SmartApplianceAnomalyBinarySensor(SmartApplianceEntity, BinarySensorEntity
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return additional state attributes."""
-        score = self.coordinator.get_anomaly_score()
+        score = self.coordinator.data.get("anomaly_score", 0)
         return {
             "anomaly_score": score,
             "history_size": len(self.coordinator._cycle_history),
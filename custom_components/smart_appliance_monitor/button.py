@@ -39,6 +39,7 @@ class SmartApplianceResetStatsButton(SmartApplianceEntity, ButtonEntity):
     """Bouton pour réinitialiser les statistiques."""
 
     _attr_translation_key = "reset_stats"
+    _coordinator_fields = ()
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the button."""
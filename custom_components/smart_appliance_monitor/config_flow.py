@@ -28,6 +28,9 @@ from .const import (
     CONF_ENABLE_ALERT_DURATION,
     CONF_ALERT_DURATION,
     CONF_UNPLUGGED_TIMEOUT,
+    CONF_ENABLE_EVENT_DRIVEN,
+    CONF_ENABLE_INSTRUMENTATION,
+    CONF_ENABLE_NIGHTLY_IMPORT,
     CONF_NOTIFICATION_SERVICES,
     CONF_NOTIFICATION_TYPES,
     CONF_CUSTOM_NOTIFY_SERVICE,
@@ -44,6 +47,8 @@ from .const import (
     CONF_ALLOWED_HOURS_END,
     CONF_BLOCKED_DAYS,
     CONF_SCHEDULING_MODE,
+    CONF_ALLOWED_WINDOWS,
+    CONF_SCHEDULE_OVERRIDES,
     CONF_ENABLE_ANOMALY_DETECTION,
     APPLIANCE_TYPES,
     APPLIANCE_PROFILES,
@@ -59,11 +64,15 @@ from .const import (
     DEFAULT_STOP_DELAY,
     DEFAULT_ALERT_DURATION,
     DEFAULT_UNPLUGGED_TIMEOUT,
+    DEFAULT_ENABLE_EVENT_DRIVEN,
+    DEFAULT_ENABLE_INSTRUMENTATION,
+    DEFAULT_ENABLE_NIGHTLY_IMPORT,
     DEFAULT_AUTO_SHUTDOWN_DELAY,
     DEFAULT_SCHEDULING_MODE,
     DEFAULT_NOTIFICATION_SERVICES,
     DEFAULT_NOTIFICATION_TYPES,
 )
+from .schedule import WeeklySchedule
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -409,6 +418,21 @@ class SmartApplianceMonitorOptionsFlowHandler(config_entries.OptionsFlow):
             if "unplugged_timeout_minutes" in user_input:
                 self._options[CONF_UNPLUGGED_TIMEOUT] = user_input["unplugged_timeout_minutes"] * 60
             
+            # Suivi événementiel des capteurs
+            self._options[CONF_ENABLE_EVENT_DRIVEN] = user_input.get(
+                CONF_ENABLE_EVENT_DRIVEN, DEFAULT_ENABLE_EVENT_DRIVEN
+            )
+            
+            # Mesure des temps d'exécution (capteurs de diagnostic)
+            self._options[CONF_ENABLE_INSTRUMENTATION] = user_input.get(
+                CONF_ENABLE_INSTRUMENTATION, DEFAULT_ENABLE_INSTRUMENTATION
+            )
+            
+            # Import incrémental nocturne de l'historique
+            self._options[CONF_ENABLE_NIGHTLY_IMPORT] = user_input.get(
+                CONF_ENABLE_NIGHTLY_IMPORT, DEFAULT_ENABLE_NIGHTLY_IMPORT
+            )
+            
             # Auto-shutdown
             self._options[CONF_ENABLE_AUTO_SHUTDOWN] = user_input.get(CONF_ENABLE_AUTO_SHUTDOWN, False)
             if "auto_shutdown_delay_minutes" in user_input:
@@ -437,6 +461,24 @@ class SmartApplianceMonitorOptionsFlowHandler(config_entries.OptionsFlow):
                     "unplugged_timeout_minutes",
                     default=unplugged_timeout_minutes,
                 ): vol.All(vol.Coerce(float), vol.Range(min=1, max=60)),
+                vol.Optional(
+                    CONF_ENABLE_EVENT_DRIVEN,
+                    default=self.config_entry.options.get(
+                        CONF_ENABLE_EVENT_DRIVEN, DEFAULT_ENABLE_EVENT_DRIVEN
+                    ),
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_ENABLE_INSTRUMENTATION,
+                    default=self.config_entry.options.get(
+                        CONF_ENABLE_INSTRUMENTATION, DEFAULT_ENABLE_INSTRUMENTATION
+                    ),
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_ENABLE_NIGHTLY_IMPORT,
+                    default=self.config_entry.options.get(
+                        CONF_ENABLE_NIGHTLY_IMPORT, DEFAULT_ENABLE_NIGHTLY_IMPORT
+                    ),
+                ): cv.boolean,
                 vol.Optional(
                     CONF_CUSTOM_NOTIFY_SERVICE,
                     default=self.config_entry.options.get(CONF_CUSTOM_NOTIFY_SERVICE, ""),
@@ -514,12 +556,28 @@ class SmartApplianceMonitorOptionsFlowHandler(config_entries.OptionsFlow):
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Step: Scheduling (optional)."""
+        errors: dict[str, str] = {}
+
         if user_input is not None:
+            try:
+                WeeklySchedule.from_options(
+                    user_input.get(CONF_ALLOWED_HOURS_START, "00:00"),
+                    user_input.get(CONF_ALLOWED_HOURS_END, "23:59"),
+                    user_input.get(CONF_BLOCKED_DAYS, []),
+                    windows=user_input.get(CONF_ALLOWED_WINDOWS, ""),
+                    overrides=user_input.get(CONF_SCHEDULE_OVERRIDES, ""),
+                )
+            except ValueError:
+                errors["base"] = "invalid_schedule"
+        
+        if user_input is not None and not errors:
             # Sauvegarder les options de planification
             self._options[CONF_ENABLE_SCHEDULING] = user_input.get(CONF_ENABLE_SCHEDULING, False)
             self._options[CONF_ALLOWED_HOURS_START] = user_input.get(CONF_ALLOWED_HOURS_START, "00:00")
             self._options[CONF_ALLOWED_HOURS_END] = user_input.get(CONF_ALLOWED_HOURS_END, "23:59")
+            self._options[CONF_ALLOWED_WINDOWS] = user_input.get(CONF_ALLOWED_WINDOWS, "")
             self._options[CONF_BLOCKED_DAYS] = user_input.get(CONF_BLOCKED_DAYS, [])
+            self._options[CONF_SCHEDULE_OVERRIDES] = user_input.get(CONF_SCHEDULE_OVERRIDES, "")
             self._options[CONF_SCHEDULING_MODE] = user_input.get(CONF_SCHEDULING_MODE, DEFAULT_SCHEDULING_MODE)
             
             # Si mode expert était activé, aller à l'étape expert, sinon notifications
@@ -542,6 +600,10 @@ class SmartApplianceMonitorOptionsFlowHandler(config_entries.OptionsFlow):
                     CONF_ALLOWED_HOURS_END,
                     default=self.config_entry.options.get(CONF_ALLOWED_HOURS_END, "23:59"),
                 ): str,
+                vol.Optional(
+                    CONF_ALLOWED_WINDOWS,
+                    default=self.config_entry.options.get(CONF_ALLOWED_WINDOWS, ""),
+                ): str,
                 vol.Optional(
                     CONF_BLOCKED_DAYS,
                     default=self.config_entry.options.get(CONF_BLOCKED_DAYS, []),
@@ -553,6 +615,10 @@ class SmartApplianceMonitorOptionsFlowHandler(config_entries.OptionsFlow):
                         translation_key="day_of_week",
                     )
                 ),
+                vol.Optional(
+                    CONF_SCHEDULE_OVERRIDES,
+                    default=self.config_entry.options.get(CONF_SCHEDULE_OVERRIDES, ""),
+                ): str,
                 vol.Optional(
                     CONF_SCHEDULING_MODE,
                     default=self.config_entry.options.get(CONF_SCHEDULING_MODE, DEFAULT_SCHEDULING_MODE),
@@ -568,6 +634,7 @@ class SmartApplianceMonitorOptionsFlowHandler(config_entries.OptionsFlow):
         return self.async_show_form(
             step_id="scheduling",
             data_schema=options_schema,
+            errors=errors,
         )
 
     async def async_step_dashboard_config(
@@ -19,6 +19,9 @@ CONF_STOP_DELAY = "stop_delay"
 CONF_ENABLE_ALERT_DURATION = "enable_alert_duration"
 CONF_ALERT_DURATION = "alert_duration"
 CONF_UNPLUGGED_TIMEOUT = "unplugged_timeout"
+CONF_ENABLE_EVENT_DRIVEN = "enable_event_driven"
+CONF_ENABLE_INSTRUMENTATION = "enable_instrumentation"
+CONF_ENABLE_NIGHTLY_IMPORT = "enable_nightly_import"
 
 # Notification Configuration
 CONF_NOTIFICATION_SERVICES = "notification_services"
@@ -43,6 +46,8 @@ CONF_ALLOWED_HOURS_START = "allowed_hours_start"
 CONF_ALLOWED_HOURS_END = "allowed_hours_end"
 CONF_BLOCKED_DAYS = "blocked_days"
 CONF_SCHEDULING_MODE = "scheduling_mode"
+CONF_ALLOWED_WINDOWS = "allowed_windows"  # ex: "08:00-12:00, 14:00-22:00"
+CONF_SCHEDULE_OVERRIDES = "schedule_overrides"  # ex: "saturday: 10:00-23:00; sunday: off"
 
 # Anomaly Detection Configuration
 CONF_ENABLE_ANOMALY_DETECTION = "enable_anomaly_detection"
@@ -159,6 +164,11 @@ DEFAULT_START_DELAY = 120
 DEFAULT_STOP_DELAY = 300
 DEFAULT_ALERT_DURATION = 7200
 DEFAULT_UNPLUGGED_TIMEOUT = 300  # 5 minutes
+DEFAULT_ENABLE_EVENT_DRIVEN = True
+DEFAULT_ENABLE_INSTRUMENTATION = False
+DEFAULT_ENABLE_NIGHTLY_IMPORT = False
+DEFAULT_POLL_INTERVAL_ACTIVE = 10  # Cycle en cours ou confirmation en attente
+DEFAULT_POLL_INTERVAL_IDLE = 120  # Appareil au repos ou débranché
 DEFAULT_AUTO_SHUTDOWN_DELAY = 1800  # 30 minutes
 DEFAULT_SCHEDULING_MODE = "notification_only"  # or "strict_block"
 DEFAULT_NOTIFICATION_SERVICES = [NOTIF_SERVICE_MOBILE_APP, NOTIF_SERVICE_PERSISTENT]
@@ -184,6 +194,8 @@ APPLIANCE_PROFILES = {
         "start_delay": 30,  # Détection rapide
         "stop_delay": 120,  # Refroidissement
         "alert_duration": 7200,  # 2h
+        "poll_interval_active": 10,  # Suivi précis de la cuisson
+        "poll_interval_idle": 60,  # Démarrages fréquents
     },
     APPLIANCE_TYPE_DISHWASHER: {
         "start_threshold": 150,  # Lave-vaisselle: optimisé (basé sur analyse)
@@ -191,6 +203,8 @@ APPLIANCE_PROFILES = {
         "start_delay": 60,  # Détection rapide
         "stop_delay": 120,  # Fin de cycle confirmée
         "alert_duration": 10800,  # 3h
+        "poll_interval_active": 15,
+        "poll_interval_idle": 120,
     },
     APPLIANCE_TYPE_WASHING_MACHINE: {
         "start_threshold": 100,  # Lave-linge: optimisé (basé sur analyse)
@@ -198,6 +212,8 @@ APPLIANCE_PROFILES = {
         "start_delay": 60,  # Détection rapide
         "stop_delay": 120,  # Fin de cycle confirmée
         "alert_duration": 10800,  # 3h
+        "poll_interval_active": 15,
+        "poll_interval_idle": 120,
     },
     APPLIANCE_TYPE_DRYER: {
         "start_threshold": 200,  # Sèche-linge: optimisé (basé sur analyse)
@@ -205,6 +221,8 @@ APPLIANCE_PROFILES = {
         "start_delay": 30,  # Détection rapide
         "stop_delay": 120,  # Fin de séchage
         "alert_duration": 7200,  # 2h
+        "poll_interval_active": 10,
+        "poll_interval_idle": 120,
     },
     APPLIANCE_TYPE_WATER_HEATER: {
         "start_threshold": 1000,  # Chauffe-eau: très haute puissance
@@ -212,6 +230,8 @@ APPLIANCE_PROFILES = {
         "start_delay": 30,  # Détection rapide
         "stop_delay": 60,  # Arrêt rapide
         "alert_duration": 14400,  # 4h
+        "poll_interval_active": 10,
+        "poll_interval_idle": 120,
     },
     APPLIANCE_TYPE_COFFEE_MAKER: {
         "start_threshold": 50,  # Machine à café: puissance moyenne
@@ -219,6 +239,8 @@ APPLIANCE_PROFILES = {
         "start_delay": 15,  # Très rapide
         "stop_delay": 30,  # Très rapide
         "alert_duration": 1800,  # 30min
+        "poll_interval_active": 5,  # Délais très courts
+        "poll_interval_idle": 60,  # Démarrages fréquents
     },
     APPLIANCE_TYPE_MONITOR: {
         "start_threshold": 40,  # Écran: optimisé (basé sur analyse)
@@ -226,6 +248,8 @@ APPLIANCE_PROFILES = {
         "start_delay": 30,  # Détection rapide allumage
         "stop_delay": 60,  # Détection rapide extinction
         "alert_duration": 28800,  # 8h - sessions longues
+        "poll_interval_active": 10,
+        "poll_interval_idle": 120,
     },
     APPLIANCE_TYPE_NAS: {
         "start_threshold": 50,  # Activité intensive (baseline ~30W)
@@ -233,6 +257,8 @@ APPLIANCE_PROFILES = {
         "start_delay": 120,  # Confirmer début backup/transfert
         "stop_delay": 180,  # Fin d'activité confirmée
         "alert_duration": 21600,  # 6h pour backups longs
+        "poll_interval_active": 20,  # Activités longues
+        "poll_interval_idle": 300,  # Baseline stable
     },
     APPLIANCE_TYPE_PRINTER_3D: {
         "start_threshold": 30,  # Imprimante 3D: optimisé (basé sur analyse)
@@ -240,6 +266,8 @@ APPLIANCE_PROFILES = {
         "start_delay": 60,  # Détection rapide
         "stop_delay": 120,  # Fin d'impression confirmée
         "alert_duration": 86400,  # 24h - impressions très longues
+        "poll_interval_active": 15,  # Impressions longues
+        "poll_interval_idle": 300,  # Peu de démarrages
     },
     APPLIANCE_TYPE_VMC: {
         "start_threshold": 5,  # VMC: passage en mode boost
@@ -247,6 +275,8 @@ APPLIANCE_PROFILES = {
         "start_delay": 30,  # Détection rapide
         "stop_delay": 60,  # Détection rapide
         "alert_duration": 7200,  # 2h pour un boost long
+        "poll_interval_active": 10,
+        "poll_interval_idle": 120,
     },
     APPLIANCE_TYPE_AIR_CONDITIONER: {
         "start_threshold": 50,  # Climatisation: démarrage compresseur
@@ -254,6 +284,8 @@ APPLIANCE_PROFILES = {
         "start_delay": 60,  # Détection rapide - 1 minute
         "stop_delay": 180,  # 3 minutes - cycles du compresseur
         "alert_duration": 43200,  # 12 heures
+        "poll_interval_active": 15,
+        "poll_interval_idle": 120,
     },
     APPLIANCE_TYPE_OTHER: {
         "start_threshold": DEFAULT_START_THRESHOLD,
@@ -261,6 +293,8 @@ APPLIANCE_PROFILES = {
         "start_delay": DEFAULT_START_DELAY,
         "stop_delay": DEFAULT_STOP_DELAY,
         "alert_duration": DEFAULT_ALERT_DURATION,
+        "poll_interval_active": DEFAULT_POLL_INTERVAL_ACTIVE,
+        "poll_interval_idle": DEFAULT_POLL_INTERVAL_IDLE,
     },
 }
 
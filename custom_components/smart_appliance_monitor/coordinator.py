@@ -1,12 +1,18 @@
 """Coordinator pour Smart Appliance Monitor."""
 from __future__ import annotations
 
+import asyncio
 import logging
 from datetime import timedelta, datetime
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_state_change_event,
+)
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.helpers.storage import Store
 
@@ -25,6 +31,9 @@ from .const import (
     CONF_ENABLE_ALERT_DURATION,
     CONF_ALERT_DURATION,
     CONF_UNPLUGGED_TIMEOUT,
+    CONF_ENABLE_EVENT_DRIVEN,
+    CONF_ENABLE_INSTRUMENTATION,
+    CONF_ENABLE_NIGHTLY_IMPORT,
     CONF_NOTIFICATION_SERVICES,
     CONF_NOTIFICATION_TYPES,
     CONF_CUSTOM_NOTIFY_SERVICE,
@@ -41,6 +50,8 @@ from .const import (
     CONF_ALLOWED_HOURS_END,
     CONF_BLOCKED_DAYS,
     CONF_SCHEDULING_MODE,
+    CONF_ALLOWED_WINDOWS,
+    CONF_SCHEDULE_OVERRIDES,
     CONF_ENABLE_ANOMALY_DETECTION,
     APPLIANCE_PROFILES,
     DEFAULT_START_THRESHOLD,
@@ -49,6 +60,11 @@ from .const import (
     DEFAULT_STOP_DELAY,
     DEFAULT_ALERT_DURATION,
     DEFAULT_UNPLUGGED_TIMEOUT,
+    DEFAULT_ENABLE_EVENT_DRIVEN,
+    DEFAULT_ENABLE_INSTRUMENTATION,
+    DEFAULT_ENABLE_NIGHTLY_IMPORT,
+    DEFAULT_POLL_INTERVAL_ACTIVE,
+    DEFAULT_POLL_INTERVAL_IDLE,
     DEFAULT_AUTO_SHUTDOWN_DELAY,
     DEFAULT_SCHEDULING_MODE,
     DEFAULT_PRICE_KWH,
@@ -71,14 +87,38 @@ from .const import (
     AI_TRIGGER_AUTO_CYCLE_END,
     STATE_ANALYZING,
 )
+from .anomaly import MIN_CYCLES_FOR_SCORING, CycleStatistics
+from .cycle_record import CycleRecord, PowerProfile
+from .history import invalidate_history_cache
+from .instrumentation import (
+    COUNTER_SAVES_SCHEDULED,
+    COUNTER_STATE_WRITES,
+    COUNTER_STORE_FLUSHES,
+    STAGE_EVENT,
+    STAGE_NOTIFY,
+    STAGE_SAMPLE,
+    STAGE_SAVE,
+    STAGE_UPDATE,
+    Instrumentation,
+)
+from .schedule import WeeklySchedule
 from .state_machine import CycleStateMachine
 from .notify import SmartApplianceNotifier
 
 _LOGGER = logging.getLogger(__name__)
 
 UPDATE_INTERVAL = timedelta(seconds=30)
+# En mode événementiel, le rafraîchissement périodique ne sert plus que de garde-fou
+WATCHDOG_INTERVAL = timedelta(minutes=5)
 STORAGE_VERSION = 1
 STORAGE_KEY = "smart_appliance_monitor.{entry_id}"
+# Délai de regroupement des écritures différées (secondes)
+STORAGE_SAVE_DELAY = 60
+# Sections du stockage, resérialisées uniquement lorsqu'elles sont modifiées
+STORAGE_SECTIONS = ("state", "stats", "history", "anomaly", "switches", "ai")
+
+# Nombre maximal de cycles conservés dans l'historique
+CYCLE_HISTORY_SIZE = 1000
 
 
 class SmartApplianceCoordinator(DataUpdateCoordinator):
@@ -192,11 +232,17 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
         self.allowed_hours_end = entry.options.get(CONF_ALLOWED_HOURS_END, "23:59")
         self.blocked_days = entry.options.get(CONF_BLOCKED_DAYS, [])
         self.scheduling_mode = entry.options.get(CONF_SCHEDULING_MODE, DEFAULT_SCHEDULING_MODE)
+        self.allowed_windows = entry.options.get(CONF_ALLOWED_WINDOWS, "")
+        self.schedule_overrides = entry.options.get(CONF_SCHEDULE_OVERRIDES, "")
+        # Planning compilé une seule fois (une entrée par minute de la semaine)
+        self.schedule = self._compile_schedule()
         
         # Anomaly detection
         self.anomaly_detection_enabled = entry.options.get(CONF_ENABLE_ANOMALY_DETECTION, False)
-        self._cycle_history: list[dict[str, Any]] = []
-        self._max_history_size = 30
+        self._cycle_history: list[CycleRecord] = []
+        self._max_history_size = CYCLE_HISTORY_SIZE
+        # Statistiques incrémentales des cycles terminés (score en O(1))
+        self.cycle_statistics = CycleStatistics()
         
         # AI Analysis
         self.ai_analysis_enabled = False  # Will be loaded from global config
@@ -207,12 +253,54 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
         # Storage pour la persistance
         storage_key = STORAGE_KEY.format(entry_id=entry.entry_id)
         self._store = Store(hass, STORAGE_VERSION, storage_key)
+        self._dirty_sections: set[str] = set(STORAGE_SECTIONS)
+        self._section_cache: dict[str, dict[str, Any]] = {}
+        # Écriture différée programmée et pas encore effectuée
+        self._save_pending = False
+        
+        # Suivi événementiel des capteurs (le polling devient un simple garde-fou)
+        self.event_driven = entry.options.get(
+            CONF_ENABLE_EVENT_DRIVEN, DEFAULT_ENABLE_EVENT_DRIVEN
+        )
+        self._last_power: float | None = None
+        self._last_energy: float | None = None
+        self._sample_lock = asyncio.Lock()
+        self._unsub_state_listener: CALLBACK_TYPE | None = None
+        self._unsub_deadline: CALLBACK_TYPE | None = None
+        self._unsub_usage_boundary: CALLBACK_TYPE | None = None
+        
+        # Intervalles de rafraîchissement adaptatifs (profil de l'appareil)
+        self.poll_interval_active = timedelta(
+            seconds=profile.get("poll_interval_active", DEFAULT_POLL_INTERVAL_ACTIVE)
+        )
+        self.poll_interval_idle = timedelta(
+            seconds=profile.get("poll_interval_idle", DEFAULT_POLL_INTERVAL_IDLE)
+        )
+        
+        # Intervalle courant (piloté par le hub une fois enregistré)
+        self.poll_interval = WATCHDOG_INTERVAL if self.event_driven else UPDATE_INTERVAL
+        
+        # Mesure des temps d'exécution des étapes critiques (option experte)
+        self.instrumentation = Instrumentation(
+            entry.options.get(
+                CONF_ENABLE_INSTRUMENTATION, DEFAULT_ENABLE_INSTRUMENTATION
+            )
+        )
+        
+        # Import incrémental nocturne de l'historique (option experte)
+        self.nightly_import = entry.options.get(
+            CONF_ENABLE_NIGHTLY_IMPORT, DEFAULT_ENABLE_NIGHTLY_IMPORT
+        )
+        
+        # Champs modifiés depuis la dernière notification (None = tous)
+        self._changed_fields: set[str] | None = None
+        self._last_notified_success = True
         
         super().__init__(
             hass,
             _LOGGER,
             name=f"{DOMAIN}_{entry.entry_id}",
-            update_interval=UPDATE_INTERVAL,
+            update_interval=self.poll_interval,
         )
         
         _LOGGER.info(
@@ -249,76 +337,412 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
         Raises:
             UpdateFailed: Si la récupération des données échoue
         """
-        try:
-            # Récupération de la puissance
-            power_state = self.hass.states.get(self.power_sensor)
-            if power_state is None:
-                raise UpdateFailed(f"Capteur de puissance '{self.power_sensor}' non disponible")
-            
+        with self.instrumentation.measure(STAGE_UPDATE):
             try:
-                power = float(power_state.state)
-            except (ValueError, TypeError):
-                _LOGGER.warning(
-                    "Valeur de puissance invalide: %s. Utilisation de 0.",
-                    power_state.state,
-                )
-                power = 0.0
-            
-            # Récupération de l'énergie
-            energy_state = self.hass.states.get(self.energy_sensor)
-            if energy_state is None:
-                raise UpdateFailed(f"Capteur d'énergie '{self.energy_sensor}' non disponible")
-            
-            try:
-                energy = float(energy_state.state)
-            except (ValueError, TypeError):
-                _LOGGER.warning(
-                    "Valeur d'énergie invalide: %s. Utilisation de 0.",
-                    energy_state.state,
-                )
-                energy = 0.0
-            
-            # Mise à jour de la machine à états (seulement si la surveillance est activée)
-            event = None
-            if self.monitoring_enabled:
-                event = self.state_machine.update(power, energy)
+                # Récupération de la puissance
+                power_state = self.hass.states.get(self.power_sensor)
+                if power_state is None:
+                    raise UpdateFailed(f"Capteur de puissance '{self.power_sensor}' non disponible")
                 
-                # Gestion des événements
-                if event:
-                    await self._handle_event(event)
+                try:
+                    power = float(power_state.state)
+                except (ValueError, TypeError):
+                    _LOGGER.warning(
+                        "Valeur de puissance invalide: %s. Utilisation de 0.",
+                        power_state.state,
+                    )
+                    power = 0.0
                 
-                # Vérifications supplémentaires
-                await self._check_auto_shutdown()
-                await self._check_energy_limits()
-                await self._check_scheduling()
-                await self._check_anomaly_detection()
-            
-            # Mise à jour des statistiques journalières/mensuelles
-            self._update_statistics()
-            
-            # Sauvegarde périodique de l'état (uniquement si un cycle est en cours)
-            if self.state_machine.state == STATE_RUNNING:
-                await self._save_state()
-            
-            # Construction des données de retour
-            data = {
-                "power": power,
-                "energy": energy,
-                "state": self.state_machine.state,
-                "current_cycle": self.state_machine.current_cycle,
-                "last_cycle": self.state_machine.last_cycle,
-                "daily_stats": self.daily_stats,
-                "monthly_stats": self.monthly_stats,
-                "monitoring_enabled": self.monitoring_enabled,
-                "notifications_enabled": self.notifications_enabled,
-            }
+                # Récupération de l'énergie
+                energy_state = self.hass.states.get(self.energy_sensor)
+                if energy_state is None:
+                    raise UpdateFailed(f"Capteur d'énergie '{self.energy_sensor}' non disponible")
+                
+                try:
+                    energy = float(energy_state.state)
+                except (ValueError, TypeError):
+                    _LOGGER.warning(
+                        "Valeur d'énergie invalide: %s. Utilisation de 0.",
+                        energy_state.state,
+                    )
+                    energy = 0.0
+                
+                await self._async_process_sample(power, energy)
+                
+                data = self._build_data(power, energy)
+                self._changed_fields = self._diff_data(data)
+                return data
+                
+            except UpdateFailed:
+                raise
+            except Exception as err:
+                raise UpdateFailed(f"Erreur lors de la mise à jour des données: {err}") from err
+    
+    async def _async_process_sample(
+        self, power: float, energy: float, now: datetime | None = None
+    ) -> None:
+        """Traite un échantillon de puissance/énergie.
+        
+        Point d'entrée commun au polling et aux changements d'état des capteurs.
+        
+        Args:
+            power: Puissance mesurée (W)
+            energy: Énergie totale mesurée (kWh)
+            now: Horodatage de l'échantillon (optionnel)
+        """
+        async with self._sample_lock:
+            with self.instrumentation.measure(STAGE_SAMPLE):
+                self._last_power = power
+                self._last_energy = energy
+                
+                # Mise à jour de la machine à états (seulement si la surveillance est activée)
+                if self.monitoring_enabled:
+                    # Coût et courbe du cycle accumulés avant une éventuelle fin de cycle
+                    sample_time = now or datetime.now()
+                    self._accumulate_cycle_cost(energy, sample_time)
+                    self._record_power_profile(power, sample_time)
+                    event = self.state_machine.update(power, energy, now)
+                    
+                    # Gestion des événements
+                    if event:
+                        await self._handle_event(event)
+                    
+                    # Vérifications supplémentaires
+                    await self._check_auto_shutdown()
+                    await self._check_energy_limits()
+                    await self._check_scheduling()
+                    await self._check_anomaly_detection()
+                
+                # Mise à jour des statistiques journalières/mensuelles
+                self._update_statistics()
+                
+                # Sauvegarde différée de l'état (uniquement si un cycle est en cours)
+                if self.state_machine.state == STATE_RUNNING:
+                    self._schedule_save("state")
+                
+                if self.event_driven:
+                    self._schedule_deadline_check()
+                else:
+                    self._update_poll_interval()
+    
+    def _accumulate_cycle_cost(self, energy: float, now: datetime) -> None:
+        """Ajoute au cycle en cours le coût de l'énergie consommée depuis le dernier échantillon.
+        
+        Chaque delta d'énergie est valorisé au(x) prix en vigueur sur
+        l'intervalle, ce qui chiffre correctement un cycle à cheval sur un
+        changement de tarif (heures pleines/creuses).
+        
+        Args:
+            energy: Énergie totale mesurée (kWh)
+            now: Horodatage de l'échantillon
+        """
+        cycle = self.state_machine.current_cycle
+        if self.state_machine.state != STATE_RUNNING or cycle is None:
+            return
+        
+        timestamp = now.timestamp()
+        if cycle.cost_energy is None:
+            cycle.cost = 0.0
+            cycle.cost_energy = (
+                cycle.start_energy if cycle.start_energy is not None else energy
+            )
+            cycle.cost_ts = cycle.start_ts if cycle.start_ts is not None else timestamp
+        
+        delta = energy - cycle.cost_energy
+        if delta > 0:
+            cycle.cost += self._integrate_cost(cycle.cost_ts, timestamp, delta)
+        
+        # Un delta négatif (compteur remis à zéro) redéfinit simplement la référence
+        cycle.cost_energy = energy
+        cycle.cost_ts = timestamp
+    
+    def _record_power_profile(self, power: float, now: datetime) -> None:
+        """Ajoute un échantillon de puissance à la courbe du cycle en cours.
+        
+        La courbe est sous-échantillonnée dans un tampon de taille fixe
+        (voir PowerProfile) et persistée avec le cycle.
+        
+        Args:
+            power: Puissance mesurée (W)
+            now: Horodatage de l'échantillon
+        """
+        cycle = self.state_machine.current_cycle
+        if self.state_machine.state != STATE_RUNNING or cycle is None:
+            return
+        
+        if cycle.profile is None:
+            # La courbe commence à la confirmation du démarrage
+            cycle.profile = PowerProfile()
+            cycle.profile.add(cycle.peak_power or power, 0.0)
+        cycle.profile.add(power, now.timestamp() - cycle.start_ts)
+    
+    def _integrate_cost(self, start: float, end: float, energy: float) -> float:
+        """Valorise une énergie consommée entre deux instants (secondes epoch)."""
+        price_service = self.hass.data.get(DOMAIN, {}).get("price_service")
+        if price_service is None:
+            return energy * self._get_current_price()
+        return price_service.integrate_cost(start, end, energy)
+    
+    def _compute_poll_interval(self) -> timedelta:
+        """Calcule l'intervalle de rafraîchissement selon l'état de la machine.
+        
+        Relevés rapprochés pendant un cycle ou une confirmation de démarrage/arrêt,
+        espacés lorsque l'appareil est au repos ou débranché.
+        """
+        if (
+            self.state_machine.state == STATE_RUNNING
+            or self.state_machine.is_transition_pending()
+        ):
+            return self.poll_interval_active
+        return self.poll_interval_idle
+    
+    def _update_poll_interval(self) -> None:
+        """Applique l'intervalle adapté à l'état courant."""
+        interval = self._compute_poll_interval()
+        if interval == self.poll_interval:
+            return
+        
+        _LOGGER.debug(
+            "Intervalle de rafraîchissement de '%s': %ss -> %ss",
+            self.appliance_name,
+            self.poll_interval.total_seconds(),
+            interval.total_seconds(),
+        )
+        self.poll_interval = interval
+        
+        # Sans hub, le coordinator gère lui-même son timer
+        if self.update_interval is not None:
+            self.update_interval = interval
+    
+    def _build_data(self, power: float, energy: float) -> dict[str, Any]:
+        """Construit le dictionnaire de données exposé aux entités.
+        
+        Les structures mutables sont copiées et les valeurs dérivées (durée,
+        énergie du cycle, score...) calculées ici afin que deux instantanés
+        successifs puissent être comparés champ par champ.
+        """
+        now = datetime.now()
+        running = self.state_machine.state == STATE_RUNNING
+        current_cycle = self.state_machine.current_cycle
+        last_cycle = self.state_machine.last_cycle
+        ai_result = self.last_ai_analysis_result or {}
+        
+        return {
+            "power": power,
+            "energy": energy,
+            "state": self.state_machine.state,
+            "current_cycle": dict(current_cycle) if current_cycle else None,
+            "last_cycle": dict(last_cycle) if last_cycle else None,
+            "daily_stats": dict(self.daily_stats),
+            "monthly_stats": dict(self.monthly_stats),
+            "monitoring_enabled": self.monitoring_enabled,
+            "notifications_enabled": self.notifications_enabled,
+            "energy_limits_enabled": self.energy_limits_enabled,
+            "usage_allowed": (
+                self.schedule.is_allowed(now) if self.scheduling_enabled else True
+            ),
+            "cycle_duration": (
+                self.state_machine.get_cycle_duration(now) if running else 0.0
+            ),
+            "cycle_energy": (
+                self.state_machine.get_cycle_energy(energy) if running else 0.0
+            ),
+            "price_kwh": self.price_kwh,
+            "anomaly_score": self.get_anomaly_score(),
+            "unplugged": self.state_machine.is_unplugged(),
+            "time_at_zero": round(self.state_machine.get_time_at_zero_power(now), 1),
+            "ai_analysis": (ai_result.get("status"), ai_result.get("timestamp")),
+        }
+    
+    def _diff_data(self, data: dict[str, Any]) -> set[str] | None:
+        """Retourne les champs qui diffèrent de l'instantané précédent.
+        
+        Args:
+            data: Nouvel instantané construit par _build_data
             
-            return data
+        Returns:
+            Ensemble des champs modifiés, None si aucun instantané précédent
+        """
+        if not self.data:
+            return None
+        
+        return {
+            field
+            for field, value in data.items()
+            if self.data.get(field) != value
+        }
+    
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notifie uniquement les entités abonnées à un champ modifié.
+        
+        Chaque entité s'abonne via le contexte de son listener (ensemble de
+        champs). Les entités sans contexte, les notifications directes et les
+        changements de disponibilité restent notifiés à toutes les entités.
+        """
+        changed = self._changed_fields
+        self._changed_fields = None
+        
+        with self.instrumentation.measure(STAGE_NOTIFY):
+            if changed is None or self.last_update_success != self._last_notified_success:
+                self._last_notified_success = self.last_update_success
+                self.instrumentation.increment(COUNTER_STATE_WRITES, len(self._listeners))
+                super().async_update_listeners()
+                return
             
-        except UpdateFailed:
-            raise
+            for update_callback, context in list(self._listeners.values()):
+                if context is None or not context.isdisjoint(changed):
+                    self.instrumentation.increment(COUNTER_STATE_WRITES)
+                    update_callback()
+    
+    @callback
+    def async_start_event_tracking(self) -> None:
+        """Abonne le coordinator aux changements d'état des capteurs."""
+        if self._unsub_state_listener is not None:
+            return
+        
+        self._unsub_state_listener = async_track_state_change_event(
+            self.hass,
+            [self.power_sensor, self.energy_sensor],
+            self._async_handle_sensor_change,
+        )
+        _LOGGER.debug(
+            "Suivi événementiel activé pour '%s' (%s, %s)",
+            self.appliance_name,
+            self.power_sensor,
+            self.energy_sensor,
+        )
+    
+    @callback
+    def async_stop_event_tracking(self) -> None:
+        """Désabonne le coordinator des capteurs et annule l'échéance en attente."""
+        if self._unsub_state_listener is not None:
+            self._unsub_state_listener()
+            self._unsub_state_listener = None
+        if self._unsub_deadline is not None:
+            self._unsub_deadline()
+            self._unsub_deadline = None
+    
+    @callback
+    def _async_handle_sensor_change(self, event: Event) -> None:
+        """Pousse chaque nouvel échantillon d'un capteur dans la machine à états."""
+        new_state = event.data.get("new_state")
+        if new_state is None or new_state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+            return
+        
+        try:
+            value = float(new_state.state)
+        except (ValueError, TypeError):
+            _LOGGER.debug(
+                "Valeur ignorée pour %s: %s",
+                event.data.get("entity_id"),
+                new_state.state,
+            )
+            return
+        
+        power = self._last_power
+        energy = self._last_energy
+        if event.data.get("entity_id") == self.power_sensor:
+            power = value
+        else:
+            energy = value
+        
+        # Les deux valeurs sont amorcées par le premier rafraîchissement
+        if power is None or energy is None:
+            return
+        
+        self.hass.async_create_task(
+            self._async_process_pushed_sample(power, energy, datetime.now())
+        )
+    
+    async def _async_process_pushed_sample(
+        self, power: float, energy: float, now: datetime
+    ) -> None:
+        """Traite un échantillon poussé et notifie les entités."""
+        try:
+            await self._async_process_sample(power, energy, now)
         except Exception as err:
-            raise UpdateFailed(f"Erreur lors de la mise à jour des données: {err}") from err
+            _LOGGER.error(
+                "Erreur lors du traitement d'un échantillon pour '%s': %s",
+                self.appliance_name,
+                err,
+            )
+            return
+        
+        data = self._build_data(power, energy)
+        self._changed_fields = self._diff_data(data)
+        self.async_set_updated_data(data)
+    
+    @callback
+    def _schedule_deadline_check(self) -> None:
+        """Programme une réévaluation à la prochaine échéance de la machine à états.
+        
+        Un capteur dont la valeur ne change plus ne publie plus d'événement : sans
+        cette réévaluation, la confirmation d'un arrêt à puissance stable attendrait
+        le prochain passage du garde-fou.
+        """
+        if self._unsub_deadline is not None:
+            self._unsub_deadline()
+            self._unsub_deadline = None
+        
+        deadline = self.state_machine.get_next_deadline()
+        if deadline is None:
+            return
+        
+        delay = max(0.0, (deadline - datetime.now()).total_seconds())
+        self._unsub_deadline = async_call_later(
+            self.hass, delay, self._async_deadline_reached
+        )
+    
+    @callback
+    def _async_deadline_reached(self, _now: datetime) -> None:
+        """Rejoue le dernier échantillon connu lorsqu'une échéance est atteinte."""
+        self._unsub_deadline = None
+        if self._last_power is None or self._last_energy is None:
+            return
+        
+        self.hass.async_create_task(
+            self._async_process_pushed_sample(
+                self._last_power, self._last_energy, datetime.now()
+            )
+        )
+    
+    @callback
+    def async_track_usage_schedule(self) -> None:
+        """Programme une mise à jour à la prochaine ouverture ou fermeture d'une plage.
+        
+        usage_allowed n'est sinon recalculé qu'au rafraîchissement suivant,
+        jusqu'à WATCHDOG_INTERVAL plus tard en mode événementiel.
+        """
+        from homeassistant.helpers.event import async_track_point_in_time
+        
+        self.async_stop_usage_schedule_tracking()
+        boundary = self.schedule.next_change(datetime.now())
+        if boundary is None:
+            return
+        
+        self._unsub_usage_boundary = async_track_point_in_time(
+            self.hass, self._async_usage_boundary_reached, boundary
+        )
+    
+    @callback
+    def async_stop_usage_schedule_tracking(self) -> None:
+        """Annule la mise à jour programmée à la prochaine limite de plage."""
+        if self._unsub_usage_boundary is not None:
+            self._unsub_usage_boundary()
+            self._unsub_usage_boundary = None
+    
+    @callback
+    def _async_usage_boundary_reached(self, _now: datetime) -> None:
+        """Met à jour usage_allowed à une limite de plage et programme la suivante."""
+        self._unsub_usage_boundary = None
+        self.async_track_usage_schedule()
+        if self._last_power is None or self._last_energy is None:
+            return
+        
+        data = self._build_data(self._last_power, self._last_energy)
+        self._changed_fields = self._diff_data(data)
+        self.async_set_updated_data(data)
     
     async def _handle_event(self, event: str) -> None:
         """Gère les événements émis par la machine à états.
@@ -326,33 +750,34 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
         Args:
             event: Nom de l'événement (EVENT_CYCLE_STARTED, etc.)
         """
-        _LOGGER.info("Événement reçu: %s", event)
-        
-        if event == EVENT_CYCLE_STARTED:
-            await self._on_cycle_started()
-        elif event == EVENT_CYCLE_FINISHED:
-            await self._on_cycle_finished()
-        elif event == EVENT_ALERT_DURATION:
-            await self._on_alert_duration()
-        elif event == EVENT_UNPLUGGED:
-            await self._on_unplugged()
-        elif event == EVENT_AUTO_SHUTDOWN:
-            await self._on_auto_shutdown()
-        elif event == EVENT_ENERGY_LIMIT_EXCEEDED:
-            await self._on_energy_limit_exceeded()
-        elif event == EVENT_BUDGET_EXCEEDED:
-            await self._on_budget_exceeded()
-        elif event == EVENT_USAGE_OUT_OF_SCHEDULE:
-            await self._on_usage_out_of_schedule()
-        elif event == EVENT_ANOMALY_DETECTED:
-            await self._on_anomaly_detected()
+        with self.instrumentation.measure(STAGE_EVENT):
+            _LOGGER.info("Événement reçu: %s", event)
+            
+            if event == EVENT_CYCLE_STARTED:
+                await self._on_cycle_started()
+            elif event == EVENT_CYCLE_FINISHED:
+                await self._on_cycle_finished()
+            elif event == EVENT_ALERT_DURATION:
+                await self._on_alert_duration()
+            elif event == EVENT_UNPLUGGED:
+                await self._on_unplugged()
+            elif event == EVENT_AUTO_SHUTDOWN:
+                await self._on_auto_shutdown()
+            elif event == EVENT_ENERGY_LIMIT_EXCEEDED:
+                await self._on_energy_limit_exceeded()
+            elif event == EVENT_BUDGET_EXCEEDED:
+                await self._on_budget_exceeded()
+            elif event == EVENT_USAGE_OUT_OF_SCHEDULE:
+                await self._on_usage_out_of_schedule()
+            elif event == EVENT_ANOMALY_DETECTED:
+                await self._on_anomaly_detected()
     
     async def _on_cycle_started(self) -> None:
         """Appelé lorsqu'un cycle démarre."""
         _LOGGER.info("Cycle démarré pour '%s'", self.appliance_name)
         
-        # Sauvegarder l'état
-        await self._save_state()
+        # Sauvegarder l'état immédiatement
+        await self._save_state("state")
         
         # Émettre un événement Home Assistant
         self.hass.bus.async_fire(
@@ -376,9 +801,14 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
         duration = cycle.get("duration", 0)
         energy = cycle.get("energy", 0)
         
-        # Récupérer le prix actuel
-        price_kwh = self._get_current_price()
-        cost = energy * price_kwh
+        # Coût accumulé pendant le cycle (prix en vigueur à chaque échantillon),
+        # prix actuel pour les cycles sans suivi du coût (restaurés, anciens)
+        if "cost" in cycle and energy > 0:
+            cost = cycle["cost"]
+            price_kwh = cost / energy
+        else:
+            price_kwh = self._get_current_price()
+            cost = energy * price_kwh
         
         _LOGGER.info(
             "Cycle terminé pour '%s' - Durée: %.1f min, Énergie: %.3f kWh, Coût: %.2f €",
@@ -427,15 +857,13 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
             self.monthly_stats["total_cost"] = max(0, cost)
         
         # Ajouter à l'historique des cycles (toujours, pas seulement pour la détection d'anomalies)
-        self._cycle_history.append({
-            "duration": duration,
-            "energy": energy,
-            "cost": cost,
-            "timestamp": datetime.now(),
-        })
+        record = CycleRecord(duration=duration, energy=energy, cost=cost)
+        record.end_time = datetime.now()
+        self._cycle_history.append(record)
         # Limiter la taille de l'historique
         if len(self._cycle_history) > self._max_history_size:
             self._cycle_history.pop(0)
+        self.cycle_statistics.add_cycle(duration, energy)
         
         # Réinitialiser le timer d'auto-shutdown
         self._auto_shutdown_timer = None
@@ -444,25 +872,29 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
         self._energy_limit_cycle_notified = False
         
         # Émission d'un événement enrichi pour stockage Recorder
-        self.hass.bus.async_fire(
-            f"{DOMAIN}_cycle_finished",
-            {
-                "appliance_name": self.appliance_name,
-                "appliance_type": self.appliance_type,
-                "appliance_id": self.entry.entry_id,
-                "entry_id": self.entry.entry_id,
-                "duration": duration,
-                "energy": energy,
-                "cost": round(cost, 2),
-                "cost_per_kwh": round(price_kwh, 4),  # Prix final du kWh
-                "currency": self.currency,  # Devise utilisée
-                "peak_power": cycle.get("peak_power", 0),
-                "start_time": cycle.get("start_time").isoformat() if cycle.get("start_time") else None,
-                "end_time": cycle.get("end_time").isoformat() if cycle.get("end_time") else None,
-                "start_energy": cycle.get("start_energy", 0),
-                "end_energy": cycle.get("end_energy", 0),
-            },
-        )
+        cycle_data = {
+            "appliance_name": self.appliance_name,
+            "appliance_type": self.appliance_type,
+            "appliance_id": self.entry.entry_id,
+            "entry_id": self.entry.entry_id,
+            "duration": duration,
+            "energy": energy,
+            "cost": round(cost, 2),
+            "cost_per_kwh": round(price_kwh, 4),  # Prix moyen du kWh sur le cycle
+            "currency": self.currency,  # Devise utilisée
+            "peak_power": cycle.get("peak_power", 0),
+            "start_time": cycle.get("start_time").isoformat() if cycle.get("start_time") else None,
+            "end_time": cycle.get("end_time").isoformat() if cycle.get("end_time") else None,
+            "start_energy": cycle.get("start_energy", 0),
+            "end_energy": cycle.get("end_energy", 0),
+        }
+        self.hass.bus.async_fire(f"{DOMAIN}_cycle_finished", cycle_data)
+        
+        # Historique longue durée dans la base des cycles
+        cycle_store = self.hass.data.get(DOMAIN, {}).get("cycle_store")
+        if cycle_store is not None:
+            await cycle_store.async_add_cycle(self.entry.entry_id, cycle_data)
+        invalidate_history_cache(self.hass, self.entry.entry_id)
         
         # Envoyer une notification
         await self.notifier.notify_cycle_finished(
@@ -486,8 +918,8 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
                 self.async_trigger_ai_analysis()
             )
         
-        # Sauvegarder l'état
-        await self._save_state()
+        # Sauvegarder l'état immédiatement
+        await self._save_state("state", "stats", "history", "anomaly")
     
     async def _on_alert_duration(self) -> None:
         """Appelé lorsqu'une alerte de durée est déclenchée."""
@@ -535,11 +967,13 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
         if now.date() != self.daily_stats["date"]:
             _LOGGER.debug("Nouvelle journée détectée, réinitialisation des stats journalières")
             self.daily_stats = self._init_daily_stats()
+            self._schedule_save("stats")
         
         # Réinitialisation des stats mensuelles si nouveau mois
         if now.year != self.monthly_stats["year"] or now.month != self.monthly_stats["month"]:
             _LOGGER.debug("Nouveau mois détecté, réinitialisation des stats mensuelles")
             self.monthly_stats = self._init_monthly_stats()
+            self._schedule_save("stats")
     
     def reset_statistics(self) -> None:
         """Réinitialise toutes les statistiques."""
@@ -547,6 +981,7 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
         self.state_machine.reset_statistics()
         self.daily_stats = self._init_daily_stats()
         self.monthly_stats = self._init_monthly_stats()
+        self._schedule_save("state", "stats")
     
     async def set_monitoring_enabled(self, enabled: bool) -> None:
         """Active ou désactive la surveillance.
@@ -560,7 +995,7 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
             self.appliance_name,
         )
         self.monitoring_enabled = enabled
-        await self._save_state()
+        self._schedule_save("switches")
     
     async def set_notifications_enabled(self, enabled: bool) -> None:
         """Active ou désactive les notifications.
@@ -575,7 +1010,7 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
         )
         self.notifications_enabled = enabled
         self.notifier.set_enabled(enabled)
-        await self._save_state()
+        self._schedule_save("switches")
     
     def set_auto_shutdown_enabled(self, enabled: bool) -> None:
         """Active ou désactive l'extinction automatique."""
@@ -608,7 +1043,7 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
             self.appliance_name,
         )
         self.ai_analysis_enabled = enabled
-        await self._save_state()
+        self._schedule_save("switches")
     
     async def load_global_ai_config(self) -> None:
         """Load AI configuration and price configuration from global config."""
@@ -847,6 +1282,7 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
                 "status": STATE_ANALYZING,
                 "timestamp": datetime.now().isoformat(),
             }
+            self._changed_fields = None
             self.async_update_listeners()
             
             # Export data for AI analysis
@@ -869,8 +1305,8 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
             result["cycle_count_analyzed"] = cycle_count
             self.last_ai_analysis_result = result
             
-            # Save state immediately to persist the analysis result
-            await self._save_state()
+            # Persist the analysis result with the next coalesced write
+            self._schedule_save("ai")
             
             # Fire event
             self.hass.bus.fire(
@@ -967,7 +1403,10 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
     
     async def _check_anomaly_detection(self) -> None:
         """Vérifie s'il y a des anomalies dans le cycle en cours."""
-        if not self.anomaly_detection_enabled or len(self._cycle_history) < 3:
+        if (
+            not self.anomaly_detection_enabled
+            or self.cycle_statistics.count < MIN_CYCLES_FOR_SCORING
+        ):
             return
         
         # Vérifier seulement pendant un cycle
@@ -978,9 +1417,9 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
         current_duration = current_cycle.get("duration", 0)
         current_energy = current_cycle.get("energy", 0)
         
-        # Calculer moyennes de l'historique
-        avg_duration = sum(c["duration"] for c in self._cycle_history) / len(self._cycle_history)
-        avg_energy = sum(c["energy"] for c in self._cycle_history) / len(self._cycle_history)
+        # Moyennes des derniers cycles, maintenues à chaque fin de cycle
+        avg_duration = self.cycle_statistics.duration.mean
+        avg_energy = self.cycle_statistics.energy.mean
         
         # Détecter anomalies
         anomaly_detected = False
@@ -1000,55 +1439,49 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
         if anomaly_detected:
             await self._handle_event(EVENT_ANOMALY_DETECTED)
     
-    def _is_usage_allowed(self) -> bool:
-        """Vérifie si l'utilisation est autorisée selon la planification."""
-        now = datetime.now()
+    def _compile_schedule(self) -> WeeklySchedule:
+        """Compile les options de planification en table hebdomadaire.
         
-        # Vérifier jour bloqué
-        day_names = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-        current_day = day_names[now.weekday()]
-        if current_day in self.blocked_days:
-            return False
-        
-        # Vérifier horaires
-        current_time = now.time()
+        Returns:
+            Planning compilé, ou planning toujours autorisé si les options
+            sont invalides
+        """
         try:
-            start_time = datetime.strptime(self.allowed_hours_start, "%H:%M").time()
-            end_time = datetime.strptime(self.allowed_hours_end, "%H:%M").time()
-            
-            if start_time <= end_time:
-                # Plage normale (ex: 08:00 - 22:00)
-                return start_time <= current_time <= end_time
-            else:
-                # Plage traversant minuit (ex: 22:00 - 07:00)
-                return current_time >= start_time or current_time <= end_time
-        except ValueError:
-            _LOGGER.error("Format d'heure invalide: %s - %s", self.allowed_hours_start, self.allowed_hours_end)
-            return True
+            return WeeklySchedule.from_options(
+                self.allowed_hours_start,
+                self.allowed_hours_end,
+                self.blocked_days,
+                windows=self.allowed_windows,
+                overrides=self.schedule_overrides,
+            )
+        except (ValueError, TypeError, AttributeError):
+            _LOGGER.error(
+                "Planification invalide pour '%s': %s - %s, plages '%s', exceptions '%s'",
+                self.appliance_name,
+                self.allowed_hours_start,
+                self.allowed_hours_end,
+                self.allowed_windows,
+                self.schedule_overrides,
+            )
+            return WeeklySchedule.always()
+    
+    def _is_usage_allowed(self) -> bool:
+        """Vérifie si l'utilisation est autorisée selon la planification."""
+        return self.schedule.is_allowed(datetime.now())
     
     def get_anomaly_score(self) -> float:
         """Calcule un score d'anomalie (0-100)."""
-        if not self.anomaly_detection_enabled or len(self._cycle_history) < 3:
+        if not self.anomaly_detection_enabled:
             return 0
         
         if self.state_machine.state != "running" or not self.state_machine.current_cycle:
             return 0
         
         current_cycle = self.state_machine.current_cycle
-        current_duration = current_cycle.get("duration", 0)
-        current_energy = current_cycle.get("energy", 0)
-        
-        # Calculer moyennes
-        avg_duration = sum(c["duration"] for c in self._cycle_history) / len(self._cycle_history)
-        avg_energy = sum(c["energy"] for c in self._cycle_history) / len(self._cycle_history)
-        
-        # Calculer les écarts en pourcentage
-        duration_deviation = abs(current_duration - avg_duration) / avg_duration if avg_duration > 0 else 0
-        energy_deviation = abs(current_energy - avg_energy) / avg_energy if avg_energy > 0 else 0
-        
-        # Score basé sur les écarts (max 100)
-        score = min(100, (duration_deviation + energy_deviation) * 50)
-        return round(score, 1)
+        return self.cycle_statistics.score(
+            current_cycle.get("duration", 0),
+            current_cycle.get("energy", 0),
+        )
     
     async def _on_auto_shutdown(self) -> None:
         """Appelé lorsque l'extinction automatique se déclenche."""
@@ -1171,10 +1604,16 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
         """Récupère le prix actuel du kWh depuis la config globale.
         
         Utilise global_price_entity si configurée, sinon global_price_fixed.
+        Le prix mis en cache par le service de prix partagé est utilisé en
+        priorité ; la lecture directe ne sert qu'en son absence.
         
         Returns:
             Prix du kWh
         """
+        price_service = self.hass.data.get(DOMAIN, {}).get("price_service")
+        if price_service is not None:
+            return price_service.current_price
+        
         price_entity = self._global_price_config.get("global_price_entity")
         price_fixed = self._global_price_config.get("global_price_fixed", DEFAULT_PRICE_KWH)
         
@@ -1198,27 +1637,84 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
         """Propriété pour accéder au prix actuel."""
         return self._get_current_price()
     
-    async def _save_state(self) -> None:
-        """Sauvegarde l'état actuel dans le stockage persistant."""
-        try:
-            # Préparer les données à sauvegarder
-            data = {
+    def _serialize_section(self, section: str) -> dict[str, Any]:
+        """Sérialise une section du stockage persistant."""
+        if section == "state":
+            return {
                 "state": self.state_machine.state,
                 "current_cycle": self._serialize_cycle(self.state_machine.current_cycle),
                 "last_cycle": self._serialize_cycle(self.state_machine.last_cycle),
+            }
+        if section == "stats":
+            return {
                 "daily_stats": self._serialize_stats(self.daily_stats),
-                "monthly_stats": self.monthly_stats,
+                "monthly_stats": dict(self.monthly_stats),
+            }
+        if section == "history":
+            return {
                 "cycle_history": [
                     self._serialize_cycle(cycle) for cycle in self._cycle_history
                 ],
+            }
+        if section == "anomaly":
+            return {"cycle_statistics": self.cycle_statistics.as_dict()}
+        if section == "switches":
+            return {
                 "monitoring_enabled": self.monitoring_enabled,
                 "notifications_enabled": self.notifications_enabled,
-                "notification_type_switches": self.notifier.notification_type_switches,
+                "notification_type_switches": dict(
+                    self.notifier.notification_type_switches
+                ),
                 "ai_analysis_enabled": self.ai_analysis_enabled,
-                "last_ai_analysis_result": self.last_ai_analysis_result,
             }
-            
-            await self._store.async_save(data)
+        return {"last_ai_analysis_result": self.last_ai_analysis_result}
+    
+    def _data_to_save(self) -> dict[str, Any]:
+        """Construit les données à écrire en ne resérialisant que les sections modifiées."""
+        self.instrumentation.increment(COUNTER_STORE_FLUSHES)
+        self._save_pending = False
+        for section in self._dirty_sections:
+            self._section_cache[section] = self._serialize_section(section)
+        self._dirty_sections.clear()
+        
+        data: dict[str, Any] = {}
+        for section in STORAGE_SECTIONS:
+            data.update(self._section_cache.get(section, {}))
+        return data
+    
+    @callback
+    def _schedule_save(self, *sections: str) -> None:
+        """Marque des sections comme modifiées et programme une écriture groupée.
+        
+        Store.async_delay_save reporte l'écriture à chaque appel : elle n'est
+        donc programmée que si aucune n'est en attente, pour que l'état d'un
+        cycle en cours soit écrit au plus tard STORAGE_SAVE_DELAY secondes
+        après sa première modification. Home Assistant écrit les données en
+        attente à l'arrêt.
+        
+        Args:
+            sections: Sections modifiées (toutes si aucune n'est indiquée)
+        """
+        self._dirty_sections.update(sections or STORAGE_SECTIONS)
+        self.instrumentation.increment(COUNTER_SAVES_SCHEDULED)
+        if self._save_pending:
+            return
+        self._save_pending = True
+        self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+    
+    async def _save_state(self, *sections: str) -> None:
+        """Sauvegarde immédiatement l'état dans le stockage persistant.
+        
+        Réservé aux changements importants (début/fin de cycle, arrêt) ; les
+        autres modifications passent par _schedule_save.
+        
+        Args:
+            sections: Sections modifiées (toutes si aucune n'est indiquée)
+        """
+        try:
+            with self.instrumentation.measure(STAGE_SAVE):
+                self._dirty_sections.update(sections or STORAGE_SECTIONS)
+                await self._store.async_save(self._data_to_save())
             _LOGGER.debug("État sauvegardé pour '%s'", self.appliance_name)
             
         except Exception as err:
@@ -1228,6 +1724,14 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
                 err,
             )
     
+    async def async_shutdown(self) -> None:
+        """Arrête le coordinator et écrit les modifications en attente."""
+        await super().async_shutdown()
+        self.async_stop_event_tracking()
+        
+        if self._dirty_sections:
+            await self._save_state(*self._dirty_sections)
+    
     async def restore_state(self) -> None:
         """Restaure l'état depuis le stockage persistant."""
         try:
@@ -1302,9 +1806,20 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
             # Restaurer l'historique des cycles
             saved_history = data.get("cycle_history", [])
             self._cycle_history = [
-                self._deserialize_cycle(cycle) for cycle in saved_history
+                record
+                for record in map(self._deserialize_cycle, saved_history)
+                if record is not None
             ]
             
+            # Restaurer les statistiques de cycles (reconstruites depuis
+            # l'historique pour les données enregistrées avant leur ajout ou
+            # avec les anciens agrégats sur tous les cycles)
+            saved_cycle_statistics = data.get("cycle_statistics") or {}
+            if "cycles" in saved_cycle_statistics:
+                self.cycle_statistics = CycleStatistics.from_dict(saved_cycle_statistics)
+            else:
+                self.cycle_statistics = CycleStatistics.from_history(self._cycle_history)
+            
             # Restaurer les switches
             self.monitoring_enabled = data.get("monitoring_enabled", True)
             self.notifications_enabled = data.get("notifications_enabled", True)
@@ -1338,40 +1853,25 @@ class SmartApplianceCoordinator(DataUpdateCoordinator):
                 err,
             )
     
-    def _serialize_cycle(self, cycle: dict[str, Any] | None) -> dict[str, Any] | None:
-        """Sérialise un cycle pour le stockage JSON."""
+    @staticmethod
+    def _serialize_cycle(cycle: CycleRecord | dict[str, Any] | None) -> tuple | None:
+        """Sérialise un cycle pour le stockage JSON (tuple compact du CycleRecord)."""
         if cycle is None:
             return None
-        
-        serialized = cycle.copy()
-        
-        # Convertir les datetime en ISO format
-        for key in ["start_time", "end_time", "timestamp"]:
-            if key in serialized and isinstance(serialized[key], datetime):
-                serialized[key] = serialized[key].isoformat()
-        
-        return serialized
+        return CycleRecord.coerce(cycle).to_tuple()
     
-    def _deserialize_cycle(self, cycle: dict[str, Any] | None) -> dict[str, Any] | None:
-        """Désérialise un cycle depuis le stockage JSON."""
-        if cycle is None:
+    def _deserialize_cycle(self, cycle: list[Any] | dict[str, Any] | None) -> CycleRecord | None:
+        """Désérialise un cycle stocké en tuple compact ou en dictionnaire (anciennes versions)."""
+        try:
+            return CycleRecord.coerce(cycle)
+        except (ValueError, TypeError) as err:
+            _LOGGER.warning(
+                "Impossible de désérialiser le cycle %s pour '%s': %s",
+                cycle,
+                self.appliance_name,
+                err,
+            )
             return None
-        
-        deserialized = cycle.copy()
-        
-        # Convertir les chaînes ISO en datetime
-        for key in ["start_time", "end_time", "timestamp"]:
-            if key in deserialized and isinstance(deserialized[key], str):
-                try:
-                    deserialized[key] = datetime.fromisoformat(deserialized[key])
-                except (ValueError, TypeError):
-                    _LOGGER.warning(
-                        "Impossible de désérialiser la date '%s': %s",
-                        key,
-                        deserialized[key],
-                    )
-        
-        return deserialized
     
     def _serialize_stats(self, stats: dict[str, Any]) -> dict[str, Any]:
         """Sérialise les statistiques pour le stockage JSON."""
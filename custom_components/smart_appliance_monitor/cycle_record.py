@@ -0,0 +1,401 @@
+"""Compact cycle records for Smart Appliance Monitor.
+
+Every cycle, running or finished, live or imported, held in memory or read
+from the cycle store, is one CycleRecord: a slotted object with epoch-second
+timestamps instead of a free-form dict. Records can be read like the dicts
+they replace (cycle["energy"], cycle.get("start_time"), dict(cycle)), the
+timestamps being returned as datetimes, and are persisted as compact tuples.
+
+A cycle recorded live also keeps its power curve in a PowerProfile: a
+fixed-size float32 buffer whose resolution is halved whenever it fills up,
+so a cycle of any length fits in PROFILE_SIZE points.
+"""
+from __future__ import annotations
+
+import base64
+import sys
+from array import array
+from collections.abc import Iterator, Mapping
+from datetime import UTC, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any
+
+CYCLE_SOURCE_LIVE = "live"
+CYCLE_SOURCE_IMPORT = "import"
+# Imported from long-term statistics, with hourly or 5-minute precision
+CYCLE_SOURCE_STATISTICS = "statistics"
+
+# Points of a power profile, and seconds per point until it first fills up
+PROFILE_SIZE = 256
+PROFILE_STEP = 10
+
+# Fields of the compact tuple, in order; new fields are only ever appended
+# so that tuples stored by older versions still load
+RECORD_FIELDS = (
+    "start_ts",
+    "end_ts",
+    "duration",
+    "energy",
+    "cost",
+    "peak_power",
+    "start_energy",
+    "end_energy",
+    "cost_energy",
+    "cost_ts",
+    "appliance_name",
+    "appliance_type",
+    "source",
+    "utc_offset",
+    "profile",
+)
+
+# Keys read and written as datetimes, with the timestamp field behind each
+_DATETIME_KEYS = {"start_time": "start_ts", "end_time": "end_ts", "timestamp": "end_ts"}
+# Keys of the former cycle dicts stored in a field of another name
+_RENAMED_KEYS = {"cost_timestamp": "cost_ts"}
+_VALUE_FIELDS = frozenset(RECORD_FIELDS) - {"start_ts", "end_ts", "utc_offset", "profile"}
+
+# Keys listed when a record is iterated, for those that are set
+_KEYS = (
+    "start_time",
+    "end_time",
+    "duration",
+    "energy",
+    "cost",
+    "peak_power",
+    "start_energy",
+    "end_energy",
+    "cost_energy",
+    "cost_timestamp",
+    "appliance_name",
+    "appliance_type",
+    "power_profile",
+)
+
+
+@lru_cache(maxsize=64)
+def _timezone(utc_offset: float) -> timezone:
+    """Return the fixed timezone of an UTC offset in seconds."""
+    if not utc_offset:
+        return UTC
+    return timezone(timedelta(seconds=utc_offset))
+
+
+def _to_datetime(timestamp: float | None, utc_offset: float | None) -> datetime | None:
+    """Convert an epoch timestamp to a naive local or an aware datetime."""
+    if timestamp is None:
+        return None
+    if utc_offset is None:
+        return datetime.fromtimestamp(timestamp)
+    return datetime.fromtimestamp(timestamp, _timezone(utc_offset))
+
+
+def _from_datetime(value: datetime | str | float | None) -> tuple[float | None, float | None]:
+    """Convert a datetime, ISO string or epoch value to (timestamp, UTC offset).
+
+    The offset is None for naive datetimes, which are read back as naive
+    local datetimes.
+    """
+    if value is None:
+        return None, None
+    if isinstance(value, (int, float)):
+        return float(value), None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    offset = value.utcoffset()
+    return value.timestamp(), None if offset is None else offset.total_seconds()
+
+
+class PowerProfile:
+    """Downsampled power curve of a cycle.
+
+    Each point holds the energy (W.s) consumed during PROFILE_STEP seconds,
+    the power being held between two samples. When the buffer is full,
+    adjacent points are merged and the step doubles, so the whole cycle is
+    always covered with a bounded memory of PROFILE_SIZE float32 values.
+    """
+
+    __slots__ = ("_sums", "length", "offset", "power", "step")
+
+    def __init__(self, step: float = PROFILE_STEP) -> None:
+        """Initialize an empty profile."""
+        self.step = step
+        # Points used, seconds covered and power of the last sample
+        self.length = 0
+        self.offset = 0.0
+        self.power: float | None = None
+        self._sums = array("f", bytes(4 * PROFILE_SIZE))
+
+    def add(self, power: float, offset: float) -> None:
+        """Add a power sample taken offset seconds after the cycle start."""
+        if self.power is not None and offset > self.offset:
+            self._integrate(self.power, self.offset, offset)
+            self.offset = offset
+        self.power = power
+
+    def _integrate(self, power: float, start: float, end: float) -> None:
+        """Add a constant power between two offsets to the points it spans."""
+        sums = self._sums
+        while start < end:
+            index = int(start // self.step)
+            if index >= PROFILE_SIZE:
+                self._fold()
+                continue
+            stop = min((index + 1) * self.step, end)
+            sums[index] += power * (stop - start)
+            self.length = index + 1
+            start = stop
+
+    def _fold(self) -> None:
+        """Halve the resolution: merge adjacent points and double the step."""
+        sums = self._sums
+        half = PROFILE_SIZE // 2
+        sums[:half] = array("f", map(float.__add__, sums[0::2], sums[1::2]))
+        sums[half:] = array("f", bytes(4 * half))
+        self.length = (self.length + 1) // 2
+        self.step *= 2
+
+    def values(self) -> list[float]:
+        """Return the mean power (W) of each point, the last one possibly partial."""
+        step = self.step
+        values = [round(total / step, 1) for total in self._sums[: self.length]]
+        if values:
+            covered = self.offset - (self.length - 1) * step
+            if 0 < covered < step:
+                values[-1] = round(self._sums[self.length - 1] / covered, 1)
+        return values
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the profile for attributes and exports."""
+        return {"step": self.step, "values": self.values()}
+
+    def to_compact(self) -> list[Any]:
+        """Return the profile as [step, offset, power, base64 little-endian float32]."""
+        sums = self._sums[: self.length]
+        if sys.byteorder == "big":
+            sums.byteswap()
+        return [self.step, self.offset, self.power, base64.b64encode(sums.tobytes()).decode()]
+
+    @classmethod
+    def from_compact(cls, values: list[Any]) -> PowerProfile:
+        """Build a profile from the list returned by to_compact()."""
+        step, offset, power, encoded = values
+        sums = array("f", base64.b64decode(encoded))
+        if sys.byteorder == "big":
+            sums.byteswap()
+        profile = cls(step)
+        profile.offset = offset
+        profile.power = power
+        profile.length = len(sums)
+        profile._sums[: len(sums)] = sums
+        return profile
+
+
+class CycleRecord(Mapping):
+    """One appliance cycle.
+
+    Missing values are None: a running cycle has no end_ts, duration or
+    energy yet, and a cycle without cost tracking has no cost. They are
+    absent from the mapping view, as they were from the cycle dicts.
+    """
+
+    __slots__ = RECORD_FIELDS
+
+    def __init__(
+        self,
+        start_ts: float | None = None,
+        end_ts: float | None = None,
+        duration: float | None = None,
+        energy: float | None = None,
+        cost: float | None = None,
+        peak_power: float | None = None,
+        start_energy: float | None = None,
+        end_energy: float | None = None,
+        cost_energy: float | None = None,
+        cost_ts: float | None = None,
+        appliance_name: str | None = None,
+        appliance_type: str | None = None,
+        source: str = CYCLE_SOURCE_LIVE,
+        utc_offset: float | None = None,
+        profile: PowerProfile | None = None,
+    ) -> None:
+        """Initialize the record (arguments in the RECORD_FIELDS order)."""
+        self.start_ts = start_ts
+        self.end_ts = end_ts
+        self.duration = duration
+        self.energy = energy
+        self.cost = cost
+        self.peak_power = peak_power
+        self.start_energy = start_energy
+        self.end_energy = end_energy
+        self.cost_energy = cost_energy
+        self.cost_ts = cost_ts
+        self.appliance_name = appliance_name
+        self.appliance_type = appliance_type
+        self.source = source
+        self.utc_offset = utc_offset
+        self.profile = profile
+
+    @property
+    def start_time(self) -> datetime | None:
+        """Start of the cycle."""
+        return _to_datetime(self.start_ts, self.utc_offset)
+
+    @start_time.setter
+    def start_time(self, value: datetime | str | float | None) -> None:
+        self.start_ts, offset = _from_datetime(value)
+        if isinstance(value, datetime):
+            self.utc_offset = offset
+
+    @property
+    def end_time(self) -> datetime | None:
+        """End of the cycle, None while it runs."""
+        return _to_datetime(self.end_ts, self.utc_offset)
+
+    @end_time.setter
+    def end_time(self, value: datetime | str | float | None) -> None:
+        self.end_ts, offset = _from_datetime(value)
+        if isinstance(value, datetime):
+            self.utc_offset = offset
+
+    @property
+    def imported(self) -> bool:
+        """Whether the cycle was imported rather than recorded live."""
+        return self.source != CYCLE_SOURCE_LIVE
+
+    @property
+    def low_precision(self) -> bool:
+        """Whether the cycle was approximated from long-term statistics."""
+        return self.source == CYCLE_SOURCE_STATISTICS
+
+    def _lookup(self, key: str) -> Any:
+        """Return the value of a key of the mapping view, None if unset."""
+        field = _DATETIME_KEYS.get(key)
+        if field is not None:
+            return _to_datetime(getattr(self, field), self.utc_offset)
+        if key == "imported":
+            return self.imported
+        if key == "low_precision":
+            return self.low_precision
+        if key == "power_profile":
+            return self.profile.as_dict() if self.profile is not None else None
+        field = _RENAMED_KEYS.get(key, key)
+        if field in _VALUE_FIELDS:
+            return getattr(self, field)
+        return None
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._lookup(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._lookup(key)
+        return default if value is None else value
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._lookup(key) is not None
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in _DATETIME_KEYS:
+            setattr(self, "start_time" if key == "start_time" else "end_time", value)
+            return
+        field = _RENAMED_KEYS.get(key, key)
+        if field not in _VALUE_FIELDS:
+            raise KeyError(key)
+        setattr(self, field, value)
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key in _KEYS if self._lookup(key) is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _key in self)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{field}={getattr(self, field)!r}"
+            for field in RECORD_FIELDS
+            if getattr(self, field) is not None
+        )
+        return f"CycleRecord({fields})"
+
+    def copy(self) -> CycleRecord:
+        """Return a copy of the record, sharing its power profile."""
+        return CycleRecord(*self._values())
+
+    def to_tuple(self) -> tuple[Any, ...]:
+        """Return the compact tuple of the record, in the RECORD_FIELDS order."""
+        values = self._values()
+        if self.profile is None:
+            return values[:-1]
+        return (*values[:-1], self.profile.to_compact())
+
+    def _values(self) -> tuple[Any, ...]:
+        """Return the values of the fields, in the RECORD_FIELDS order."""
+        return (
+            self.start_ts,
+            self.end_ts,
+            self.duration,
+            self.energy,
+            self.cost,
+            self.peak_power,
+            self.start_energy,
+            self.end_energy,
+            self.cost_energy,
+            self.cost_ts,
+            self.appliance_name,
+            self.appliance_type,
+            self.source,
+            self.utc_offset,
+            self.profile,
+        )
+
+    @classmethod
+    def from_tuple(cls, values: tuple[Any, ...] | list[Any]) -> CycleRecord:
+        """Build a record from a tuple returned by to_tuple() (or its JSON list)."""
+        if len(values) < len(RECORD_FIELDS) or values[-1] is None:
+            return cls(*values)
+        return cls(*values[:-1], PowerProfile.from_compact(values[-1]))
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> CycleRecord:
+        """Build a record from a cycle dict (stored by older versions, event data).
+
+        Timestamps may be datetimes, ISO strings or epoch values; the end
+        defaults to the "timestamp" key used by the former cycle history.
+        """
+        record = cls()
+        for key, value in data.items():
+            if value is None or key == "timestamp":
+                continue
+            if key in _DATETIME_KEYS or _RENAMED_KEYS.get(key, key) in _VALUE_FIELDS:
+                record[key] = value
+        if record.end_ts is None and data.get("timestamp") is not None:
+            record.end_time = data["timestamp"]
+        if data.get("low_precision"):
+            record.source = CYCLE_SOURCE_STATISTICS
+        elif data.get("imported"):
+            record.source = CYCLE_SOURCE_IMPORT
+        return record
+
+    @classmethod
+    def coerce(cls, value: Any) -> CycleRecord | None:
+        """Return a record from a record, a compact tuple or a cycle dict."""
+        if value is None or isinstance(value, CycleRecord):
+            return value
+        if isinstance(value, (list, tuple)):
+            return cls.from_tuple(value)
+        return cls.from_dict(value)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the record as a JSON-ready dict, timestamps in ISO format."""
+        data = {
+            key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in self.items()
+        }
+        if self.end_ts is not None:
+            data["timestamp"] = data["end_time"]
+        data["imported"] = self.imported
+        data["low_precision"] = self.low_precision
+        return data
@@ -0,0 +1,838 @@
+"""Compact cycle store for Smart Appliance Monitor.
+
+Finished cycles are kept in a small SQLite database in the configuration
+directory, independent of the Recorder purge. Each cycle is one row with
+typed numeric columns, keyed by (appliance_id, start_ts), so history
+queries are indexed range scans instead of JSON parsing of Recorder events.
+
+Daily, monthly and yearly rollups of the cycles are maintained alongside,
+so statistics over long periods combine a bounded number of buckets.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import logging
+import sqlite3
+import threading
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .cycle_record import CYCLE_SOURCE_LIVE, CycleRecord
+
+_LOGGER = logging.getLogger(__name__)
+
+CYCLE_STORE_FILENAME = "smart_appliance_monitor_cycles.db"
+
+# Page sizes of the paginated history
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+ORDER_DESC = "desc"
+ORDER_ASC = "asc"
+
+# Cycles of an appliance never overlap: a cycle overlapping a stored one is
+# the same cycle (e.g. recorded live, then imported with start and end taken
+# from other samples). Stored cycles being disjoint, the only cycle started
+# before a new one that can overlap it is the last one.
+_OVERLAPPING = (
+    "SELECT start_ts, end_ts FROM cycles WHERE appliance_id = ?1 "
+    "AND start_ts BETWEEN ?2 AND ?3 AND (start_ts < ?3 OR start_ts = ?2) "
+    "UNION ALL SELECT * FROM (SELECT start_ts, end_ts FROM cycles "
+    "WHERE appliance_id = ?1 AND start_ts < ?2 ORDER BY start_ts DESC LIMIT 1) "
+    "WHERE end_ts > ?2"
+)
+
+ROLLUP_DAY = "day"
+ROLLUP_MONTH = "month"
+ROLLUP_YEAR = "year"
+# Each rollup is computed from the one before it (days from raw cycles)
+ROLLUP_GRANULARITIES = (ROLLUP_DAY, ROLLUP_MONTH, ROLLUP_YEAR)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS cycles (
+        appliance_id TEXT NOT NULL,
+        start_ts REAL NOT NULL,
+        end_ts REAL NOT NULL,
+        duration REAL NOT NULL,
+        energy REAL NOT NULL,
+        cost REAL NOT NULL,
+        peak_power REAL NOT NULL DEFAULT 0,
+        start_energy REAL NOT NULL DEFAULT 0,
+        end_energy REAL NOT NULL DEFAULT 0,
+        appliance_name TEXT,
+        appliance_type TEXT,
+        source TEXT NOT NULL DEFAULT 'live',
+        PRIMARY KEY (appliance_id, start_ts)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS cycles_end ON cycles (appliance_id, end_ts)",
+    """
+    CREATE TABLE IF NOT EXISTS rollups (
+        appliance_id TEXT NOT NULL,
+        granularity TEXT NOT NULL,
+        bucket_start REAL NOT NULL,
+        cycle_count INTEGER NOT NULL,
+        energy REAL NOT NULL,
+        cost REAL NOT NULL,
+        duration REAL NOT NULL,
+        energy_sumsq REAL NOT NULL,
+        duration_sumsq REAL NOT NULL,
+        min_energy REAL,
+        max_energy REAL,
+        min_duration REAL,
+        max_duration REAL,
+        PRIMARY KEY (appliance_id, granularity, bucket_start)
+    ) WITHOUT ROWID
+    """,
+    # Where the incremental import of each appliance stopped, with the
+    # detector state needed to complete a cycle running at that time
+    """
+    CREATE TABLE IF NOT EXISTS import_watermarks (
+        appliance_id TEXT PRIMARY KEY,
+        processed_until REAL NOT NULL,
+        detector_state TEXT NOT NULL
+    ) WITHOUT ROWID
+    """,
+)
+
+# Aggregates of raw cycles and of rollup buckets, in the TOTALS_FIELDS order
+_CYCLES_AGGREGATE = (
+    "SELECT COUNT(*), TOTAL(energy), TOTAL(cost), TOTAL(duration), "
+    "TOTAL(energy * energy), TOTAL(duration * duration), "
+    "MIN(energy), MAX(energy), MIN(duration), MAX(duration) FROM cycles"
+)
+_ROLLUPS_AGGREGATE = (
+    "SELECT TOTAL(cycle_count), TOTAL(energy), TOTAL(cost), TOTAL(duration), "
+    "TOTAL(energy_sumsq), TOTAL(duration_sumsq), "
+    "MIN(min_energy), MAX(max_energy), MIN(min_duration), MAX(max_duration) "
+    "FROM rollups"
+)
+
+TOTALS_FIELDS = (
+    "count",
+    "energy",
+    "cost",
+    "duration",
+    "energy_sumsq",
+    "duration_sumsq",
+    "min_energy",
+    "max_energy",
+    "min_duration",
+    "max_duration",
+)
+
+_COLUMNS = (
+    "appliance_id",
+    "start_ts",
+    "end_ts",
+    "duration",
+    "energy",
+    "cost",
+    "peak_power",
+    "start_energy",
+    "end_energy",
+    "appliance_name",
+    "appliance_type",
+    "source",
+)
+
+
+def encode_cursor(end_ts: float, start_ts: float, order: str) -> str:
+    """Encode the position after a cycle into an opaque cursor."""
+    return base64.urlsafe_b64encode(
+        json.dumps([end_ts, start_ts, order]).encode()
+    ).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[float, float, str]:
+    """Decode a cursor created by encode_cursor().
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        end_ts, start_ts, order = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(end_ts), float(start_ts), str(order)
+    except (TypeError, ValueError) as err:
+        raise ValueError(f"Invalid cursor: {cursor}") from err
+
+
+def _local(when: datetime) -> datetime:
+    """Return a naive local datetime, buckets being aligned on local time."""
+    if when.tzinfo is None:
+        return when
+    return datetime.fromtimestamp(when.timestamp())
+
+
+def bucket_start(when: datetime, granularity: str) -> datetime:
+    """Return the start of the rollup bucket containing a local datetime."""
+    if granularity == ROLLUP_DAY:
+        return when.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == ROLLUP_MONTH:
+        return datetime(when.year, when.month, 1)
+    return datetime(when.year, 1, 1)
+
+
+def bucket_end(start: datetime, granularity: str) -> datetime:
+    """Return the end (exclusive) of the rollup bucket starting at start."""
+    if granularity == ROLLUP_DAY:
+        return bucket_start(start, ROLLUP_DAY) + timedelta(days=1)
+    if granularity == ROLLUP_MONTH:
+        if start.month == 12:
+            return datetime(start.year + 1, 1, 1)
+        return datetime(start.year, start.month + 1, 1)
+    return datetime(start.year + 1, 1, 1)
+
+
+def split_period(
+    period_start: datetime, period_end: datetime
+) -> list[tuple[str | None, datetime, datetime]]:
+    """Split a period into whole rollup buckets and raw edges.
+
+    Returns:
+        Contiguous (granularity, start, end) pieces, granularity being None
+        for the partial days at the edges. Consecutive buckets of the same
+        granularity are merged, so a period of any length gives at most
+        seven pieces.
+    """
+    pieces: list[tuple[str | None, datetime, datetime]] = []
+    cursor = period_start
+    while cursor < period_end:
+        for granularity in reversed(ROLLUP_GRANULARITIES):
+            if bucket_start(cursor, granularity) != cursor:
+                continue
+            end = bucket_end(cursor, granularity)
+            if end <= period_end:
+                break
+        else:
+            granularity = None
+            end = min(
+                bucket_end(bucket_start(cursor, ROLLUP_DAY), ROLLUP_DAY), period_end
+            )
+
+        if pieces and pieces[-1][0] == granularity:
+            pieces[-1] = (granularity, pieces[-1][1], end)
+        else:
+            pieces.append((granularity, cursor, end))
+        cursor = end
+    return pieces
+
+
+def empty_totals() -> dict[str, Any]:
+    """Return the totals of an empty set of cycles."""
+    return dict.fromkeys(TOTALS_FIELDS, None) | {
+        "count": 0,
+        "energy": 0.0,
+        "cost": 0.0,
+        "duration": 0.0,
+        "energy_sumsq": 0.0,
+        "duration_sumsq": 0.0,
+    }
+
+
+def merge_totals(totals: dict[str, Any], other: dict[str, Any]) -> dict[str, Any]:
+    """Combine the totals of two disjoint sets of cycles."""
+    merged = empty_totals()
+    for field in ("count", "energy", "cost", "duration", "energy_sumsq", "duration_sumsq"):
+        merged[field] = totals[field] + other[field]
+    for field, pick in (
+        ("min_energy", min),
+        ("max_energy", max),
+        ("min_duration", min),
+        ("max_duration", max),
+    ):
+        values = [value for value in (totals[field], other[field]) if value is not None]
+        merged[field] = pick(values) if values else None
+    return merged
+
+
+def totals_from_cycles(cycles: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    """Compute the totals of a list of cycles."""
+    totals = empty_totals()
+    for cycle in cycles:
+        energy = cycle.get("energy", 0)
+        duration = cycle.get("duration", 0)
+        totals = merge_totals(
+            totals,
+            {
+                "count": 1,
+                "energy": energy,
+                "cost": cycle.get("cost", 0),
+                "duration": duration,
+                "energy_sumsq": energy * energy,
+                "duration_sumsq": duration * duration,
+                "min_energy": energy,
+                "max_energy": energy,
+                "min_duration": duration,
+                "max_duration": duration,
+            },
+        )
+    return totals
+
+
+def _row_to_totals(row: tuple[Any, ...] | None) -> dict[str, Any]:
+    """Convert an aggregate row to totals."""
+    if row is None or not row[0]:
+        return empty_totals()
+    totals = dict(zip(TOTALS_FIELDS, row))
+    totals["count"] = int(totals["count"])
+    return totals
+
+
+class CycleStore:
+    """SQLite store of the finished cycles of every appliance.
+
+    The connection is shared by all appliances; queries run in the executor
+    and are serialised by a lock.
+    """
+
+    def __init__(self, hass: HomeAssistant, path: str | None = None) -> None:
+        """Initialize the store.
+
+        Args:
+            hass: Home Assistant instance
+            path: Database file (default: CYCLE_STORE_FILENAME in the config dir)
+        """
+        self.hass = hass
+        self.path = path or hass.config.path(CYCLE_STORE_FILENAME)
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    async def async_setup(self) -> None:
+        """Open the database and create the schema."""
+        await self.hass.async_add_executor_job(self._setup)
+
+    def _setup(self) -> None:
+        """Open the database (executor).
+
+        The rollups table is created with the cycles table and kept up to
+        date by every write, so it never needs to be rebuilt on open.
+        """
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            connection.execute(statement)
+        connection.commit()
+        self._connection = connection
+
+    async def async_close(self) -> None:
+        """Close the database."""
+        await self.hass.async_add_executor_job(self._close)
+
+    def _close(self) -> None:
+        """Close the database (executor)."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    async def async_add_cycle(
+        self,
+        appliance_id: str,
+        cycle: CycleRecord | dict[str, Any],
+        source: str = CYCLE_SOURCE_LIVE,
+    ) -> int:
+        """Store a finished cycle.
+
+        Args:
+            appliance_id: Entry ID of the appliance
+            cycle: Cycle record, or cycle data as fired in the cycle_finished event
+            source: CYCLE_SOURCE_LIVE, CYCLE_SOURCE_IMPORT or CYCLE_SOURCE_STATISTICS
+
+        Returns:
+            Number of cycles written
+        """
+        return await self.async_add_cycles(appliance_id, [cycle], source)
+
+    async def async_add_cycles(
+        self,
+        appliance_id: str,
+        cycles: Iterable[CycleRecord | dict[str, Any]],
+        source: str = CYCLE_SOURCE_LIVE,
+        replace: bool = True,
+    ) -> int:
+        """Store finished cycles, replacing the stored cycles they overlap.
+
+        Args:
+            appliance_id: Entry ID of the appliance
+            cycles: Cycles with start_time/end_time (datetime or ISO string),
+                duration, energy, cost and optional peak/energy readings
+            source: CYCLE_SOURCE_LIVE, CYCLE_SOURCE_IMPORT or CYCLE_SOURCE_STATISTICS
+            replace: If False, cycles overlapping a stored cycle are skipped
+                instead of replacing it
+
+        Returns:
+            Number of cycles written, duplicates skipped included
+        """
+        rows = self._cycles_to_rows(appliance_id, cycles, source)
+        if not rows:
+            return 0
+        return await self.hass.async_add_executor_job(
+            self._write_batches, {appliance_id: rows}, None, replace
+        )
+
+    async def async_add_cycles_bulk(
+        self,
+        cycles_by_appliance: dict[str, Iterable[CycleRecord | dict[str, Any]]],
+        source: str = CYCLE_SOURCE_LIVE,
+        watermarks: dict[str, tuple[datetime, dict[str, Any]]] | None = None,
+        replace: bool = True,
+    ) -> int:
+        """Store the cycles of several appliances in a single transaction.
+
+        Args:
+            cycles_by_appliance: Cycles to store, by appliance entry ID
+            source: CYCLE_SOURCE_LIVE, CYCLE_SOURCE_IMPORT or CYCLE_SOURCE_STATISTICS
+            watermarks: Import watermarks (processed_until, detector state)
+                to save in the same transaction, by appliance entry ID
+            replace: If False, cycles already stored are skipped (see async_add_cycles)
+
+        Returns:
+            Number of cycles written, duplicates skipped included
+        """
+        batches = {
+            appliance_id: rows
+            for appliance_id, cycles in cycles_by_appliance.items()
+            if (rows := self._cycles_to_rows(appliance_id, cycles, source))
+        }
+        if not batches and not watermarks:
+            return 0
+        return await self.hass.async_add_executor_job(
+            self._write_batches, batches, watermarks, replace
+        )
+
+    async def async_get_watermark(
+        self, appliance_id: str
+    ) -> tuple[datetime, dict[str, Any]] | None:
+        """Return where the incremental import of an appliance stopped.
+
+        Returns:
+            (processed_until, detector state), or None before the first
+            incremental import
+        """
+        rows = await self.hass.async_add_executor_job(
+            self._fetch,
+            "SELECT processed_until, detector_state FROM import_watermarks "
+            "WHERE appliance_id = ?",
+            (appliance_id,),
+        )
+        if not rows:
+            return None
+        try:
+            state = json.loads(rows[0][1])
+        except ValueError:
+            state = {}
+        return datetime.fromtimestamp(rows[0][0]), state
+
+    @staticmethod
+    def _cycles_to_rows(
+        appliance_id: str,
+        cycles: Iterable[CycleRecord | dict[str, Any]],
+        source: str,
+    ) -> list[tuple[Any, ...]]:
+        """Convert cycles (records or cycle dicts) to rows of the cycles table."""
+        rows = []
+        for cycle in map(CycleRecord.coerce, cycles):
+            if cycle.start_ts is None or cycle.end_ts is None:
+                continue
+            rows.append(
+                (
+                    appliance_id,
+                    cycle.start_ts,
+                    cycle.end_ts,
+                    cycle.duration or 0,
+                    cycle.energy or 0,
+                    cycle.cost or 0,
+                    cycle.peak_power or 0,
+                    cycle.start_energy or 0,
+                    cycle.end_energy or 0,
+                    cycle.appliance_name,
+                    cycle.appliance_type,
+                    source,
+                )
+            )
+        return rows
+
+    def _write_batches(
+        self,
+        batches: dict[str, list[tuple[Any, ...]]],
+        watermarks: dict[str, tuple[datetime, dict[str, Any]]] | None = None,
+        replace: bool = True,
+    ) -> int:
+        """Insert rows and refresh the rollups they fall in (executor).
+
+        Duplicates are the stored cycles a row overlaps (see _OVERLAPPING),
+        found with two primary key lookups per row: they are replaced, or
+        the row is skipped with replace=False.
+        """
+        insert = (
+            f"INSERT INTO cycles ({', '.join(_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in _COLUMNS)})"
+        )
+        count = sum(len(rows) for rows in batches.values())
+        skipped = 0
+        with self._lock:
+            if self._connection is None:
+                return 0
+            try:
+                with self._connection:
+                    for appliance_id, rows in batches.items():
+                        end_timestamps = []
+                        for row in rows:
+                            overlapping = self._connection.execute(
+                                _OVERLAPPING, (appliance_id, row[1], row[2])
+                            ).fetchall()
+                            if overlapping:
+                                if not replace:
+                                    skipped += 1
+                                    continue
+                                self._connection.executemany(
+                                    "DELETE FROM cycles WHERE appliance_id = ? AND start_ts = ?",
+                                    [(appliance_id, start_ts) for start_ts, _end in overlapping],
+                                )
+                                # Cycles being replaced may be in another bucket
+                                end_timestamps.extend(end_ts for _start, end_ts in overlapping)
+                            self._connection.execute(insert, row)
+                            end_timestamps.append(row[2])
+                        self._refresh_rollups(appliance_id, end_timestamps)
+                    self._connection.executemany(
+                        "INSERT OR REPLACE INTO import_watermarks VALUES (?, ?, ?)",
+                        [
+                            (appliance_id, processed_until.timestamp(), json.dumps(state))
+                            for appliance_id, (processed_until, state) in (
+                                watermarks or {}
+                            ).items()
+                        ],
+                    )
+            except sqlite3.Error as err:
+                _LOGGER.error("Error writing %d cycles to the cycle store: %s", count, err)
+                return 0
+        if skipped:
+            _LOGGER.debug("Skipped %d cycles already in the cycle store", skipped)
+        return count
+
+    def _refresh_rollups(self, appliance_id: str, end_timestamps: Iterable[float]) -> None:
+        """Recompute the rollup buckets containing the given cycle ends.
+
+        Days are recomputed from the raw cycles, months from their days and
+        years from their months, so a refresh only reads a bounded number of
+        rows. Must be called with the lock held, inside a transaction.
+        """
+        starts = {
+            bucket_start(datetime.fromtimestamp(ts), ROLLUP_DAY) for ts in end_timestamps
+        }
+        for granularity in ROLLUP_GRANULARITIES:
+            starts = {bucket_start(start, granularity) for start in starts}
+            for start in starts:
+                self._refresh_bucket(appliance_id, granularity, start)
+
+    def _refresh_bucket(self, appliance_id: str, granularity: str, start: datetime) -> None:
+        """Recompute one rollup bucket (lock held, inside a transaction)."""
+        end = bucket_end(start, granularity)
+        if granularity == ROLLUP_DAY:
+            row = self._connection.execute(
+                f"{_CYCLES_AGGREGATE} WHERE appliance_id = ? AND end_ts >= ? AND end_ts < ?",
+                (appliance_id, start.timestamp(), end.timestamp()),
+            ).fetchone()
+        else:
+            child = ROLLUP_GRANULARITIES[ROLLUP_GRANULARITIES.index(granularity) - 1]
+            row = self._connection.execute(
+                f"{_ROLLUPS_AGGREGATE} WHERE appliance_id = ? AND granularity = ? "
+                "AND bucket_start >= ? AND bucket_start < ?",
+                (appliance_id, child, start.timestamp(), end.timestamp()),
+            ).fetchone()
+
+        if not row[0]:
+            self._connection.execute(
+                "DELETE FROM rollups WHERE appliance_id = ? AND granularity = ? "
+                "AND bucket_start = ?",
+                (appliance_id, granularity, start.timestamp()),
+            )
+            return
+
+        self._connection.execute(
+            "INSERT OR REPLACE INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (appliance_id, granularity, start.timestamp(), *row),
+        )
+
+    async def async_delete_cycles(
+        self,
+        appliance_id: str,
+        period_start: datetime,
+        period_end: datetime,
+    ) -> int:
+        """Delete the cycles of an appliance started in a period.
+
+        Returns:
+            Number of cycles deleted
+        """
+        return await self.hass.async_add_executor_job(
+            self._delete_cycles,
+            appliance_id,
+            period_start.timestamp(),
+            period_end.timestamp(),
+        )
+
+    async def async_count_cycles(
+        self,
+        appliance_id: str,
+        period_start: datetime,
+        period_end: datetime,
+    ) -> int:
+        """Return the number of cycles of an appliance started in a period."""
+        rows = await self.hass.async_add_executor_job(
+            self._fetch,
+            "SELECT COUNT(*) FROM cycles "
+            "WHERE appliance_id = ? AND start_ts >= ? AND start_ts <= ?",
+            (appliance_id, period_start.timestamp(), period_end.timestamp()),
+        )
+        return rows[0][0] if rows else 0
+
+    def _delete_cycles(self, appliance_id: str, start_ts: float, end_ts: float) -> int:
+        """Delete cycles and refresh the rollups they were in (executor)."""
+        where = "WHERE appliance_id = ? AND start_ts >= ? AND start_ts <= ?"
+        params = (appliance_id, start_ts, end_ts)
+        with self._lock:
+            if self._connection is None:
+                return 0
+            with self._connection:
+                end_timestamps = [
+                    row[0]
+                    for row in self._connection.execute(
+                        f"SELECT end_ts FROM cycles {where}", params
+                    )
+                ]
+                self._connection.execute(f"DELETE FROM cycles {where}", params)
+                self._refresh_rollups(appliance_id, end_timestamps)
+        return len(end_timestamps)
+
+    async def async_get_cycles(
+        self,
+        appliance_id: str,
+        period_start: datetime,
+        period_end: datetime,
+        min_duration: float | None = None,
+        max_duration: float | None = None,
+        min_energy: float | None = None,
+        max_energy: float | None = None,
+        limit: int | None = None,
+    ) -> list[CycleRecord]:
+        """Return the cycles of an appliance finished in a period.
+
+        Args:
+            appliance_id: Entry ID of the appliance
+            period_start: Start of the period
+            period_end: End of the period
+            min_duration: Minimum cycle duration in minutes
+            max_duration: Maximum cycle duration in minutes
+            min_energy: Minimum energy consumption in kWh
+            max_energy: Maximum energy consumption in kWh
+            limit: Maximum number of results to return
+
+        Returns:
+            Cycle records, most recent first
+        """
+        conditions, params = self._filters(
+            appliance_id,
+            period_start,
+            period_end,
+            min_duration,
+            max_duration,
+            min_energy,
+            max_energy,
+        )
+        sql = (
+            f"SELECT {', '.join(_COLUMNS)} FROM cycles "
+            f"WHERE {' AND '.join(conditions)} ORDER BY end_ts DESC"
+        )
+        if limit is not None and limit > 0:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        rows = await self.hass.async_add_executor_job(self._fetch, sql, tuple(params))
+        return [self._row_to_cycle(row) for row in rows]
+
+    async def async_get_cycles_page(
+        self,
+        appliance_id: str,
+        period_start: datetime,
+        period_end: datetime,
+        min_duration: float | None = None,
+        max_duration: float | None = None,
+        min_energy: float | None = None,
+        max_energy: float | None = None,
+        order: str = ORDER_DESC,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+    ) -> tuple[list[CycleRecord], str | None]:
+        """Return one page of the cycles of an appliance finished in a period.
+
+        Pages are read with a keyset on (end_ts, start_ts), which the end
+        index covers, so reading any page costs the same whatever its
+        position in the history.
+
+        Args:
+            appliance_id: Entry ID of the appliance
+            period_start: Start of the period
+            period_end: End of the period
+            min_duration: Minimum cycle duration in minutes
+            max_duration: Maximum cycle duration in minutes
+            min_energy: Minimum energy consumption in kWh
+            max_energy: Maximum energy consumption in kWh
+            order: ORDER_DESC (most recent first) or ORDER_ASC
+            page_size: Number of cycles per page (at most MAX_PAGE_SIZE)
+            cursor: Cursor returned with the previous page
+
+        Returns:
+            Tuple (cycles, cursor of the next page or None on the last page)
+
+        Raises:
+            ValueError: If the order or the cursor is invalid
+        """
+        if order not in (ORDER_DESC, ORDER_ASC):
+            raise ValueError(f"Invalid order: {order}")
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+
+        conditions, params = self._filters(
+            appliance_id,
+            period_start,
+            period_end,
+            min_duration,
+            max_duration,
+            min_energy,
+            max_energy,
+        )
+        operator = "<" if order == ORDER_DESC else ">"
+        if cursor is not None:
+            end_ts, start_ts, cursor_order = decode_cursor(cursor)
+            if cursor_order != order:
+                raise ValueError("Cursor was created for another order")
+            conditions.append(
+                f"(end_ts {operator} ? OR (end_ts = ? AND start_ts {operator} ?))"
+            )
+            params.extend((end_ts, end_ts, start_ts))
+
+        direction = "DESC" if order == ORDER_DESC else "ASC"
+        sql = (
+            f"SELECT {', '.join(_COLUMNS)} FROM cycles "
+            f"WHERE {' AND '.join(conditions)} "
+            f"ORDER BY end_ts {direction}, start_ts {direction} LIMIT ?"
+        )
+        params.append(page_size + 1)
+
+        rows = await self.hass.async_add_executor_job(self._fetch, sql, tuple(params))
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = encode_cursor(rows[-1][2], rows[-1][1], order)
+        return [self._row_to_cycle(row) for row in rows], next_cursor
+
+    @staticmethod
+    def _filters(
+        appliance_id: str,
+        period_start: datetime,
+        period_end: datetime,
+        min_duration: float | None,
+        max_duration: float | None,
+        min_energy: float | None,
+        max_energy: float | None,
+    ) -> tuple[list[str], list[Any]]:
+        """Build the WHERE conditions and parameters of a cycle query."""
+        conditions = ["appliance_id = ?", "end_ts >= ?", "end_ts <= ?"]
+        params: list[Any] = [
+            appliance_id,
+            period_start.timestamp(),
+            period_end.timestamp(),
+        ]
+        for column, operator, value in (
+            ("duration", ">=", min_duration),
+            ("duration", "<=", max_duration),
+            ("energy", ">=", min_energy),
+            ("energy", "<=", max_energy),
+        ):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                params.append(value)
+        return conditions, params
+
+    async def async_get_totals(
+        self,
+        appliance_id: str,
+        period_start: datetime,
+        period_end: datetime,
+    ) -> dict[str, Any]:
+        """Return the totals of the cycles of an appliance finished in a period.
+
+        Whole days, months and years of the period are read from the
+        rollups; only the partial days at its edges scan raw cycles.
+
+        Returns:
+            Totals with the TOTALS_FIELDS keys
+        """
+        return await self.hass.async_add_executor_job(
+            self._totals, appliance_id, _local(period_start), _local(period_end)
+        )
+
+    def _totals(
+        self, appliance_id: str, period_start: datetime, period_end: datetime
+    ) -> dict[str, Any]:
+        """Combine rollups and raw edges of a period (executor)."""
+        totals = empty_totals()
+        with self._lock:
+            if self._connection is None:
+                return totals
+            for granularity, start, end in split_period(period_start, period_end):
+                if granularity is None:
+                    row = self._connection.execute(
+                        f"{_CYCLES_AGGREGATE} WHERE appliance_id = ? "
+                        "AND end_ts >= ? AND end_ts < ?",
+                        (appliance_id, start.timestamp(), end.timestamp()),
+                    ).fetchone()
+                else:
+                    row = self._connection.execute(
+                        f"{_ROLLUPS_AGGREGATE} WHERE appliance_id = ? AND granularity = ? "
+                        "AND bucket_start >= ? AND bucket_start < ?",
+                        (appliance_id, granularity, start.timestamp(), end.timestamp()),
+                    ).fetchone()
+                totals = merge_totals(totals, _row_to_totals(row))
+
+            # The end of the period is inclusive
+            row = self._connection.execute(
+                f"{_CYCLES_AGGREGATE} WHERE appliance_id = ? AND end_ts = ?",
+                (appliance_id, period_end.timestamp()),
+            ).fetchone()
+        return merge_totals(totals, _row_to_totals(row))
+
+    async def async_get_first_end(self, appliance_id: str) -> datetime | None:
+        """Return the end of the oldest stored cycle of an appliance."""
+        rows = await self.hass.async_add_executor_job(
+            self._fetch,
+            "SELECT MIN(end_ts) FROM cycles WHERE appliance_id = ?",
+            (appliance_id,),
+        )
+        if not rows or rows[0][0] is None:
+            return None
+        return datetime.fromtimestamp(rows[0][0])
+
+    def _fetch(self, sql: str, params: tuple[Any, ...]) -> list[tuple[Any, ...]]:
+        """Run a query (executor)."""
+        with self._lock:
+            if self._connection is None:
+                return []
+            return self._connection.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _row_to_cycle(row: tuple[Any, ...]) -> CycleRecord:
+        """Convert a row (in the _COLUMNS order) to a cycle record."""
+        return CycleRecord(
+            *row[1:9],
+            appliance_name=row[9],
+            appliance_type=row[10],
+            source=row[11],
+        )
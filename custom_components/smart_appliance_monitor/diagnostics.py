@@ -0,0 +1,64 @@
+"""Diagnostics support for Smart Appliance Monitor."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_CUSTOM_NOTIFY_SERVICE, DOMAIN
+from .coordinator import SmartApplianceCoordinator
+
+# Options naming a person's device or account
+TO_REDACT = {CONF_CUSTOM_NOTIFY_SERVICE}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    domain_data = hass.data.get(DOMAIN, {})
+    coordinator: SmartApplianceCoordinator | None = domain_data.get(entry.entry_id)
+
+    diagnostics: dict[str, Any] = {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": async_redact_data(entry.options, TO_REDACT),
+        },
+    }
+
+    if coordinator is not None:
+        diagnostics["coordinator"] = {
+            "state": coordinator.state_machine.state,
+            "event_driven": coordinator.event_driven,
+            "poll_interval": coordinator.poll_interval.total_seconds(),
+            "last_update_success": coordinator.last_update_success,
+            "listeners": len(coordinator._listeners),
+            "cycle_history_size": len(coordinator._cycle_history),
+            "dirty_sections": sorted(coordinator._dirty_sections),
+        }
+        diagnostics["instrumentation"] = coordinator.instrumentation.as_dict()
+
+    history_cache = domain_data.get("history_caches", {}).get(entry.entry_id)
+    if history_cache is not None:
+        diagnostics["history_cache"] = history_cache.as_dict()
+
+    hub = domain_data.get("hub")
+    if hub is not None:
+        diagnostics["hub"] = {
+            "coordinators": hub.coordinator_count,
+            "tick_count": hub.tick_count,
+            "last_batch_size": hub.last_batch_size,
+            "last_batch_duration_ms": round(hub.last_batch_duration * 1000, 2),
+        }
+
+    price_service = domain_data.get("price_service")
+    if price_service is not None:
+        diagnostics["price_service"] = {
+            "price_entity": price_service.price_entity,
+            "current_price": price_service.current_price,
+            "timeline_size": price_service.timeline_size,
+        }
+
+    return diagnostics
@@ -12,6 +12,10 @@ class SmartApplianceEntity(CoordinatorEntity[SmartApplianceCoordinator]):
     """Classe de base pour toutes les entités Smart Appliance Monitor."""
 
     _attr_has_entity_name = True
+    
+    # Champs des données du coordinator dont dépend l'entité.
+    # None: notifiée à chaque rafraîchissement ; (): jamais (état écrit par l'entité).
+    _coordinator_fields: tuple[str, ...] | None = None
 
     def __init__(
         self,
@@ -24,7 +28,12 @@ class SmartApplianceEntity(CoordinatorEntity[SmartApplianceCoordinator]):
             coordinator: Le coordinator de l'appareil
             entity_type: Type d'entité (ex: "state", "running", etc.)
         """
-        super().__init__(coordinator)
+        context = (
+            frozenset(self._coordinator_fields)
+            if self._coordinator_fields is not None
+            else None
+        )
+        super().__init__(coordinator, context)
         
         self.entity_type = entity_type
         self._attr_unique_id = f"{coordinator.entry.entry_id}_{entity_type}"
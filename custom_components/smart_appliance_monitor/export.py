@@ -356,6 +356,8 @@ class SmartApplianceDataExporter:
                 "duration_minutes": round(cycle.get("duration", 0), 1),
                 "energy_kwh": round(cycle.get("energy", 0), 3),
                 "peak_power_w": cycle.get("peak_power", 0),
+                # Downsampled power curve: mean W per "step" seconds
+                "power_profile": cycle.get("power_profile"),
             }
         
         # Add last cycle if exists
@@ -368,6 +370,7 @@ class SmartApplianceDataExporter:
                 "energy_kwh": round(cycle.get("energy", 0), 3),
                 "peak_power_w": cycle.get("peak_power", 0),
                 "cost_eur": round(cycle.get("energy", 0) * self.coordinator.price_kwh, 2),
+                "power_profile": cycle.get("power_profile"),
             }
         
         return export_data
@@ -2,20 +2,248 @@
 from __future__ import annotations
 
 import logging
+import math
+import sys
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.components import recorder
 from homeassistant.components.recorder import get_instance, history
 
 from .const import DOMAIN
+from .cycle_record import CycleRecord
+from .cycle_store import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    ORDER_ASC,
+    ORDER_DESC,
+    merge_totals,
+    totals_from_cycles,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# Bounds of the per-appliance query cache
+HISTORY_CACHE_MAX_ENTRIES = 32
+HISTORY_CACHE_MAX_BYTES = 512 * 1024
+# Queries without explicit period slide with the clock: their results expire
+HISTORY_CACHE_OPEN_TTL = 900
+
+# Extraction of a text field of event_data.shared_data, by recorder dialect
+JSON_TEXT_FIELD = {
+    "sqlite": "json_extract(ed.shared_data, '$.{field}')",
+    "mysql": "JSON_UNQUOTE(JSON_EXTRACT(ed.shared_data, '$.{field}'))",
+    "postgresql": "(CAST(ed.shared_data AS json) ->> '{field}')",
+}
+
+# Extraction of a numeric field (missing values count as 0, as in Python)
+JSON_NUMBER_FIELD = {
+    "sqlite": "COALESCE(json_extract(ed.shared_data, '$.{field}'), 0)",
+    "mysql": (
+        "COALESCE(CAST(JSON_EXTRACT(ed.shared_data, '$.{field}') AS DECIMAL(20, 6)), 0)"
+    ),
+    "postgresql": (
+        "COALESCE(CAST(CAST(ed.shared_data AS json) ->> '{field}' AS DOUBLE PRECISION), 0)"
+    ),
+}
+
+
+def build_events_query(
+    dialect: str | None,
+    appliance_id: str,
+    min_duration: float | None = None,
+    max_duration: float | None = None,
+    min_energy: float | None = None,
+    max_energy: float | None = None,
+    limit: int | None = None,
+) -> tuple[str, dict[str, Any], bool]:
+    """Build the query selecting cycle events of a period.
+    
+    For dialects with JSON support, the appliance, duration and energy
+    filters and the limit are evaluated by the database. Other dialects
+    select every cycle event of the period and are filtered in Python.
+    
+    Args:
+        dialect: Recorder dialect name (sqlite, mysql, postgresql)
+        appliance_id: Entry ID of the appliance
+        min_duration: Minimum cycle duration in minutes
+        max_duration: Maximum cycle duration in minutes
+        min_energy: Minimum energy consumption in kWh
+        max_energy: Maximum energy consumption in kWh
+        limit: Maximum number of results to return
+        
+    Returns:
+        Tuple (SQL, extra parameters, True if the filters are in the query).
+        The query also expects event_type_id, start_time and end_time.
+    """
+    conditions = [
+        "e.event_type_id = :event_type_id",
+        "e.time_fired_ts >= :start_time",
+        "e.time_fired_ts <= :end_time",
+    ]
+    params: dict[str, Any] = {}
+
+    text_field = JSON_TEXT_FIELD.get(dialect) if dialect else None
+    number_field = JSON_NUMBER_FIELD.get(dialect) if dialect else None
+    pushed_down = text_field is not None and number_field is not None
+
+    if pushed_down:
+        conditions.append(f"{text_field.format(field='appliance_id')} = :appliance_id")
+        params["appliance_id"] = appliance_id
+
+        for name, field, operator, value in (
+            ("min_duration", "duration", ">=", min_duration),
+            ("max_duration", "duration", "<=", max_duration),
+            ("min_energy", "energy", ">=", min_energy),
+            ("max_energy", "energy", "<=", max_energy),
+        ):
+            if value is not None:
+                conditions.append(f"{number_field.format(field=field)} {operator} :{name}")
+                params[name] = value
+
+    sql = (
+        "SELECT ed.shared_data, e.time_fired_ts "
+        "FROM events e "
+        "JOIN event_data ed ON e.data_id = ed.data_id "
+        f"WHERE {' AND '.join(conditions)} "
+        "ORDER BY e.time_fired_ts DESC"
+    )
+    if pushed_down and limit is not None and limit > 0:
+        sql += " LIMIT :limit"
+        params["limit"] = limit
+
+    return sql, params, pushed_down
+
+
+def _estimate_size(value: Any) -> int:
+    """Estimate the memory used by a query result."""
+    size = sys.getsizeof(value)
+    if isinstance(value, CycleRecord):
+        size += sum(_estimate_size(item) for item in value.to_tuple())
+    elif isinstance(value, dict):
+        size += sum(_estimate_size(item) for item in value.values())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_estimate_size(item) for item in value)
+    return size
+
+
+def _copy_result(value: Any) -> Any:
+    """Copy the containers of a cached result so callers can modify it."""
+    if isinstance(value, CycleRecord):
+        return value.copy()
+    if isinstance(value, dict):
+        return {key: _copy_result(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_result(item) for item in value]
+    return value
+
+
+class CycleHistoryCache:
+    """LRU cache of the history query results of one appliance.
+
+    Entries are bounded by count and by estimated size, and the whole cache
+    is invalidated when the appliance finishes a cycle or an import completes.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = HISTORY_CACHE_MAX_ENTRIES,
+        max_bytes: int = HISTORY_CACHE_MAX_BYTES,
+    ) -> None:
+        """Initialize the cache."""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (result, size, expiry as monotonic time or None)
+        self._entries: OrderedDict[tuple, tuple[Any, int, float | None]] = OrderedDict()
+        self._bytes = 0
+        # Bumped on invalidation so in-flight queries do not store stale results
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: tuple) -> Any | None:
+        """Return a copy of a cached result, or None on a miss."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[2] is not None and entry[2] < time.monotonic():
+            self._remove(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return _copy_result(entry[0])
+
+    def put(self, key: tuple, result: Any, generation: int, ttl: float | None) -> None:
+        """Store a result computed while the cache was at the given generation."""
+        if generation != self.generation:
+            return
+        size = _estimate_size(result)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        expiry = time.monotonic() + ttl if ttl is not None else None
+        self._entries[key] = (_copy_result(result), size, expiry)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self) -> None:
+        """Drop every cached result."""
+        self._entries.clear()
+        self._bytes = 0
+        self.generation += 1
+        self.invalidations += 1
+
+    def _remove(self, key: tuple) -> None:
+        """Remove one entry."""
+        _result, size, _expiry = self._entries.pop(key)
+        self._bytes -= size
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the cache counters."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+@callback
+def get_history_cache(hass: HomeAssistant, appliance_id: str) -> CycleHistoryCache:
+    """Return the history cache shared by the managers of an appliance."""
+    caches = hass.data.setdefault(DOMAIN, {}).setdefault("history_caches", {})
+    if appliance_id not in caches:
+        caches[appliance_id] = CycleHistoryCache()
+    return caches[appliance_id]
+
+
+@callback
+def invalidate_history_cache(hass: HomeAssistant, appliance_id: str) -> None:
+    """Invalidate the cached history of an appliance after its cycles changed."""
+    cache = hass.data.get(DOMAIN, {}).get("history_caches", {}).get(appliance_id)
+    if cache is not None:
+        cache.invalidate()
+
 
 class CycleHistoryManager:
-    """Manage cycle history using Home Assistant Recorder."""
+    """Manage cycle history using the cycle store and Home Assistant Recorder.
+
+    Cycles are read from the integration's cycle store. Cycles finished
+    before the first stored cycle of the appliance only exist as Recorder
+    events and are read from the Recorder. Query results are kept in a
+    cache shared by all the managers of the appliance.
+    """
 
     def __init__(self, hass: HomeAssistant, appliance_id: str, appliance_name: str):
         """Initialize the history manager.
@@ -29,6 +257,27 @@ class CycleHistoryManager:
         self.appliance_id = appliance_id
         self.appliance_name = appliance_name
         self._event_type = f"{DOMAIN}_cycle_finished"
+        self.cache = get_history_cache(hass, appliance_id)
+
+    async def _async_cached(
+        self, key: tuple, open_ended: bool, query: Any
+    ) -> Any:
+        """Return a cached query result, or run the query and cache it.
+
+        Args:
+            key: Normalised query parameters
+            open_ended: True if the period follows the current time
+            query: Coroutine function computing the result
+        """
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+        generation = self.cache.generation
+        result = await query()
+        self.cache.put(
+            key, result, generation, HISTORY_CACHE_OPEN_TTL if open_ended else None
+        )
+        return result
 
     async def async_get_cycles(
         self,
@@ -39,7 +288,7 @@ class CycleHistoryManager:
         min_energy: float | None = None,
         max_energy: float | None = None,
         limit: int | None = None,
-    ) -> list[dict[str, Any]]:
+    ) -> list[CycleRecord]:
         """Retrieve cycles from Recorder with filters.
         
         Args:
@@ -54,12 +303,243 @@ class CycleHistoryManager:
         Returns:
             List of cycles matching the criteria
         """
+        if limit is not None and limit <= 0:
+            limit = None
+        key = (
+            "cycles",
+            period_start,
+            period_end,
+            min_duration,
+            max_duration,
+            min_energy,
+            max_energy,
+            limit,
+        )
+        return await self._async_cached(
+            key,
+            period_start is None or period_end is None,
+            lambda: self._async_get_cycles(
+                period_start,
+                period_end,
+                min_duration,
+                max_duration,
+                min_energy,
+                max_energy,
+                limit,
+            ),
+        )
+
+    async def _async_get_cycles(
+        self,
+        period_start: datetime | None,
+        period_end: datetime | None,
+        min_duration: float | None,
+        max_duration: float | None,
+        min_energy: float | None,
+        max_energy: float | None,
+        limit: int | None,
+    ) -> list[CycleRecord]:
+        """Retrieve cycles from the cycle store and the Recorder."""
         # Default period: last 30 days
         if period_end is None:
             period_end = datetime.now()
         if period_start is None:
             period_start = period_end - timedelta(days=30)
 
+        filters = {
+            "min_duration": min_duration,
+            "max_duration": max_duration,
+            "min_energy": min_energy,
+            "max_energy": max_energy,
+            "limit": limit,
+        }
+
+        cycle_store = self.hass.data.get(DOMAIN, {}).get("cycle_store")
+        if cycle_store is None:
+            return await self._async_get_cycles_from_recorder(
+                period_start, period_end, **filters
+            )
+
+        try:
+            cycles = await cycle_store.async_get_cycles(
+                self.appliance_id, period_start, period_end, **filters
+            )
+            first_end = await cycle_store.async_get_first_end(self.appliance_id)
+        except Exception as err:
+            _LOGGER.error(
+                "Error reading the cycle store for '%s', using Recorder: %s",
+                self.appliance_name,
+                err,
+            )
+            return await self._async_get_cycles_from_recorder(
+                period_start, period_end, **filters
+            )
+
+        # Cycles older than the store are only available in the Recorder
+        if limit is not None and limit > 0 and len(cycles) >= limit:
+            return cycles
+        if first_end is None or period_start < first_end:
+            older_end = period_end if first_end is None else min(period_end, first_end)
+            older = await self._async_get_cycles_from_recorder(
+                period_start, older_end, **filters
+            )
+            older = [
+                cycle
+                for cycle in older
+                if first_end is None or cycle["timestamp"] < first_end
+            ]
+            cycles.extend(older)
+            cycles.sort(key=lambda x: x["timestamp"], reverse=True)
+            if limit is not None and limit > 0:
+                cycles = cycles[:limit]
+
+        _LOGGER.debug(
+            "Retrieved %d cycles for '%s' from the cycle store",
+            len(cycles),
+            self.appliance_name,
+        )
+        return cycles
+
+    async def async_get_cycles_page(
+        self,
+        period_start: datetime | None = None,
+        period_end: datetime | None = None,
+        min_duration: float | None = None,
+        max_duration: float | None = None,
+        min_energy: float | None = None,
+        max_energy: float | None = None,
+        order: str = ORDER_DESC,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+    ) -> dict[str, Any]:
+        """Retrieve one page of cycles with filters.
+
+        Pages come from the cycle store. Without the store, the first
+        page_size cycles are read from the Recorder and no cursor is returned.
+
+        Args:
+            period_start: Start of the period (default: 30 days ago)
+            period_end: End of the period (default: now)
+            min_duration: Minimum cycle duration in minutes
+            max_duration: Maximum cycle duration in minutes
+            min_energy: Minimum energy consumption in kWh
+            max_energy: Maximum energy consumption in kWh
+            order: "desc" (most recent first) or "asc"
+            page_size: Number of cycles per page (at most MAX_PAGE_SIZE)
+            cursor: Cursor returned with the previous page
+
+        Returns:
+            Dictionary with the cycles and the cursor of the next page
+
+        Raises:
+            ValueError: If the order or the cursor is invalid
+        """
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        key = (
+            "page",
+            period_start,
+            period_end,
+            min_duration,
+            max_duration,
+            min_energy,
+            max_energy,
+            order,
+            page_size,
+            cursor,
+        )
+        return await self._async_cached(
+            key,
+            period_start is None or period_end is None,
+            lambda: self._async_get_cycles_page(
+                period_start,
+                period_end,
+                min_duration,
+                max_duration,
+                min_energy,
+                max_energy,
+                order,
+                page_size,
+                cursor,
+            ),
+        )
+
+    async def _async_get_cycles_page(
+        self,
+        period_start: datetime | None,
+        period_end: datetime | None,
+        min_duration: float | None,
+        max_duration: float | None,
+        min_energy: float | None,
+        max_energy: float | None,
+        order: str,
+        page_size: int,
+        cursor: str | None,
+    ) -> dict[str, Any]:
+        """Retrieve one page of cycles from the cycle store."""
+        if period_end is None:
+            period_end = datetime.now()
+        if period_start is None:
+            period_start = period_end - timedelta(days=30)
+
+        filters = {
+            "min_duration": min_duration,
+            "max_duration": max_duration,
+            "min_energy": min_energy,
+            "max_energy": max_energy,
+        }
+
+        cycle_store = self.hass.data.get(DOMAIN, {}).get("cycle_store")
+        if cycle_store is None:
+            if order not in (ORDER_DESC, ORDER_ASC):
+                raise ValueError(f"Invalid order: {order}")
+            if cursor is not None:
+                raise ValueError("Cursors require the cycle store")
+            # The Recorder returns the most recent cycles first
+            cycles = await self._async_get_cycles_from_recorder(
+                period_start,
+                period_end,
+                limit=page_size if order == ORDER_DESC else None,
+                **filters,
+            )
+            if order == ORDER_ASC:
+                cycles = cycles[::-1][:page_size]
+            return {"cycles": cycles, "next_cursor": None}
+
+        cycles, next_cursor = await cycle_store.async_get_cycles_page(
+            self.appliance_id,
+            period_start,
+            period_end,
+            order=order,
+            page_size=page_size,
+            cursor=cursor,
+            **filters,
+        )
+        return {"cycles": cycles, "next_cursor": next_cursor}
+
+    async def _async_get_cycles_from_recorder(
+        self,
+        period_start: datetime,
+        period_end: datetime,
+        min_duration: float | None = None,
+        max_duration: float | None = None,
+        min_energy: float | None = None,
+        max_energy: float | None = None,
+        limit: int | None = None,
+    ) -> list[CycleRecord]:
+        """Retrieve cycles from Recorder events with filters.
+        
+        Args:
+            period_start: Start of the period
+            period_end: End of the period
+            min_duration: Minimum cycle duration in minutes
+            max_duration: Maximum cycle duration in minutes
+            min_energy: Minimum energy consumption in kWh
+            max_energy: Maximum energy consumption in kWh
+            limit: Maximum number of results to return
+            
+        Returns:
+            List of cycles matching the criteria
+        """
         _LOGGER.debug(
             "Querying cycle history for '%s' from %s to %s",
             self.appliance_name,
@@ -74,11 +554,16 @@ class CycleHistoryManager:
                 _LOGGER.error("Recorder not available")
                 return []
 
-            # Query events from Recorder
+            # Query events from Recorder (filters pushed into SQL when possible)
             events = await recorder_instance.async_add_executor_job(
                 self._get_events_from_recorder,
                 period_start,
                 period_end,
+                min_duration,
+                max_duration,
+                min_energy,
+                max_energy,
+                limit,
             )
 
             if not events:
@@ -87,38 +572,36 @@ class CycleHistoryManager:
 
             _LOGGER.debug("Found %d events in Recorder", len(events))
 
-            # Filter events by appliance_id
+            # Filter events by appliance_id (no-op when done by the database)
             cycles = []
-            for event in events:
-                event_data = event.data
-                
+            for time_fired, event_data in events:
                 # Check if this event belongs to this appliance
                 if event_data.get("appliance_id") != self.appliance_id:
                     continue
 
-                # Extract cycle data
-                cycle = {
-                    "timestamp": event.time_fired,
-                    "appliance_name": event_data.get("appliance_name"),
-                    "appliance_type": event_data.get("appliance_type"),
-                    "duration": event_data.get("duration", 0),
-                    "energy": event_data.get("energy", 0),
-                    "cost": event_data.get("cost", 0),
-                    "peak_power": event_data.get("peak_power", 0),
-                    "start_time": event_data.get("start_time"),
-                    "end_time": event_data.get("end_time"),
-                    "start_energy": event_data.get("start_energy", 0),
-                    "end_energy": event_data.get("end_energy", 0),
-                }
+                # Extract cycle data (events without end time end when fired)
+                try:
+                    cycle = CycleRecord.from_dict(event_data)
+                except (TypeError, ValueError) as err:
+                    _LOGGER.debug("Invalid cycle event data %s: %s", event_data, err)
+                    continue
+                if cycle.end_ts is None:
+                    cycle.end_time = time_fired
+                # Read as naive local times, like the cycles of the cycle store
+                cycle.utc_offset = None
+                if cycle.duration is None:
+                    cycle.duration = 0
+                if cycle.energy is None:
+                    cycle.energy = 0
 
                 # Apply filters
-                if min_duration is not None and cycle["duration"] < min_duration:
+                if min_duration is not None and cycle.duration < min_duration:
                     continue
-                if max_duration is not None and cycle["duration"] > max_duration:
+                if max_duration is not None and cycle.duration > max_duration:
                     continue
-                if min_energy is not None and cycle["energy"] < min_energy:
+                if min_energy is not None and cycle.energy < min_energy:
                     continue
-                if max_energy is not None and cycle["energy"] > max_energy:
+                if max_energy is not None and cycle.energy > max_energy:
                     continue
 
                 cycles.append(cycle)
@@ -152,15 +635,25 @@ class CycleHistoryManager:
         self,
         start_time: datetime,
         end_time: datetime,
-    ) -> list:
+        min_duration: float | None = None,
+        max_duration: float | None = None,
+        min_energy: float | None = None,
+        max_energy: float | None = None,
+        limit: int | None = None,
+    ) -> list[tuple[datetime, dict[str, Any]]]:
         """Get events from Recorder (sync method for executor).
         
         Args:
             start_time: Start of the period
             end_time: End of the period
+            min_duration: Minimum cycle duration in minutes
+            max_duration: Maximum cycle duration in minutes
+            min_energy: Minimum energy consumption in kWh
+            max_energy: Maximum energy consumption in kWh
+            limit: Maximum number of results to return
             
         Returns:
-            List of events (as dicts)
+            List of (time fired, event data) tuples, most recent first
         """
         recorder_instance = get_instance(self.hass)
         if recorder_instance is None:
@@ -193,34 +686,49 @@ class CycleHistoryManager:
                 
                 event_type_id = type_row[0]
                 
-                # Now query events using event_type_id and time_fired_ts
-                stmt = text(
-                    "SELECT ed.shared_data, e.time_fired_ts "
-                    "FROM events e "
-                    "JOIN event_data ed ON e.data_id = ed.data_id "
-                    "WHERE e.event_type_id = :event_type_id "
-                    "AND e.time_fired_ts >= :start_time "
-                    "AND e.time_fired_ts <= :end_time "
-                    "ORDER BY e.time_fired_ts DESC"
-                )
-                result = session.execute(
-                    stmt,
-                    {
-                        "event_type_id": event_type_id,
-                        "start_time": start_time.timestamp(),
-                        "end_time": end_time.timestamp(),
-                    }
+                params = {
+                    "event_type_id": event_type_id,
+                    "start_time": start_time.timestamp(),
+                    "end_time": end_time.timestamp(),
+                }
+                
+                # Now query events, with the filters evaluated by the database
+                # for dialects supporting JSON extraction
+                sql, filter_params, pushed_down = build_events_query(
+                    getattr(recorder_instance, "dialect_name", None),
+                    self.appliance_id,
+                    min_duration,
+                    max_duration,
+                    min_energy,
+                    max_energy,
+                    limit,
                 )
+                try:
+                    rows = session.execute(text(sql), {**params, **filter_params}).all()
+                except Exception as err:
+                    if not pushed_down:
+                        raise
+                    # JSON functions unavailable: filter in Python instead
+                    _LOGGER.debug(
+                        "JSON filtering not supported by the database (%s), "
+                        "falling back to Python filtering",
+                        err,
+                    )
+                    session.rollback()
+                    sql, _, _ = build_events_query(None, self.appliance_id)
+                    rows = session.execute(text(sql), params).all()
                 
                 events = []
-                for row in result:
+                for shared_data, time_fired_ts in rows:
                     try:
-                        event_data = json.loads(row[0]) if isinstance(row[0], str) else row[0]
-                        # Create a simple event object
-                        events.append(type('Event', (), {
-                            'data': event_data,
-                            'time_fired': datetime.fromtimestamp(row[1])
-                        })())
+                        event_data = (
+                            json.loads(shared_data)
+                            if isinstance(shared_data, str)
+                            else shared_data
+                        )
+                        events.append(
+                            (datetime.fromtimestamp(time_fired_ts), event_data)
+                        )
                     except Exception as e:
                         _LOGGER.debug("Error parsing event data: %s", e)
                         continue
@@ -243,6 +751,9 @@ class CycleHistoryManager:
     ) -> dict[str, Any]:
         """Get aggregated statistics for cycles in a period.
         
+        With the cycle store, statistics combine its daily/monthly/yearly
+        rollups; only cycles older than the store are read from the Recorder.
+        
         Args:
             period_start: Start of the period
             period_end: End of the period
@@ -250,12 +761,21 @@ class CycleHistoryManager:
         Returns:
             Dictionary with statistics
         """
-        cycles = await self.async_get_cycles(
-            period_start=period_start,
-            period_end=period_end,
+        return await self._async_cached(
+            ("statistics", period_start, period_end),
+            period_start is None or period_end is None,
+            lambda: self._async_get_cycle_statistics(period_start, period_end),
         )
 
-        if not cycles:
+    async def _async_get_cycle_statistics(
+        self,
+        period_start: datetime | None,
+        period_end: datetime | None,
+    ) -> dict[str, Any]:
+        """Compute the statistics of the cycles finished in a period."""
+        totals = await self._async_get_totals(period_start, period_end)
+
+        if not totals["count"]:
             return {
                 "period_start": period_start.isoformat() if period_start else None,
                 "period_end": period_end.isoformat() if period_end else None,
@@ -269,20 +789,81 @@ class CycleHistoryManager:
                 "min_energy": 0,
             }
 
-        total_energy = sum(c["energy"] for c in cycles)
-        total_cost = sum(c["cost"] for c in cycles)
-        total_duration = sum(c["duration"] for c in cycles)
+        count = totals["count"]
+        avg_duration = totals["duration"] / count
+        avg_energy = totals["energy"] / count
 
         return {
             "period_start": period_start.isoformat() if period_start else None,
             "period_end": period_end.isoformat() if period_end else None,
-            "cycle_count": len(cycles),
-            "total_energy": round(total_energy, 3),
-            "total_cost": round(total_cost, 2),
-            "avg_duration": round(total_duration / len(cycles), 1) if cycles else 0,
-            "avg_energy": round(total_energy / len(cycles), 3) if cycles else 0,
-            "avg_cost": round(total_cost / len(cycles), 2) if cycles else 0,
-            "max_energy": round(max(c["energy"] for c in cycles), 3) if cycles else 0,
-            "min_energy": round(min(c["energy"] for c in cycles), 3) if cycles else 0,
+            "cycle_count": count,
+            "total_energy": round(totals["energy"], 3),
+            "total_cost": round(totals["cost"], 2),
+            "avg_duration": round(avg_duration, 1),
+            "avg_energy": round(avg_energy, 3),
+            "avg_cost": round(totals["cost"] / count, 2),
+            "max_energy": round(totals["max_energy"], 3),
+            "min_energy": round(totals["min_energy"], 3),
+            "std_duration": round(
+                math.sqrt(max(0.0, totals["duration_sumsq"] / count - avg_duration**2)), 1
+            ),
+            "std_energy": round(
+                math.sqrt(max(0.0, totals["energy_sumsq"] / count - avg_energy**2)), 3
+            ),
         }
 
+    async def _async_get_totals(
+        self,
+        period_start: datetime | None,
+        period_end: datetime | None,
+    ) -> dict[str, Any]:
+        """Get the totals of the cycles finished in a period.
+        
+        Args:
+            period_start: Start of the period (default: 30 days before the end)
+            period_end: End of the period (default: now)
+            
+        Returns:
+            Totals as returned by CycleStore.async_get_totals
+        """
+        if period_end is None:
+            period_end = datetime.now()
+        if period_start is None:
+            period_start = period_end - timedelta(days=30)
+
+        cycle_store = self.hass.data.get(DOMAIN, {}).get("cycle_store")
+        if cycle_store is None:
+            return totals_from_cycles(
+                await self._async_get_cycles_from_recorder(period_start, period_end)
+            )
+
+        try:
+            totals = await cycle_store.async_get_totals(
+                self.appliance_id, period_start, period_end
+            )
+            first_end = await cycle_store.async_get_first_end(self.appliance_id)
+        except Exception as err:
+            _LOGGER.error(
+                "Error reading the cycle store for '%s', using Recorder: %s",
+                self.appliance_name,
+                err,
+            )
+            return totals_from_cycles(
+                await self._async_get_cycles_from_recorder(period_start, period_end)
+            )
+
+        # Cycles older than the store are only available in the Recorder
+        if first_end is None or period_start < first_end:
+            older_end = period_end if first_end is None else min(period_end, first_end)
+            older = await self._async_get_cycles_from_recorder(period_start, older_end)
+            totals = merge_totals(
+                totals,
+                totals_from_cycles(
+                    cycle
+                    for cycle in older
+                    if first_end is None or cycle["timestamp"] < first_end
+                ),
+            )
+
+        return totals
+
@@ -0,0 +1,145 @@
+"""Shared refresh scheduler for Smart Appliance Monitor coordinators."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+
+if TYPE_CHECKING:
+    from .coordinator import SmartApplianceCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Coordinators due within this window are refreshed in the same batch
+HUB_BATCH_WINDOW = timedelta(seconds=5)
+
+
+class SmartApplianceHub:
+    """Refresh every appliance coordinator from a single timer.
+
+    Each coordinator keeps its own polling interval, but instead of one timer
+    per config entry the hub tracks when every coordinator is due and wakes up
+    once for all coordinators due within HUB_BATCH_WINDOW.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the hub.
+
+        Args:
+            hass: Home Assistant instance
+        """
+        self.hass = hass
+        self._coordinators: dict[str, SmartApplianceCoordinator] = {}
+        self._next_due: dict[str, float] = {}
+        self._unsub_timer: CALLBACK_TYPE | None = None
+
+        # Batch timing
+        self.tick_count = 0
+        self.last_batch_size = 0
+        self.last_batch_duration = 0.0
+
+    @property
+    def coordinator_count(self) -> int:
+        """Return the number of registered coordinators."""
+        return len(self._coordinators)
+
+    @callback
+    def async_register(self, coordinator: SmartApplianceCoordinator) -> CALLBACK_TYPE:
+        """Hand the refresh schedule of a coordinator over to the hub.
+
+        Args:
+            coordinator: Coordinator to refresh from the hub
+
+        Returns:
+            Callback unregistering the coordinator
+        """
+        entry_id = coordinator.entry.entry_id
+
+        # The coordinator no longer runs its own timer
+        coordinator.update_interval = None
+
+        self._coordinators[entry_id] = coordinator
+        self._next_due[entry_id] = (
+            time.monotonic() + coordinator.poll_interval.total_seconds()
+        )
+        self._async_schedule_next()
+
+        _LOGGER.debug(
+            "Coordinator '%s' registered with the hub (%d appliances)",
+            coordinator.appliance_name,
+            len(self._coordinators),
+        )
+
+        @callback
+        def _async_unregister() -> None:
+            self._coordinators.pop(entry_id, None)
+            self._next_due.pop(entry_id, None)
+            self._async_schedule_next()
+
+        return _async_unregister
+
+    @callback
+    def _async_schedule_next(self) -> None:
+        """Schedule the next wakeup at the earliest due time."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+        if not self._next_due:
+            return
+
+        delay = max(0.0, min(self._next_due.values()) - time.monotonic())
+        self._unsub_timer = async_call_later(self.hass, delay, self._async_tick)
+
+    async def _async_tick(self, _now: datetime | None = None) -> None:
+        """Refresh every coordinator due within the batch window."""
+        self._unsub_timer = None
+        started = time.monotonic()
+        horizon = started + HUB_BATCH_WINDOW.total_seconds()
+
+        due = [
+            coordinator
+            for entry_id, coordinator in self._coordinators.items()
+            if self._next_due[entry_id] <= horizon
+        ]
+
+        if due:
+            results = await asyncio.gather(
+                *(coordinator.async_refresh() for coordinator in due),
+                return_exceptions=True,
+            )
+            for coordinator, result in zip(due, results):
+                if isinstance(result, Exception):
+                    _LOGGER.error(
+                        "Hub refresh failed for '%s': %s",
+                        coordinator.appliance_name,
+                        result,
+                    )
+
+        finished = time.monotonic()
+        for coordinator in due:
+            entry_id = coordinator.entry.entry_id
+            if entry_id in self._next_due:
+                self._next_due[entry_id] = (
+                    started + coordinator.poll_interval.total_seconds()
+                )
+
+        self.tick_count += 1
+        self.last_batch_size = len(due)
+        self.last_batch_duration = finished - started
+
+        _LOGGER.debug(
+            "Hub tick #%d: %d/%d coordinators refreshed in %.1f ms",
+            self.tick_count,
+            len(due),
+            len(self._coordinators),
+            self.last_batch_duration * 1000,
+        )
+
+        self._async_schedule_next()
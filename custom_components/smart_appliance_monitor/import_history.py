@@ -1,19 +1,231 @@
 """Historical Cycle Importer for Smart Appliance Monitor."""
 from __future__ import annotations
 
+import asyncio
 import logging
+from bisect import bisect_left
+from collections.abc import Sequence
 from datetime import datetime, timedelta
 from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.components import recorder
 from homeassistant.components.recorder import get_instance
 
-from .const import DOMAIN
+from .const import DOMAIN, EVENT_CYCLE_FINISHED
+from .cycle_record import CYCLE_SOURCE_IMPORT, CYCLE_SOURCE_STATISTICS, CycleRecord
+from .history import invalidate_history_cache
+from .price import PriceTimeline
 from .state_machine import CycleStateMachine
 
 _LOGGER = logging.getLogger(__name__)
 
+# Maximum distance to an energy sample outside the recorded range (seconds)
+ENERGY_SAMPLE_TOLERANCE = 300
+
+# Length of the windows the import period is streamed in
+IMPORT_WINDOW = timedelta(days=1)
+# Long-term statistics are compact: larger windows for the statistics engine
+STATISTICS_IMPORT_WINDOW = timedelta(days=30)
+# Imported cycles are written in transactions of up to this many cycles
+IMPORT_COMMIT_SIZE = 5000
+
+# History read by the import
+IMPORT_SOURCE_AUTO = "auto"  # Statistics before the Recorder purge horizon, states after
+IMPORT_SOURCE_STATES = "states"
+IMPORT_SOURCE_STATISTICS = "statistics"
+IMPORT_SOURCES = [IMPORT_SOURCE_AUTO, IMPORT_SOURCE_STATES, IMPORT_SOURCE_STATISTICS]
+
+# Statistics periods, finest first (5-minute statistics are purged with states)
+STATISTICS_PERIODS = {"5minute": 300, "hour": 3600}
+
+
+def _get_recorder(hass: HomeAssistant) -> Any:
+    """Return the Recorder instance, or None when the Recorder is not loaded."""
+    try:
+        return get_instance(hass)
+    except KeyError:
+        return None
+
+
+async def _async_get_histories(
+    hass: HomeAssistant,
+    entity_ids: list[str],
+    start_time: datetime,
+    end_time: datetime,
+) -> dict[str, list[tuple[datetime, float]]]:
+    """Get the numeric history of several sensors in one Recorder query.
+    
+    Args:
+        hass: Home Assistant instance
+        entity_ids: Entity IDs of the sensors
+        start_time: Start of the period
+        end_time: End of the period
+        
+    Returns:
+        Dictionary of entity ID -> list of (timestamp, value) tuples
+    """
+    from homeassistant.components.recorder import history
+
+    recorder_instance = _get_recorder(hass)
+    if recorder_instance is None:
+        _LOGGER.error("Recorder not available")
+        return {}
+
+    # Use history API instead of direct SQL queries
+    def get_states() -> dict[str, list[tuple[datetime, float]]]:
+        """Get states from history (sync method)."""
+        history_states = history.get_significant_states(
+            hass,
+            start_time,
+            end_time,
+            entity_ids=entity_ids,
+            significant_changes_only=False,
+        )
+
+        histories = {}
+        for entity_id in entity_ids:
+            if entity_id not in history_states:
+                _LOGGER.debug("No history found for entity '%s'", entity_id)
+                continue
+
+            states = []
+            for state in history_states[entity_id]:
+                try:
+                    value = float(state.state)
+                    states.append((state.last_updated, value))
+                except (ValueError, TypeError, AttributeError):
+                    # Skip invalid states
+                    continue
+            histories[entity_id] = states
+
+        return histories
+
+    return await recorder_instance.async_add_executor_job(get_states)
+
+
+async def _async_get_statistics(
+    hass: HomeAssistant,
+    statistic_ids: list[str],
+    start_time: datetime,
+    end_time: datetime,
+    period: str,
+) -> dict[str, list[dict[str, Any]]]:
+    """Get the long-term statistics of several sensors in one Recorder query.
+    
+    Args:
+        hass: Home Assistant instance
+        statistic_ids: Entity IDs of the sensors
+        start_time: Start of the period
+        end_time: End of the period
+        period: "5minute" or "hour"
+        
+    Returns:
+        Dictionary of entity ID -> buckets with start (epoch seconds), mean, max and sum
+    """
+    from homeassistant.components.recorder.statistics import statistics_during_period
+
+    recorder_instance = _get_recorder(hass)
+    if recorder_instance is None:
+        _LOGGER.error("Recorder not available")
+        return {}
+
+    def get_statistics() -> dict[str, list[dict[str, Any]]]:
+        """Get statistics (sync method)."""
+        statistics = statistics_during_period(
+            hass,
+            start_time,
+            end_time,
+            set(statistic_ids),
+            period,
+            None,
+            {"mean", "max", "sum"},
+        )
+        buckets = {}
+        for statistic_id, rows in statistics.items():
+            buckets[statistic_id] = [
+                {
+                    # Timestamps since HA 2023.3, datetimes before
+                    "start": (
+                        row["start"].timestamp()
+                        if isinstance(row["start"], datetime)
+                        else float(row["start"])
+                    ),
+                    "mean": row.get("mean"),
+                    "max": row.get("max"),
+                    "sum": row.get("sum"),
+                }
+                for row in rows
+            ]
+        return buckets
+
+    return await recorder_instance.async_add_executor_job(get_statistics)
+
+
+def _merge_statistics(
+    buckets: dict[str, list[dict[str, Any]]],
+) -> list[tuple[str, list[dict[str, Any]]]]:
+    """Merge the statistics periods of a sensor into one series without overlap.
+    
+    Each period is used before the first bucket of the finer periods; the
+    coarse bucket holding that first bucket is kept whole, and finer buckets
+    start after it, so the window is covered without gap.
+    
+    Args:
+        buckets: Period -> buckets of the sensor, in STATISTICS_PERIODS order
+        
+    Returns:
+        List of (period, buckets sorted by start), oldest first
+    """
+    pieces: list[tuple[str, list[dict[str, Any]]]] = []
+    for period, period_buckets in buckets.items():
+        period_buckets = sorted(period_buckets, key=lambda bucket: bucket["start"])
+        if pieces:
+            finer_period, finer = pieces[0]
+            period_buckets = [
+                bucket for bucket in period_buckets if bucket["start"] < finer[0]["start"]
+            ]
+            if period_buckets:
+                covered = period_buckets[-1]["start"] + STATISTICS_PERIODS[period]
+                finer = [bucket for bucket in finer if bucket["start"] >= covered]
+                pieces[0] = (finer_period, finer)
+                if not finer:
+                    del pieces[0]
+        if period_buckets:
+            pieces.insert(0, (period, period_buckets))
+    return pieces
+
+
+class _EnergyAtSamples(Sequence[float]):
+    """Energy at each power sample, interpolated when it is read.
+
+    The state machine only reads the energy at cycle boundaries, so the
+    energy series is not interpolated for every power sample.
+    """
+
+    def __init__(
+        self,
+        importer: HistoricalCycleImporter,
+        energy_history: list[tuple[datetime, float]],
+        timestamps: list[datetime],
+    ) -> None:
+        """Initialize the lookup with the energy series sorted by time."""
+        energy_history = sorted(energy_history, key=lambda sample: sample[0])
+        self._importer = importer
+        self._energy_times = [ts.timestamp() for ts, _val in energy_history]
+        self._energy_values = [val for _ts, val in energy_history]
+        self._timestamps = timestamps
+
+    def __len__(self) -> int:
+        """Return the number of power samples."""
+        return len(self._timestamps)
+
+    def __getitem__(self, index: int) -> float:
+        """Return the energy at a power sample."""
+        return self._importer._get_energy_at_time(
+            self._energy_times, self._energy_values, self._timestamps[index]
+        )
+
 
 class HistoricalCycleImporter:
     """Import historical cycles from power sensor data."""
@@ -31,6 +243,9 @@ class HistoricalCycleImporter:
         start_delay: int,
         stop_delay: int,
         price_kwh: float,
+        price_entity: str | None = None,
+        alert_duration: int | None = None,
+        unplugged_timeout: int = 300,
     ):
         """Initialize the importer.
         
@@ -46,6 +261,12 @@ class HistoricalCycleImporter:
             start_delay: Delay before confirming start (seconds)
             stop_delay: Delay before confirming stop (seconds)
             price_kwh: Price per kWh for cost calculation
+            price_entity: Optional price entity whose history is used to cost
+                each cycle at the prices that applied while it ran
+            alert_duration: Duration alert of the appliance (seconds), which
+                like unplugged_timeout affects when the live detector
+                confirms a stop
+            unplugged_timeout: Time at 0W before the appliance is unplugged (seconds)
         """
         self.hass = hass
         self.appliance_id = appliance_id
@@ -58,6 +279,52 @@ class HistoricalCycleImporter:
         self.start_delay = start_delay
         self.stop_delay = stop_delay
         self.price_kwh = price_kwh
+        self.price_entity = price_entity
+        self.alert_duration = alert_duration
+        self.unplugged_timeout = unplugged_timeout
+        self._price_timeline: PriceTimeline | None = None
+        self._cancel_requested = False
+        # Detector state, carried over from one import window to the next
+        self._state_machine = self._create_state_machine()
+        self._statistics_cycle: dict[str, Any] | None = None
+        self._statistics_last_sum: float | None = None
+
+    @callback
+    def cancel(self) -> None:
+        """Request the running import to stop after the current window."""
+        self._cancel_requested = True
+
+    def _create_state_machine(self) -> CycleStateMachine:
+        """Create a state machine configured like the live appliance."""
+        return CycleStateMachine(
+            start_threshold=self.start_threshold,
+            stop_threshold=self.stop_threshold,
+            start_delay=self.start_delay,
+            stop_delay=self.stop_delay,
+            alert_duration=self.alert_duration,
+            unplugged_timeout=self.unplugged_timeout,
+        )
+
+    def _reset_detection(self) -> None:
+        """Forget any cycle in progress."""
+        self._state_machine = self._create_state_machine()
+        self._statistics_cycle = None
+        self._statistics_last_sum = None
+
+    def _detector_state(self) -> dict[str, Any]:
+        """Return the detector state as JSON-serializable data."""
+        return {
+            "state_machine": self._state_machine.snapshot(),
+            "statistics_cycle": self._statistics_cycle,
+            "statistics_last_sum": self._statistics_last_sum,
+        }
+
+    def _restore_detector_state(self, state: dict[str, Any]) -> None:
+        """Restore a detector state saved by _detector_state()."""
+        self._reset_detection()
+        self._state_machine.restore(state.get("state_machine") or {})
+        self._statistics_cycle = state.get("statistics_cycle")
+        self._statistics_last_sum = state.get("statistics_last_sum")
 
     async def async_import_cycles(
         self,
@@ -65,115 +332,53 @@ class HistoricalCycleImporter:
         period_end: datetime | None = None,
         dry_run: bool = False,
         replace_existing: bool = False,
+        source: str = IMPORT_SOURCE_AUTO,
+        incremental: bool = False,
     ) -> dict[str, Any]:
         """Import historical cycles from power sensor data.
         
+        The period is streamed in IMPORT_WINDOW windows (see
+        BatchCycleImporter): only the history of one window is held in
+        memory, and a cycle running across a window boundary is carried over
+        to the next window. cancel() stops the import after the current
+        window; windows already saved are kept.
+        
         Args:
             period_start: Start of the import period (default: 30 days ago)
             period_end: End of the import period (default: now)
             dry_run: If True, analyze without saving events
             replace_existing: If True, delete existing cycles in period before importing
+            source: History to read, one of IMPORT_SOURCES
+            incremental: If True, resume from the saved import watermark
             
         Returns:
             Dictionary with import results
         """
-        # Default period: last 30 days
-        if period_end is None:
-            period_end = datetime.now()
-        if period_start is None:
-            period_start = period_end - timedelta(days=30)
-
-        _LOGGER.info(
-            "Starting historical cycle import for '%s' (%s to %s, dry_run=%s)",
-            self.appliance_name,
-            period_start.strftime("%Y-%m-%d"),
-            period_end.strftime("%Y-%m-%d"),
-            dry_run,
+        results = await BatchCycleImporter(self.hass, [self]).async_import_cycles(
+            period_start, period_end, dry_run, replace_existing, source, incremental
         )
+        return results[self.appliance_id]
 
-        try:
-            # Get power sensor history
-            power_history = await self._async_get_sensor_history(
-                self.power_sensor,
-                period_start,
-                period_end,
-            )
-
-            if not power_history:
-                _LOGGER.warning(
-                    "No power sensor history found for '%s' in the specified period",
-                    self.appliance_name,
-                )
-                return {
-                    "success": False,
-                    "error": "No sensor history found",
-                    "cycles_detected": 0,
-                }
-
-            # Get energy sensor history
-            energy_history = await self._async_get_sensor_history(
-                self.energy_sensor,
-                period_start,
-                period_end,
-            )
-
-            _LOGGER.debug(
-                "Retrieved %d power states and %d energy states",
-                len(power_history),
-                len(energy_history),
-            )
-
-            # Detect cycles from power history
-            cycles = self._detect_cycles_from_history(power_history, energy_history)
-
-            _LOGGER.info(
-                "Detected %d cycles for '%s' in period %s to %s",
-                len(cycles),
-                self.appliance_name,
-                period_start.strftime("%Y-%m-%d"),
-                period_end.strftime("%Y-%m-%d"),
-            )
-
-            # Calculate statistics by period
-            stats_by_month = self._calculate_monthly_stats(cycles)
-
-            # Save cycles as events (if not dry_run)
-            if not dry_run and cycles:
-                await self._async_save_cycles_as_events(
-                    cycles, 
-                    replace_existing,
-                    period_start,
-                    period_end,
-                )
-                action = "réimportés" if replace_existing else "importés"
-                _LOGGER.info(
-                    "%d cycles historiques %s pour '%s'",
-                    len(cycles),
-                    action,
-                    self.appliance_name,
-                )
-
-            return {
-                "success": True,
-                "cycles_detected": len(cycles),
-                "period_start": period_start.isoformat(),
-                "period_end": period_end.isoformat(),
-                "dry_run": dry_run,
-                "stats_by_month": stats_by_month,
-                "cycles": cycles if dry_run else None,  # Include cycles in dry_run
-            }
-
-        except Exception as err:
-            _LOGGER.error(
-                "Error importing historical cycles for '%s': %s",
-                self.appliance_name,
-                err,
-            )
-            return {
-                "success": False,
-                "error": str(err),
-                "cycles_detected": 0,
-            }
+    def _fire_progress(
+        self,
+        period_start: datetime,
+        period_end: datetime,
+        processed_until: datetime,
+        cycles_detected: int,
+    ) -> None:
+        """Fire an import progress event after a window."""
+        total = (period_end - period_start).total_seconds()
+        done = (processed_until - period_start).total_seconds()
+        self.hass.bus.async_fire(
+            f"{DOMAIN}_import_progress",
+            {
+                "appliance_id": self.appliance_id,
+                "appliance_name": self.appliance_name,
+                "processed_until": processed_until.isoformat(),
+                "progress": round(100 * done / total, 1) if total > 0 else 100.0,
+                "cycles_detected": cycles_detected,
+            },
+        )
 
     async def _async_get_sensor_history(
         self,
@@ -191,175 +396,233 @@ class HistoricalCycleImporter:
         Returns:
             List of (timestamp, value) tuples
         """
-        from homeassistant.components.recorder import history
-
-        recorder_instance = get_instance(self.hass)
-        if recorder_instance is None:
-            _LOGGER.error("Recorder not available")
-            return []
-
-        # Use history API instead of direct SQL queries
-        def get_states() -> list[tuple[datetime, float]]:
-            """Get states from history (sync method)."""
-            # Get history for the entity
-            history_states = history.get_significant_states(
-                self.hass,
-                start_time,
-                end_time,
-                entity_ids=[entity_id],
-                significant_changes_only=False,
-            )
-            
-            if entity_id not in history_states:
-                _LOGGER.warning("No history found for entity '%s'", entity_id)
-                return []
-            
-            states = []
-            for state in history_states[entity_id]:
-                try:
-                    value = float(state.state)
-                    states.append((state.last_updated, value))
-                except (ValueError, TypeError, AttributeError):
-                    # Skip invalid states
-                    continue
-            
-            return states
-
-        return await recorder_instance.async_add_executor_job(get_states)
+        histories = await _async_get_histories(
+            self.hass, [entity_id], start_time, end_time
+        )
+        return histories.get(entity_id, [])
 
     def _detect_cycles_from_history(
         self,
         power_history: list[tuple[datetime, float]],
         energy_history: list[tuple[datetime, float]],
-    ) -> list[dict[str, Any]]:
+    ) -> list[CycleRecord]:
         """Detect cycles from power sensor history.
         
+        The samples are replayed through the same CycleStateMachine as live
+        monitoring (see CycleStateMachine.replay()), so imported cycles
+        match the ones the appliance would have recorded. The state machine
+        is kept on the importer, so a cycle still running at the end of the
+        history is completed by the next call.
+        
         Args:
             power_history: List of (timestamp, power) tuples
             energy_history: List of (timestamp, energy) tuples
             
         Returns:
-            List of detected cycles
+            List of cycles finished in this history
+        """
+        timestamps = [timestamp for timestamp, _power in power_history]
+        events = self._state_machine.replay(
+            timestamps,
+            [power for _timestamp, power in power_history],
+            _EnergyAtSamples(self, energy_history, timestamps),
+        )
+
+        cycles = []
+        for _timestamp, event, cycle in events:
+            if event != EVENT_CYCLE_FINISHED:
+                continue
+            energy_consumed = cycle.end_energy - cycle.start_energy
+            # Only add valid cycles (positive duration and energy)
+            if cycle.duration <= 0 or energy_consumed <= 0:
+                continue
+            # The event carries a copy of the cycle, completed in place
+            cycle.energy = round(energy_consumed, 3)
+            cycle.cost = round(
+                self._calculate_cost(cycle.start_time, cycle.end_time, energy_consumed), 2
+            )
+            cycle.peak_power = round(cycle.peak_power, 1)
+            cycle.start_energy = round(cycle.start_energy, 3)
+            cycle.end_energy = round(cycle.end_energy, 3)
+            cycle.source = CYCLE_SOURCE_IMPORT
+            cycles.append(cycle)
+        return cycles
+
+    def _detect_cycles_from_statistics(
+        self,
+        power_statistics: list[dict[str, Any]],
+        energy_statistics: list[dict[str, Any]],
+        bucket_seconds: int,
+        close_pending: bool = False,
+    ) -> list[CycleRecord]:
+        """Approximate cycles from long-term statistics buckets.
+        
+        A bucket is active when its max power reaches the start threshold
+        and its mean power stays above the stop threshold; consecutive
+        active buckets form a cycle. Start and end are rounded to bucket
+        boundaries, and the energy comes from the energy sensor sum (or from
+        the mean power without it). Cycles are flagged as low_precision.
+        
+        Args:
+            power_statistics: Buckets of the power sensor (mean, max)
+            energy_statistics: Buckets of the energy sensor (sum)
+            bucket_seconds: Length of a bucket
+            close_pending: If True, finish a cycle still active after the last bucket
+            
+        Returns:
+            List of cycles finished in these buckets
         """
         cycles = []
-        current_cycle = None
-        above_threshold_since = None
-        below_threshold_since = None
-
-        # Create energy lookup dict for faster access
-        energy_dict = {ts: val for ts, val in energy_history}
-
-        for timestamp, power in power_history:
-            # Check for cycle start
-            if current_cycle is None:
-                if power >= self.start_threshold:
-                    if above_threshold_since is None:
-                        above_threshold_since = timestamp
-                    elif (timestamp - above_threshold_since).total_seconds() >= self.start_delay:
-                        # Cycle started
-                        energy_at_start = self._get_energy_at_time(energy_dict, timestamp)
-                        current_cycle = {
-                            "start_time": above_threshold_since,
-                            "start_energy": energy_at_start,
-                            "peak_power": power,
-                        }
-                        above_threshold_since = None
-                        below_threshold_since = None
-                else:
-                    above_threshold_since = None
-
-            # Check for cycle end
-            else:
-                # Update peak power
-                if power > current_cycle["peak_power"]:
-                    current_cycle["peak_power"] = power
-
-                if power <= self.stop_threshold:
-                    if below_threshold_since is None:
-                        below_threshold_since = timestamp
-                    elif (timestamp - below_threshold_since).total_seconds() >= self.stop_delay:
-                        # Cycle ended
-                        energy_at_end = self._get_energy_at_time(energy_dict, timestamp)
-                        
-                        # Calculate cycle metrics
-                        duration_seconds = (timestamp - current_cycle["start_time"]).total_seconds()
-                        duration_minutes = duration_seconds / 60
-                        energy_consumed = energy_at_end - current_cycle["start_energy"]
-                        cost = energy_consumed * self.price_kwh
-
-                        # Only add valid cycles (positive duration and energy)
-                        if duration_minutes > 0 and energy_consumed > 0:
-                            cycles.append({
-                                "start_time": current_cycle["start_time"].isoformat(),
-                                "end_time": timestamp.isoformat(),
-                                "duration": round(duration_minutes, 1),
-                                "energy": round(energy_consumed, 3),
-                                "cost": round(cost, 2),
-                                "peak_power": round(current_cycle["peak_power"], 1),
-                                "start_energy": round(current_cycle["start_energy"], 3),
-                                "end_energy": round(energy_at_end, 3),
-                            })
-
-                        # Reset for next cycle
-                        current_cycle = None
-                        below_threshold_since = None
-                        above_threshold_since = None
-                else:
-                    below_threshold_since = None
+        energy_sums = {
+            bucket["start"]: bucket["sum"]
+            for bucket in energy_statistics
+            if bucket["sum"] is not None
+        }
+
+        for bucket in sorted(power_statistics, key=lambda bucket: bucket["start"]):
+            mean = bucket["mean"]
+            if mean is None:
+                continue
+            peak = bucket["max"] if bucket["max"] is not None else mean
+            bucket_sum = energy_sums.get(bucket["start"])
+
+            if peak >= self.start_threshold and mean > self.stop_threshold:
+                if self._statistics_cycle is None:
+                    self._statistics_cycle = {
+                        "start": bucket["start"],
+                        "start_energy": self._statistics_last_sum,
+                        "peak_power": peak,
+                        "estimated_energy": 0.0,
+                    }
+                cycle = self._statistics_cycle
+                cycle["end"] = bucket["start"] + bucket_seconds
+                cycle["end_energy"] = bucket_sum
+                cycle["peak_power"] = max(cycle["peak_power"], peak)
+                cycle["estimated_energy"] += mean * bucket_seconds / 3_600_000
+            elif self._statistics_cycle is not None:
+                cycles.extend(self._finish_statistics_cycle())
+
+            if bucket_sum is not None:
+                self._statistics_last_sum = bucket_sum
 
+        if close_pending and self._statistics_cycle is not None:
+            cycles.extend(self._finish_statistics_cycle())
         return cycles
 
+    def _finish_statistics_cycle(self) -> list[CycleRecord]:
+        """Build the pending statistics cycle, if valid."""
+        cycle = self._statistics_cycle
+        self._statistics_cycle = None
+
+        start_energy = cycle["start_energy"]
+        end_energy = cycle["end_energy"]
+        if start_energy is not None and end_energy is not None:
+            energy_consumed = end_energy - start_energy
+        else:
+            energy_consumed = cycle["estimated_energy"]
+            start_energy = end_energy = 0.0
+
+        duration_minutes = (cycle["end"] - cycle["start"]) / 60
+        if duration_minutes <= 0 or energy_consumed <= 0:
+            return []
+
+        record = CycleRecord(
+            start_ts=cycle["start"],
+            end_ts=cycle["end"],
+            duration=round(duration_minutes, 1),
+            energy=round(energy_consumed, 3),
+            peak_power=round(cycle["peak_power"], 1),
+            start_energy=round(start_energy, 3),
+            end_energy=round(end_energy, 3),
+            source=CYCLE_SOURCE_STATISTICS,
+        )
+        record.cost = round(
+            self._calculate_cost(record.start_time, record.end_time, energy_consumed), 2
+        )
+        return [record]
+
+    def _calculate_cost(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        energy: float,
+    ) -> float:
+        """Calculate the cost of a cycle.
+        
+        With a price history, the energy is spread evenly over the cycle and
+        costed at the prices that applied during it; otherwise the fixed price
+        is used.
+        
+        Args:
+            start_time: Start of the cycle
+            end_time: End of the cycle
+            energy: Energy consumed during the cycle (kWh)
+            
+        Returns:
+            Cost of the cycle
+        """
+        if not self._price_timeline:
+            return energy * self.price_kwh
+        return self._price_timeline.integrate_cost(
+            start_time.timestamp(), end_time.timestamp(), energy
+        )
+
     def _get_energy_at_time(
         self,
-        energy_dict: dict[datetime, float],
+        energy_times: list[float],
+        energy_values: list[float],
         target_time: datetime,
     ) -> float:
-        """Get energy value at specific time (or closest).
+        """Get energy value at specific time.
+        
+        Between two samples the value is interpolated linearly. Outside the
+        recorded range, the first or last sample is used if it is within
+        ENERGY_SAMPLE_TOLERANCE of the target.
         
         Args:
-            energy_dict: Dictionary of timestamp -> energy
+            energy_times: Sorted sample timestamps (epoch seconds)
+            energy_values: Energy values matching energy_times
             target_time: Target timestamp
             
         Returns:
-            Energy value at or near the target time
+            Energy value at the target time, or 0.0 without nearby sample
         """
-        # Try exact match first
-        if target_time in energy_dict:
-            return energy_dict[target_time]
-
-        # Find closest timestamp (within 5 minutes)
-        closest_time = None
-        closest_diff = timedelta(minutes=5)
+        if not energy_times:
+            return 0.0
 
-        for ts in energy_dict:
-            diff = abs(ts - target_time)
-            if diff < closest_diff:
-                closest_diff = diff
-                closest_time = ts
+        target = target_time.timestamp()
+        index = bisect_left(energy_times, target)
 
-        if closest_time:
-            return energy_dict[closest_time]
+        if index == len(energy_times):
+            if target - energy_times[-1] <= ENERGY_SAMPLE_TOLERANCE:
+                return energy_values[-1]
+            return 0.0
+        if energy_times[index] == target:
+            return energy_values[index]
+        if index == 0:
+            if energy_times[0] - target <= ENERGY_SAMPLE_TOLERANCE:
+                return energy_values[0]
+            return 0.0
 
-        # Fallback to 0 if no close match
-        return 0.0
+        before, after = energy_times[index - 1], energy_times[index]
+        ratio = (target - before) / (after - before)
+        return energy_values[index - 1] + ratio * (
+            energy_values[index] - energy_values[index - 1]
+        )
 
-    def _calculate_monthly_stats(
+    def _add_monthly_stats(
         self,
-        cycles: list[dict[str, Any]],
-    ) -> dict[str, dict[str, Any]]:
-        """Calculate statistics by month.
+        stats_by_month: dict[str, dict[str, Any]],
+        cycles: list[CycleRecord],
+    ) -> None:
+        """Add cycles to statistics by month.
         
         Args:
+            stats_by_month: Dictionary of month -> statistics, updated in place
             cycles: List of detected cycles
-            
-        Returns:
-            Dictionary of month -> statistics
         """
-        stats_by_month = {}
-
         for cycle in cycles:
-            start_time = datetime.fromisoformat(cycle["start_time"])
-            month_key = start_time.strftime("%Y-%m")
+            month_key = cycle.start_time.strftime("%Y-%m")
 
             if month_key not in stats_by_month:
                 stats_by_month[month_key] = {
@@ -369,45 +632,63 @@ class HistoricalCycleImporter:
                 }
 
             stats_by_month[month_key]["cycle_count"] += 1
-            stats_by_month[month_key]["total_energy"] += cycle["energy"]
-            stats_by_month[month_key]["total_cost"] += cycle["cost"]
-
-        # Round values
-        for month_stats in stats_by_month.values():
-            month_stats["total_energy"] = round(month_stats["total_energy"], 3)
-            month_stats["total_cost"] = round(month_stats["total_cost"], 2)
+            stats_by_month[month_key]["total_energy"] += cycle.energy
+            stats_by_month[month_key]["total_cost"] += cycle.cost
 
-        return stats_by_month
-
-    async def _async_save_cycles_as_events(
+    async def _async_delete_existing_cycles(
         self,
-        cycles: list[dict[str, Any]],
-        replace_existing: bool = False,
-        period_start: datetime | None = None,
-        period_end: datetime | None = None,
+        period_start: datetime,
+        period_end: datetime,
     ) -> None:
-        """Save detected cycles as events in Recorder.
+        """Delete the cycles saved in a period.
+        
+        With the cycle store, cycles are only deleted from it: its cycles
+        take precedence over the Recorder events of the same period. The
+        Recorder events are only deleted without it.
         
         Args:
-            cycles: List of cycles to save
-            replace_existing: If True, delete existing events in period first
-            period_start: Start of the period (for deletion)
-            period_end: End of the period (for deletion)
+            period_start: Start of the period
+            period_end: End of the period
         """
-        # If replace_existing, delete old events in the period first
-        if replace_existing and period_start and period_end:
+        cycle_store = self.hass.data.get(DOMAIN, {}).get("cycle_store")
+        if cycle_store is not None:
+            deleted_count = await cycle_store.async_delete_cycles(
+                self.appliance_id, period_start, period_end
+            )
+        else:
             deleted_count = await self._async_delete_events_in_period(
                 period_start, period_end
             )
-            if deleted_count > 0:
-                _LOGGER.info(
-                    "Deleted %d existing cycle events for '%s' in period %s to %s",
-                    deleted_count,
-                    self.appliance_name,
-                    period_start.date(),
-                    period_end.date(),
-                )
+        if deleted_count > 0:
+            _LOGGER.info(
+                "Deleted %d existing cycles for '%s' in period %s to %s",
+                deleted_count,
+                self.appliance_name,
+                period_start.date(),
+                period_end.date(),
+            )
+
+    def _cycles_for_store(self, cycles: list[CycleRecord]) -> list[CycleRecord]:
+        """Add the appliance identity to cycles written to the cycle store."""
+        for cycle in cycles:
+            cycle.appliance_name = self.appliance_name
+            cycle.appliance_type = self.appliance_type
+        return cycles
+
+    def _fire_cycle_events(
+        self,
+        cycles: list[CycleRecord],
+        replace_existing: bool = False,
+    ) -> None:
+        """Fire the cycle_finished events of imported cycles for the Recorder.
         
+        Only used without the cycle store: the events get the current
+        time_fired, the real timestamps are in their data.
+        
+        Args:
+            cycles: List of cycles to save
+            replace_existing: If True, mark the events as reimported
+        """
         event_type = f"{DOMAIN}_cycle_finished"
 
         for cycle in cycles:
@@ -417,16 +698,17 @@ class HistoricalCycleImporter:
                 "appliance_type": self.appliance_type,
                 "appliance_id": self.appliance_id,
                 "entry_id": self.appliance_id,
-                "duration": cycle["duration"],
-                "energy": cycle["energy"],
-                "cost": cycle["cost"],
-                "peak_power": cycle["peak_power"],
-                "start_time": cycle["start_time"],
-                "end_time": cycle["end_time"],
-                "start_energy": cycle["start_energy"],
-                "end_energy": cycle["end_energy"],
+                "duration": cycle.duration,
+                "energy": cycle.energy,
+                "cost": cycle.cost,
+                "peak_power": cycle.peak_power,
+                "start_time": cycle.start_time.isoformat(),
+                "end_time": cycle.end_time.isoformat(),
+                "start_energy": cycle.start_energy,
+                "end_energy": cycle.end_energy,
                 "imported": True,  # Mark as imported
                 "reimported": replace_existing,  # Mark if replacing
+                "low_precision": cycle.low_precision,
             }
 
             # Fire event (will be recorded by Recorder)
@@ -450,9 +732,7 @@ class HistoricalCycleImporter:
         Returns:
             Number of events deleted
         """
-        from homeassistant.components.recorder import get_instance
-        
-        recorder_instance = get_instance(self.hass)
+        recorder_instance = _get_recorder(self.hass)
         if recorder_instance is None:
             _LOGGER.error("Recorder not available")
             return 0
@@ -519,3 +799,492 @@ class HistoricalCycleImporter:
         return await recorder_instance.async_add_executor_job(_delete_events)
 
 
+class BatchCycleImporter:
+    """Import the historical cycles of several appliances in one pass.
+
+    Each window of the period is read with a single Recorder query covering
+    the power and energy sensors of every appliance. Detection then runs for
+    all appliances in parallel in the executor, and the cycles found are
+    written to the cycle store in one transaction.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        importers: list[HistoricalCycleImporter],
+    ) -> None:
+        """Initialize the batch.
+        
+        Args:
+            hass: Home Assistant instance
+            importers: Importers of the appliances, one per appliance
+        """
+        self.hass = hass
+        self.importers = importers
+
+    @callback
+    def cancel(self) -> None:
+        """Request every import of the batch to stop after the current window."""
+        for importer in self.importers:
+            importer.cancel()
+
+    async def async_import_cycles(
+        self,
+        period_start: datetime | None = None,
+        period_end: datetime | None = None,
+        dry_run: bool = False,
+        replace_existing: bool = False,
+        source: str = IMPORT_SOURCE_AUTO,
+        incremental: bool = False,
+    ) -> dict[str, dict[str, Any]]:
+        """Import historical cycles of all appliances of the batch.
+        
+        In auto mode, the part of the period older than the Recorder purge
+        horizon is read from long-term statistics and the rest from states.
+        
+        In incremental mode, each appliance resumes from its watermark in the
+        cycle store (or from period_start before the first incremental
+        import) with the detector state saved there, so only new samples are
+        read and a cycle running at the watermark is completed. Watermarks
+        are saved with the cycles they cover.
+        
+        Args:
+            period_start: Start of the import period (default: 30 days ago)
+            period_end: End of the import period (default: now)
+            dry_run: If True, analyze without saving events
+            replace_existing: If True, delete existing cycles in period before importing
+            source: History to read, one of IMPORT_SOURCES
+            incremental: If True, resume each appliance from its import watermark
+            
+        Returns:
+            Dictionary of appliance ID -> import results
+        """
+        # Default period: last 30 days
+        if period_end is None:
+            period_end = datetime.now()
+        if period_start is None:
+            period_start = period_end - timedelta(days=30)
+
+        _LOGGER.info(
+            "Starting historical cycle import for %s (%s to %s, dry_run=%s)",
+            ", ".join(f"'{importer.appliance_name}'" for importer in self.importers),
+            period_start.strftime("%Y-%m-%d"),
+            period_end.strftime("%Y-%m-%d"),
+            dry_run,
+        )
+
+        cycle_store = self.hass.data.get(DOMAIN, {}).get("cycle_store")
+        runs = {}
+        for importer in self.importers:
+            importer._cancel_requested = False
+            importer._reset_detection()
+            run_start = period_start
+            watermark = None
+            if incremental and cycle_store is not None:
+                watermark = await cycle_store.async_get_watermark(importer.appliance_id)
+            if watermark is not None and watermark[0] > period_start:
+                run_start = min(watermark[0], period_end)
+                importer._restore_detector_state(watermark[1])
+            runs[importer.appliance_id] = {
+                # Samples before run_start were processed by a previous import
+                "start": run_start,
+                "resumed": watermark is not None,
+                "cycles_detected": 0,
+                "power_states": 0,
+                "stats_by_month": {},
+                # Cycles are only kept in memory for the dry-run report
+                "cycles": [],
+                "low_precision_cycles": 0,
+                "existing_deleted": False,
+                "processed_until": run_start,
+                "error": None,
+            }
+
+        # Watermarks are only saved once the cycles they cover are written
+        def watermarks() -> dict[str, tuple[datetime, dict[str, Any]]] | None:
+            if not incremental or dry_run:
+                return None
+            return {
+                importer.appliance_id: (
+                    runs[importer.appliance_id]["processed_until"],
+                    importer._detector_state(),
+                )
+                for importer in self.importers
+                if runs[importer.appliance_id]["error"] is None
+            }
+
+        # Cycles waiting to be written, committed in batches
+        pending: dict[HistoricalCycleImporter, list[CycleRecord]] = {}
+        pending_source = CYCLE_SOURCE_IMPORT
+        window_start = min(run["start"] for run in runs.values()) if runs else period_start
+        try:
+            await self._async_load_price_timeline(period_start, period_end)
+
+            horizon = None
+            if source == IMPORT_SOURCE_AUTO:
+                horizon = self._get_states_horizon()
+            while window_start < period_end:
+                active = [
+                    importer
+                    for importer in self.importers
+                    if not importer._cancel_requested
+                    and runs[importer.appliance_id]["error"] is None
+                    and runs[importer.appliance_id]["start"] < period_end
+                ]
+                if not active:
+                    break
+
+                use_statistics = source == IMPORT_SOURCE_STATISTICS or (
+                    horizon is not None and window_start < horizon
+                )
+                if use_statistics:
+                    window_end = min(window_start + STATISTICS_IMPORT_WINDOW, period_end)
+                    if horizon is not None:
+                        window_end = min(window_end, horizon)
+                    # A cycle still running at the horizon ends there
+                    results = await self._async_detect_from_statistics(
+                        active,
+                        runs,
+                        window_start,
+                        window_end,
+                        close_pending=window_end == horizon,
+                    )
+                else:
+                    window_end = min(window_start + IMPORT_WINDOW, period_end)
+                    results = await self._async_detect_from_states(
+                        active, runs, window_start, window_end
+                    )
+
+                window_source = (
+                    CYCLE_SOURCE_STATISTICS if use_statistics else CYCLE_SOURCE_IMPORT
+                )
+                if pending and window_source != pending_source:
+                    await self._async_save_cycles(
+                        pending, runs, period_start, period_end, replace_existing, pending_source
+                    )
+                    pending = {}
+                pending_source = window_source
+
+                for importer, cycles in zip(active, results):
+                    run = runs[importer.appliance_id]
+                    if isinstance(cycles, Exception):
+                        _LOGGER.error(
+                            "Error detecting historical cycles for '%s': %s",
+                            importer.appliance_name,
+                            cycles,
+                        )
+                        run["error"] = str(cycles)
+                        continue
+                    run["cycles_detected"] += len(cycles)
+                    if use_statistics:
+                        run["low_precision_cycles"] += len(cycles)
+                    run["processed_until"] = window_end
+                    importer._add_monthly_stats(run["stats_by_month"], cycles)
+                    if dry_run:
+                        run["cycles"].extend(cycles)
+                    elif cycles:
+                        pending.setdefault(importer, []).extend(cycles)
+
+                if sum(len(cycles) for cycles in pending.values()) >= IMPORT_COMMIT_SIZE:
+                    await self._async_save_cycles(
+                        pending,
+                        runs,
+                        period_start,
+                        period_end,
+                        replace_existing,
+                        pending_source,
+                        watermarks(),
+                    )
+                    pending = {}
+
+                for importer in active:
+                    run = runs[importer.appliance_id]
+                    if run["error"] is None:
+                        importer._fire_progress(
+                            period_start, period_end, window_end, run["cycles_detected"]
+                        )
+                window_start = window_end
+
+            final_watermarks = watermarks()
+            if pending or final_watermarks:
+                await self._async_save_cycles(
+                    pending,
+                    runs,
+                    period_start,
+                    period_end,
+                    replace_existing,
+                    pending_source,
+                    final_watermarks,
+                )
+
+        except Exception as err:
+            _LOGGER.error("Error importing historical cycles: %s", err)
+            for run in runs.values():
+                run["error"] = run["error"] or str(err)
+
+        return {
+            importer.appliance_id: self._build_result(
+                importer,
+                runs[importer.appliance_id],
+                period_start,
+                period_end,
+                dry_run,
+                replace_existing,
+            )
+            for importer in self.importers
+        }
+
+    def _get_states_horizon(self) -> datetime | None:
+        """Return the start of the states kept by the Recorder, at midnight.
+
+        Without the Recorder there is no horizon and states are read, which
+        reports the Recorder as not available.
+        """
+        recorder_instance = _get_recorder(self.hass)
+        keep_days = getattr(recorder_instance, "keep_days", None)
+        if not isinstance(keep_days, int):
+            return None
+        # One day of margin, the oldest day may already be partly purged
+        horizon = datetime.now() - timedelta(days=max(keep_days - 1, 0))
+        return horizon.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    async def _async_detect_from_states(
+        self,
+        active: list[HistoricalCycleImporter],
+        runs: dict[str, dict[str, Any]],
+        window_start: datetime,
+        window_end: datetime,
+    ) -> list[list[CycleRecord] | BaseException]:
+        """Detect the cycles of a window from the recorded states."""
+        # Samples near the edges so energy boundaries can be interpolated
+        tolerance = timedelta(seconds=ENERGY_SAMPLE_TOLERANCE)
+        entity_ids = list(
+            dict.fromkeys(
+                entity_id
+                for importer in active
+                for entity_id in (importer.power_sensor, importer.energy_sensor)
+            )
+        )
+        histories = await _async_get_histories(
+            self.hass,
+            entity_ids,
+            window_start - tolerance,
+            window_end + tolerance,
+        )
+
+        # The Recorder returns aware UTC times, the period is in naive local time
+        end = window_end.timestamp()
+        detections = []
+        for importer in active:
+            run_start = max(window_start, runs[importer.appliance_id]["start"]).timestamp()
+            power_history = [
+                sample
+                for sample in histories.get(importer.power_sensor, [])
+                if run_start <= sample[0].timestamp() < end
+            ]
+            runs[importer.appliance_id]["power_states"] += len(power_history)
+            detections.append(
+                self.hass.async_add_executor_job(
+                    importer._detect_cycles_from_history,
+                    power_history,
+                    histories.get(importer.energy_sensor, []),
+                )
+            )
+        del histories
+        return await asyncio.gather(*detections, return_exceptions=True)
+
+    async def _async_detect_from_statistics(
+        self,
+        active: list[HistoricalCycleImporter],
+        runs: dict[str, dict[str, Any]],
+        window_start: datetime,
+        window_end: datetime,
+        close_pending: bool = False,
+    ) -> list[list[CycleRecord] | BaseException]:
+        """Approximate the cycles of a window from long-term statistics.
+
+        5-minute statistics are purged with states, so near the purge horizon
+        they only cover the end of the window: hourly buckets are used before
+        them (see _merge_statistics).
+        """
+        statistic_ids = list(
+            dict.fromkeys(
+                entity_id
+                for importer in active
+                for entity_id in (importer.power_sensor, importer.energy_sensor)
+            )
+        )
+        statistics = {
+            period: await _async_get_statistics(
+                self.hass, statistic_ids, window_start, window_end, period
+            )
+            for period in STATISTICS_PERIODS
+        }
+
+        results: list[list[CycleRecord] | BaseException] = []
+        for importer in active:
+            run_start = runs[importer.appliance_id]["start"].timestamp()
+            pieces = _merge_statistics(
+                {
+                    period: [
+                        bucket
+                        for bucket in statistics[period].get(importer.power_sensor, [])
+                        if bucket["start"] >= run_start
+                    ]
+                    for period in STATISTICS_PERIODS
+                }
+            )
+            cycles: list[CycleRecord] = []
+            try:
+                for index, (period, power_statistics) in enumerate(pieces):
+                    runs[importer.appliance_id]["power_states"] += len(power_statistics)
+                    cycles.extend(
+                        importer._detect_cycles_from_statistics(
+                            power_statistics,
+                            statistics[period].get(importer.energy_sensor, []),
+                            STATISTICS_PERIODS[period],
+                            close_pending and index == len(pieces) - 1,
+                        )
+                    )
+            except Exception as err:
+                results.append(err)
+                continue
+            results.append(cycles)
+        return results
+
+    async def _async_load_price_timeline(
+        self, period_start: datetime, period_end: datetime
+    ) -> None:
+        """Load the price history once for all the importers of the batch."""
+        timelines: dict[str, PriceTimeline | None] = {}
+        for importer in self.importers:
+            # Get price history, so cycles are costed at the prices of the time
+            if importer.price_entity and importer.price_entity not in timelines:
+                price_history = await importer._async_get_sensor_history(
+                    importer.price_entity,
+                    period_start,
+                    period_end,
+                )
+                timelines[importer.price_entity] = (
+                    PriceTimeline.from_history(price_history) if price_history else None
+                )
+            importer._price_timeline = timelines.get(importer.price_entity)
+
+    async def _async_save_cycles(
+        self,
+        found: dict[HistoricalCycleImporter, list[CycleRecord]],
+        runs: dict[str, dict[str, Any]],
+        period_start: datetime,
+        period_end: datetime,
+        replace_existing: bool,
+        source: str,
+        watermarks: dict[str, tuple[datetime, dict[str, Any]]] | None = None,
+    ) -> None:
+        """Save imported cycles of all appliances in one cycle store transaction.
+
+        No bus event is fired: imported cycles are only written to the cycle
+        store, with their real end time, and cycles overlapping the ones it
+        already holds are skipped. Without the cycle store, cycles are
+        fired as cycle_finished events for the Recorder as before, and
+        watermarks are not kept.
+        """
+        for importer in found:
+            run = runs[importer.appliance_id]
+            # Existing cycles are only replaced once new ones are found
+            if replace_existing and not run["existing_deleted"]:
+                await importer._async_delete_existing_cycles(run["start"], period_end)
+                run["existing_deleted"] = True
+
+        cycle_store = self.hass.data.get(DOMAIN, {}).get("cycle_store")
+        written = 0
+        if cycle_store is not None:
+            written = await cycle_store.async_add_cycles_bulk(
+                {
+                    importer.appliance_id: importer._cycles_for_store(cycles)
+                    for importer, cycles in found.items()
+                },
+                source=source,
+                watermarks=watermarks,
+                # Cycles already stored (e.g. recorded live) are skipped
+                replace=replace_existing,
+            )
+
+        for importer, cycles in found.items():
+            if not written:
+                importer._fire_cycle_events(cycles, replace_existing)
+            invalidate_history_cache(self.hass, importer.appliance_id)
+        _LOGGER.debug(
+            "Saved %d imported cycles (%s)",
+            sum(len(cycles) for cycles in found.values()),
+            "cycle store" if written else "Recorder events",
+        )
+
+    @staticmethod
+    def _build_result(
+        importer: HistoricalCycleImporter,
+        run: dict[str, Any],
+        period_start: datetime,
+        period_end: datetime,
+        dry_run: bool,
+        replace_existing: bool,
+    ) -> dict[str, Any]:
+        """Build the import result of one appliance."""
+        if run["error"] is not None:
+            return {
+                "success": False,
+                "error": run["error"],
+                "cycles_detected": run["cycles_detected"],
+                "processed_until": run["processed_until"].isoformat(),
+            }
+
+        # Nothing recorded since the watermark is not an error
+        if not run["power_states"] and not run["resumed"]:
+            _LOGGER.warning(
+                "No power sensor history found for '%s' in the specified period",
+                importer.appliance_name,
+            )
+            return {
+                "success": False,
+                "error": "No sensor history found",
+                "cycles_detected": 0,
+            }
+
+        processed_until = run["processed_until"]
+        cancelled = processed_until < period_end
+        _LOGGER.info(
+            "Detected %d cycles for '%s' in period %s to %s%s",
+            run["cycles_detected"],
+            importer.appliance_name,
+            run["start"].strftime("%Y-%m-%d"),
+            processed_until.strftime("%Y-%m-%d"),
+            " (cancelled)" if cancelled else "",
+        )
+        if not dry_run and run["cycles_detected"]:
+            action = "reimported" if replace_existing else "imported"
+            _LOGGER.info(
+                "%d historical cycles %s for '%s'",
+                run["cycles_detected"],
+                action,
+                importer.appliance_name,
+            )
+
+        stats_by_month = run["stats_by_month"]
+        # Round values
+        for month_stats in stats_by_month.values():
+            month_stats["total_energy"] = round(month_stats["total_energy"], 3)
+            month_stats["total_cost"] = round(month_stats["total_cost"], 2)
+
+        return {
+            "success": True,
+            "cancelled": cancelled,
+            "cycles_detected": run["cycles_detected"],
+            "low_precision_cycles": run["low_precision_cycles"],
+            # Resumed from the watermark in incremental mode
+            "period_start": run["start"].isoformat(),
+            "period_end": period_end.isoformat(),
+            "processed_until": processed_until.isoformat(),
+            "dry_run": dry_run,
+            "stats_by_month": stats_by_month,
+            # Include cycles in dry_run
+            "cycles": [cycle.as_dict() for cycle in run["cycles"]] if dry_run else None,
+        }
@@ -0,0 +1,167 @@
+"""Hot-path timing instrumentation for Smart Appliance Monitor."""
+from __future__ import annotations
+
+import time
+from collections import deque
+from types import TracebackType
+from typing import Any
+
+# Number of recent measurements kept per stage
+LATENCY_WINDOW = 256
+
+# Instrumented coordinator stages
+STAGE_UPDATE = "update"
+STAGE_SAMPLE = "sample"
+STAGE_EVENT = "event"
+STAGE_SAVE = "save"
+STAGE_NOTIFY = "notify"
+STAGES = (STAGE_UPDATE, STAGE_SAMPLE, STAGE_EVENT, STAGE_SAVE, STAGE_NOTIFY)
+
+# Coordinator counters
+COUNTER_STATE_WRITES = "state_writes"
+COUNTER_SAVES_SCHEDULED = "saves_scheduled"
+COUNTER_STORE_FLUSHES = "store_flushes"
+COUNTERS = (COUNTER_STATE_WRITES, COUNTER_SAVES_SCHEDULED, COUNTER_STORE_FLUSHES)
+
+
+class LatencyHistogram:
+    """Rolling window of the latencies of one stage.
+
+    Measurements are appended to a bounded deque; percentiles are only
+    computed when the histogram is read.
+    """
+
+    def __init__(self, size: int = LATENCY_WINDOW) -> None:
+        """Initialize an empty histogram.
+
+        Args:
+            size: Number of recent measurements kept
+        """
+        self._samples: deque[float] = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, seconds: float) -> None:
+        """Record a measurement.
+
+        Args:
+            seconds: Duration of the stage
+        """
+        self._samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, percentile: float) -> float | None:
+        """Return a percentile of the window in seconds (nearest rank)."""
+        if not self._samples:
+            return None
+        samples = sorted(self._samples)
+        index = min(len(samples) - 1, max(0, round(percentile * len(samples)) - 1))
+        return samples[index]
+
+    @property
+    def maximum(self) -> float | None:
+        """Return the slowest measurement of the window in seconds."""
+        return max(self._samples) if self._samples else None
+
+    def summary(self) -> dict[str, Any]:
+        """Return the window statistics in milliseconds."""
+        return {
+            "count": self.count,
+            "p50_ms": _milliseconds(self.percentile(0.5)),
+            "p95_ms": _milliseconds(self.percentile(0.95)),
+            "max_ms": _milliseconds(self.maximum),
+        }
+
+
+class _StageTimer:
+    """Context manager recording the duration of a stage."""
+
+    __slots__ = ("_histogram", "_started")
+
+    def __init__(self, histogram: LatencyHistogram) -> None:
+        self._histogram = histogram
+        self._started = 0.0
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._histogram.add(time.perf_counter() - self._started)
+
+
+class _NullTimer:
+    """Context manager used while instrumentation is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Instrumentation:
+    """Latency histograms and counters of one coordinator.
+
+    While disabled, measure() returns a shared no-op context manager and
+    increment() returns immediately, so instrumented code paths only pay
+    for an attribute lookup.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        """Initialize the instrumentation.
+
+        Args:
+            enabled: Whether measurements are recorded
+        """
+        self.enabled = enabled
+        self.stages = {stage: LatencyHistogram() for stage in STAGES}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+
+    def measure(self, stage: str) -> _StageTimer | _NullTimer:
+        """Return a context manager timing a stage.
+
+        Args:
+            stage: One of STAGES
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self.stages[stage])
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        """Increment a counter.
+
+        Args:
+            counter: One of COUNTERS
+            amount: Value added to the counter
+        """
+        if self.enabled:
+            self.counters[counter] += amount
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histograms and counters (diagnostics)."""
+        return {
+            "enabled": self.enabled,
+            "stages": {
+                stage: histogram.summary() for stage, histogram in self.stages.items()
+            },
+            "counters": dict(self.counters),
+        }
+
+
+def _milliseconds(seconds: float | None) -> float | None:
+    """Convert an optional duration to rounded milliseconds."""
+    return round(seconds * 1000, 2) if seconds is not None else None
@@ -0,0 +1,259 @@
+"""Shared electricity price service for Smart Appliance Monitor."""
+from __future__ import annotations
+
+import logging
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .const import DEFAULT_PRICE_KWH
+
+_LOGGER = logging.getLogger(__name__)
+
+# How long price changes are kept in the in-memory timeline
+PRICE_TIMELINE_RETENTION = timedelta(days=3)
+
+
+class PriceTimeline:
+    """Price changes indexed by timestamp.
+
+    Timestamps are epoch seconds kept sorted, so the price in effect at a
+    given time is found with a binary search.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty timeline."""
+        self.timestamps: list[float] = []
+        self.prices: list[float] = []
+
+    def __len__(self) -> int:
+        """Return the number of price changes."""
+        return len(self.prices)
+
+    @classmethod
+    def from_history(cls, history: list[tuple[datetime, float]]) -> PriceTimeline:
+        """Build a timeline from (timestamp, price) pairs sorted by time."""
+        timeline = cls()
+        for when, price in history:
+            timeline.add(when.timestamp(), price)
+        return timeline
+
+    def add(self, when: float, price: float) -> None:
+        """Record a price change.
+
+        Args:
+            when: Time of the change in epoch seconds
+            price: New price per kWh
+        """
+        if self.prices and self.prices[-1] == price:
+            return
+        if self.timestamps and when < self.timestamps[-1]:
+            when = self.timestamps[-1]
+        self.timestamps.append(when)
+        self.prices.append(price)
+
+    def trim(self, horizon: float) -> None:
+        """Drop changes before a horizon, keeping the one in effect at it."""
+        expired = bisect_right(self.timestamps, horizon) - 1
+        if expired > 0:
+            del self.timestamps[:expired]
+            del self.prices[:expired]
+
+    def price_at(self, when: float) -> float:
+        """Return the price in effect at a time (epoch seconds).
+
+        Times before the first change use the oldest known price.
+        """
+        index = bisect_right(self.timestamps, when) - 1
+        return self.prices[max(index, 0)]
+
+    def segments(self, start: float, end: float) -> list[tuple[float, float]]:
+        """Return the (start time, price) segments covering a period."""
+        first = max(bisect_right(self.timestamps, start) - 1, 0)
+        last = bisect_right(self.timestamps, end)
+        segments = [(start, self.prices[first])]
+        segments.extend(
+            (self.timestamps[index], self.prices[index])
+            for index in range(first + 1, last)
+        )
+        return segments
+
+    def integrate_cost(self, start: float, end: float, energy: float) -> float:
+        """Return the cost of energy consumed evenly over a period.
+
+        The energy is split between the price segments of the period in
+        proportion to their duration. Periods without a price change, which
+        is the case for almost every sample of a running cycle, cost a single
+        binary search.
+
+        Args:
+            start: Start of the period (epoch seconds)
+            end: End of the period (epoch seconds)
+            energy: Energy consumed during the period (kWh)
+        """
+        first = max(bisect_right(self.timestamps, start) - 1, 0)
+        if end <= start or first + 1 >= len(self.timestamps) or self.timestamps[first + 1] >= end:
+            return energy * self.prices[first]
+
+        cost = 0.0
+        segments = self.segments(start, end)
+        for index, (segment_start, price) in enumerate(segments):
+            segment_end = segments[index + 1][0] if index + 1 < len(segments) else end
+            cost += energy * (segment_end - segment_start) / (end - start) * price
+        return cost
+
+
+class PriceService:
+    """Resolve the global price per kWh once for every appliance.
+
+    The service subscribes to the configured price entity and caches the
+    parsed value, so reading the price never touches the state machine.
+    Every price change is also recorded in a PriceTimeline, which lets
+    callers look up the price that applied at a given time and cost energy
+    consumed across price changes.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the service.
+
+        Args:
+            hass: Home Assistant instance
+        """
+        self.hass = hass
+        self.price_entity: str | None = None
+        self.fixed_price: float = DEFAULT_PRICE_KWH
+        self.current_price: float = DEFAULT_PRICE_KWH
+        self._unsub_price: CALLBACK_TYPE | None = None
+        self._configured = False
+
+        self.timeline = PriceTimeline()
+
+    @callback
+    def async_configure(self, price_config: dict[str, Any]) -> None:
+        """Apply the global price configuration.
+
+        Args:
+            price_config: Result of GlobalConfigManager.get_global_price_config()
+        """
+        price_entity = price_config.get("global_price_entity") or None
+        fixed_price = price_config.get("global_price_fixed")
+        if fixed_price is None:
+            fixed_price = DEFAULT_PRICE_KWH
+
+        if (
+            self._configured
+            and price_entity == self.price_entity
+            and fixed_price == self.fixed_price
+        ):
+            return
+
+        self.async_stop()
+        self._configured = True
+        self.price_entity = price_entity
+        self.fixed_price = float(fixed_price)
+
+        if price_entity:
+            self._unsub_price = async_track_state_change_event(
+                self.hass, [price_entity], self._async_handle_price_change
+            )
+            self._record(self._parse_state(self.hass.states.get(price_entity)))
+        else:
+            self._record(self.fixed_price)
+
+        _LOGGER.debug(
+            "Price service configured: entity=%s, fixed=%s, current=%s",
+            self.price_entity,
+            self.fixed_price,
+            self.current_price,
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Unsubscribe from the price entity."""
+        if self._unsub_price is not None:
+            self._unsub_price()
+            self._unsub_price = None
+
+    @callback
+    def _async_handle_price_change(self, event: Event) -> None:
+        """Record a new price published by the price entity."""
+        new_state = event.data.get("new_state")
+        when = new_state.last_changed.timestamp() if new_state is not None else None
+        self._record(self._parse_state(new_state), when)
+
+    def _parse_state(self, state: State | None) -> float:
+        """Parse the price entity state, falling back to the fixed price."""
+        if state is None or state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+            return self.fixed_price
+        try:
+            return float(state.state)
+        except (ValueError, TypeError):
+            _LOGGER.warning(
+                "Could not read price from %s, using fixed price",
+                self.price_entity,
+            )
+            return self.fixed_price
+
+    def _record(self, price: float, when: float | None = None) -> None:
+        """Cache a price and append it to the timeline.
+
+        Args:
+            price: Price per kWh
+            when: Time of the change in epoch seconds (default: now)
+        """
+        self.current_price = price
+        if when is None:
+            when = time.time()
+
+        self.timeline.add(when, price)
+        self.timeline.trim(when - PRICE_TIMELINE_RETENTION.total_seconds())
+
+    def price_at(self, when: datetime) -> float:
+        """Return the price per kWh that applied at a given time.
+
+        Args:
+            when: Naive local or timezone-aware datetime
+
+        Returns:
+            Recorded price at that time, or the oldest known price for times
+            before the timeline
+        """
+        if not self.timeline:
+            return self.current_price
+        return self.timeline.price_at(when.timestamp())
+
+    def price_changes(self, start: datetime, end: datetime) -> list[tuple[float, float]]:
+        """Return the price segments covering a period.
+
+        Args:
+            start: Start of the period
+            end: End of the period
+
+        Returns:
+            List of (epoch seconds, price) pairs, the first one at start
+        """
+        if not self.timeline:
+            return [(start.timestamp(), self.current_price)]
+        return self.timeline.segments(start.timestamp(), end.timestamp())
+
+    def integrate_cost(self, start: float, end: float, energy: float) -> float:
+        """Return the cost of energy consumed evenly over a period.
+
+        Args:
+            start: Start of the period (epoch seconds)
+            end: End of the period (epoch seconds)
+            energy: Energy consumed during the period (kWh)
+        """
+        if not self.timeline:
+            return energy * self.current_price
+        return self.timeline.integrate_cost(start, end, energy)
+
+    @property
+    def timeline_size(self) -> int:
+        """Return the number of price changes kept in memory."""
+        return len(self.timeline)
@@ -0,0 +1,209 @@
+"""Weekly usage schedule for Smart Appliance Monitor."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+
+from .const import DAYS_OF_WEEK
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# Keywords marking a day as fully blocked in an override
+BLOCKED_KEYWORDS = ("off", "blocked", "none")
+
+
+def parse_time(value: str) -> int:
+    """Parse a "HH:MM" string into a minute of the day.
+
+    Raises:
+        ValueError: If the value is not a valid time
+    """
+    hours, _, minutes = value.strip().partition(":")
+    hour, minute = int(hours), int(minutes)
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"Invalid time: {value}")
+    return hour * 60 + minute
+
+
+def parse_windows(value: str) -> list[tuple[int, int]]:
+    """Parse a list of windows such as "08:00-12:00, 14:00-22:00".
+
+    Both bounds are inclusive, and a window whose end is before its start
+    wraps around midnight.
+
+    Returns:
+        List of (start, end) minutes of the day
+
+    Raises:
+        ValueError: If a window is malformed
+    """
+    windows = []
+    for window in value.split(","):
+        if not window.strip():
+            continue
+        start, separator, end = window.partition("-")
+        if not separator:
+            raise ValueError(f"Invalid window: {window.strip()}")
+        windows.append((parse_time(start), parse_time(end)))
+    return windows
+
+
+def parse_overrides(value: str) -> dict[int, list[tuple[int, int]]]:
+    """Parse per-day overrides such as "saturday: 10:00-23:00; sunday: off".
+
+    Returns:
+        Windows indexed by weekday (0 = monday), empty for blocked days
+
+    Raises:
+        ValueError: If a day or a window is malformed
+    """
+    overrides: dict[int, list[tuple[int, int]]] = {}
+    for override in value.split(";"):
+        if not override.strip():
+            continue
+        day, separator, windows = override.partition(":")
+        day = day.strip().lower()
+        if not separator or day not in DAYS_OF_WEEK:
+            raise ValueError(f"Invalid override: {override.strip()}")
+        if windows.strip().lower() in BLOCKED_KEYWORDS:
+            overrides[DAYS_OF_WEEK.index(day)] = []
+        else:
+            overrides[DAYS_OF_WEEK.index(day)] = parse_windows(windows)
+    return overrides
+
+
+class WeeklySchedule:
+    """Allowed usage minutes of the week, compiled into a bitmap.
+
+    Each of the 10080 minutes of the week is one byte, so checking whether
+    usage is allowed is a single index operation and the next allowed minute
+    is found with a byte search.
+    """
+
+    def __init__(self, bitmap: bytes) -> None:
+        """Initialize the schedule.
+
+        Args:
+            bitmap: One byte per minute of the week, starting monday 00:00
+        """
+        if len(bitmap) != MINUTES_PER_WEEK:
+            raise ValueError("A weekly schedule needs one entry per minute of the week")
+        self._bitmap = bytes(bitmap)
+
+    @classmethod
+    def compile(
+        cls, windows_by_day: dict[int, Iterable[tuple[int, int]]]
+    ) -> WeeklySchedule:
+        """Compile the allowed windows of each weekday.
+
+        Args:
+            windows_by_day: Inclusive (start, end) minutes indexed by weekday.
+                A window whose end is before its start covers the end and the
+                beginning of the same day.
+        """
+        bitmap = bytearray(MINUTES_PER_WEEK)
+        for day, windows in windows_by_day.items():
+            offset = day * MINUTES_PER_DAY
+            for start, end in windows:
+                if start <= end:
+                    bitmap[offset + start:offset + end + 1] = b"\x01" * (end - start + 1)
+                else:
+                    bitmap[offset + start:offset + MINUTES_PER_DAY] = (
+                        b"\x01" * (MINUTES_PER_DAY - start)
+                    )
+                    bitmap[offset:offset + end + 1] = b"\x01" * (end + 1)
+        return cls(bytes(bitmap))
+
+    @classmethod
+    def from_options(
+        cls,
+        allowed_start: str,
+        allowed_end: str,
+        blocked_days: Iterable[str] = (),
+        windows: str | None = None,
+        overrides: str | None = None,
+    ) -> WeeklySchedule:
+        """Compile a schedule from the scheduling options.
+
+        Args:
+            allowed_start: Start of the daily window ("HH:MM")
+            allowed_end: End of the daily window ("HH:MM")
+            blocked_days: Weekdays where usage is never allowed
+            windows: Optional daily windows replacing allowed_start/allowed_end
+            overrides: Optional per-day windows, applied last
+
+        Raises:
+            ValueError: If one of the options is malformed
+        """
+        if windows and windows.strip():
+            daily_windows = parse_windows(windows)
+        else:
+            daily_windows = [(parse_time(allowed_start), parse_time(allowed_end))]
+
+        windows_by_day: dict[int, list[tuple[int, int]]] = {
+            day: [] if name in blocked_days else list(daily_windows)
+            for day, name in enumerate(DAYS_OF_WEEK)
+        }
+        if overrides:
+            windows_by_day.update(parse_overrides(overrides))
+
+        return cls.compile(windows_by_day)
+
+    @classmethod
+    def always(cls) -> WeeklySchedule:
+        """Return a schedule allowing usage at any time."""
+        return cls(b"\x01" * MINUTES_PER_WEEK)
+
+    @staticmethod
+    def _index(when: datetime) -> int:
+        """Return the minute of the week of a datetime."""
+        return when.weekday() * MINUTES_PER_DAY + when.hour * 60 + when.minute
+
+    def is_allowed(self, when: datetime) -> bool:
+        """Return True if usage is allowed at the given time."""
+        return self._bitmap[self._index(when)] == 1
+
+    def next_allowed_start(self, when: datetime) -> datetime | None:
+        """Return the first allowed minute at or after the given time.
+
+        Returns:
+            The given time if usage is already allowed, None if usage is
+            never allowed
+        """
+        index = self._index(when)
+        if self._bitmap[index]:
+            return when
+
+        found = self._bitmap.find(1, index)
+        if found == -1:
+            found = self._bitmap.find(1)
+            if found == -1:
+                return None
+            found += MINUTES_PER_WEEK
+
+        return when.replace(second=0, microsecond=0) + timedelta(minutes=found - index)
+
+    def next_change(self, when: datetime) -> datetime | None:
+        """Return the first minute after the given time where usage changes.
+
+        Returns:
+            Start of the first minute allowed after a forbidden one (or
+            forbidden after an allowed one), None if usage never changes
+        """
+        index = self._index(when)
+        other = 0 if self._bitmap[index] else 1
+
+        found = self._bitmap.find(other, index + 1)
+        if found == -1:
+            found = self._bitmap.find(other)
+            if found == -1:
+                return None
+            found += MINUTES_PER_WEEK
+
+        return when.replace(second=0, microsecond=0) + timedelta(minutes=found - index)
+
+    @property
+    def allowed_minutes(self) -> int:
+        """Return the number of allowed minutes per week."""
+        return self._bitmap.count(1)
@@ -11,7 +11,7 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfEnergy, UnitOfTime
+from homeassistant.const import EntityCategory, UnitOfEnergy, UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
@@ -27,6 +27,7 @@ from .const import (
 )
 from .coordinator import SmartApplianceCoordinator
 from .entity import SmartApplianceEntity
+from .instrumentation import COUNTERS, STAGES
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -61,6 +62,16 @@ async def async_setup_entry(
     # Add AI analysis sensor (always add, availability controlled by switch/config)
     entities.append(SmartApplianceAIAnalysisSensor(coordinator))
     
+    # Capteurs de diagnostic des performances si la mesure est activée
+    if coordinator.instrumentation.enabled:
+        entities.extend(
+            SmartApplianceStageLatencySensor(coordinator, stage) for stage in STAGES
+        )
+        entities.extend(
+            SmartApplianceInstrumentationCounterSensor(coordinator, counter)
+            for counter in COUNTERS
+        )
+    
     async_add_entities(entities)
     _LOGGER.info(
         "Sensors créés pour '%s' (%d entités)",
@@ -75,6 +86,7 @@ class SmartApplianceStateSensor(SmartApplianceEntity, SensorEntity):
     _attr_device_class = SensorDeviceClass.ENUM
     _attr_options = [STATE_IDLE, STATE_RUNNING, STATE_FINISHED]
     _attr_translation_key = "state"
+    _coordinator_fields = ("state", "current_cycle", "power", "monitoring_enabled")
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the sensor."""
@@ -117,6 +129,7 @@ class SmartApplianceCycleDurationSensor(SmartApplianceEntity, SensorEntity):
     _attr_device_class = SensorDeviceClass.DURATION
     _attr_native_unit_of_measurement = UnitOfTime.MINUTES
     _attr_state_class = SensorStateClass.MEASUREMENT
+    _coordinator_fields = ("state", "cycle_duration")
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the sensor."""
@@ -148,6 +161,7 @@ class SmartApplianceCycleEnergySensor(SmartApplianceEntity, SensorEntity):
     _attr_device_class = SensorDeviceClass.ENERGY
     _attr_native_unit_of_measurement = UnitOfEnergy.WATT_HOUR
     _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _coordinator_fields = ("state", "cycle_energy")
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the sensor."""
@@ -180,6 +194,7 @@ class SmartApplianceCycleCostSensor(SmartApplianceEntity, SensorEntity):
 
     _attr_device_class = SensorDeviceClass.MONETARY
     _attr_state_class = SensorStateClass.TOTAL
+    _coordinator_fields = ("state", "current_cycle", "cycle_energy", "price_kwh")
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the sensor."""
@@ -199,6 +214,11 @@ class SmartApplianceCycleCostSensor(SmartApplianceEntity, SensorEntity):
         if self.coordinator.data.get("state") != STATE_RUNNING:
             return 0
         
+        # Coût accumulé au prix en vigueur à chaque échantillon
+        cycle = self.coordinator.data.get("current_cycle") or {}
+        if "cost" in cycle:
+            return round(cycle["cost"], 2)
+        
         current_energy = self.coordinator.data.get("energy", 0)
         energy_kwh = self.coordinator.state_machine.get_cycle_energy(current_energy)
         cost = energy_kwh * self.coordinator.price_kwh
@@ -233,6 +253,9 @@ class SmartApplianceLastCycleDurationSensor(SmartApplianceEntity, SensorEntity):
     _attr_device_class = SensorDeviceClass.DURATION
     _attr_native_unit_of_measurement = UnitOfTime.MINUTES
     _attr_state_class = SensorStateClass.MEASUREMENT
+    _coordinator_fields = ("last_cycle",)
+    # Courbe de puissance pour les sparklines, non historisée par le Recorder
+    _unrecorded_attributes = frozenset({"power_profile"})
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the sensor."""
@@ -269,6 +292,7 @@ class SmartApplianceLastCycleDurationSensor(SmartApplianceEntity, SensorEntity):
             "start_time": last_cycle.get("start_time"),
             "end_time": last_cycle.get("end_time"),
             "peak_power": last_cycle.get("peak_power"),
+            "power_profile": last_cycle.get("power_profile"),
         }
 
 
@@ -278,6 +302,7 @@ class SmartApplianceLastCycleEnergySensor(SmartApplianceEntity, SensorEntity):
     _attr_device_class = SensorDeviceClass.ENERGY
     _attr_native_unit_of_measurement = UnitOfEnergy.WATT_HOUR
     _attr_state_class = SensorStateClass.TOTAL
+    _coordinator_fields = ("last_cycle",)
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the sensor."""
@@ -310,6 +335,7 @@ class SmartApplianceLastCycleCostSensor(SmartApplianceEntity, SensorEntity):
 
     _attr_device_class = SensorDeviceClass.MONETARY
     _attr_state_class = SensorStateClass.TOTAL
+    _coordinator_fields = ("last_cycle", "price_kwh")
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the sensor."""
@@ -330,6 +356,9 @@ class SmartApplianceLastCycleCostSensor(SmartApplianceEntity, SensorEntity):
         if not last_cycle:
             return None
         
+        if "cost" in last_cycle:
+            return round(last_cycle["cost"], 2)
+        
         energy_kwh = last_cycle.get("energy", 0)
         cost = energy_kwh * self.coordinator.price_kwh
         return round(cost, 2)
@@ -353,6 +382,7 @@ class SmartApplianceDailyCyclesSensor(SmartApplianceEntity, SensorEntity):
     """Sensor pour le nombre de cycles journaliers."""
 
     _attr_state_class = SensorStateClass.TOTAL
+    _coordinator_fields = ("daily_stats",)
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the sensor."""
@@ -391,6 +421,7 @@ class SmartApplianceDailyCostSensor(SmartApplianceEntity, SensorEntity):
     _attr_device_class = SensorDeviceClass.MONETARY
     _attr_state_class = SensorStateClass.TOTAL
     _attr_translation_key = "daily_cost"
+    _coordinator_fields = ("daily_stats",)
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the sensor."""
@@ -436,6 +467,7 @@ class SmartApplianceDailyEnergySensor(SmartApplianceEntity, SensorEntity):
     _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
     _attr_state_class = SensorStateClass.TOTAL
     _attr_translation_key = "daily_energy"
+    _coordinator_fields = ("daily_stats",)
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the sensor."""
@@ -469,6 +501,7 @@ class SmartApplianceMonthlyCostSensor(SmartApplianceEntity, SensorEntity):
     _attr_device_class = SensorDeviceClass.MONETARY
     _attr_state_class = SensorStateClass.TOTAL
     _attr_translation_key = "monthly_cost"
+    _coordinator_fields = ("monthly_stats",)
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the sensor."""
@@ -517,6 +550,7 @@ class SmartApplianceMonthlyEnergySensor(SmartApplianceEntity, SensorEntity):
     _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
     _attr_state_class = SensorStateClass.TOTAL
     _attr_translation_key = "monthly_energy"
+    _coordinator_fields = ("monthly_stats",)
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the sensor."""
@@ -550,6 +584,7 @@ class SmartApplianceAnomalyScoreSensor(SmartApplianceEntity, SensorEntity):
     _attr_native_unit_of_measurement = "%"
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_translation_key = "anomaly_score"
+    _coordinator_fields = ("state", "anomaly_score")
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the sensor."""
@@ -558,7 +593,7 @@ class SmartApplianceAnomalyScoreSensor(SmartApplianceEntity, SensorEntity):
     @property
     def native_value(self) -> float:
         """Return the anomaly score (0-100)."""
-        return self.coordinator.get_anomaly_score()
+        return self.coordinator.data.get("anomaly_score", 0)
     
     @property
     def icon(self) -> str:
@@ -578,6 +613,7 @@ class SmartApplianceAnomalyScoreSensor(SmartApplianceEntity, SensorEntity):
             "history_size": len(self.coordinator._cycle_history),
             "detection_enabled": self.coordinator.anomaly_detection_enabled,
             "current_state": self.coordinator.data.get("state"),
+            **self.coordinator.cycle_statistics.summary(),
         }
 
 
@@ -585,6 +621,7 @@ class SmartApplianceAIAnalysisSensor(SmartApplianceEntity, SensorEntity):
     """Sensor for AI analysis results."""
 
     _attr_translation_key = "ai_analysis"
+    _coordinator_fields = ("ai_analysis",)
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the sensor."""
@@ -646,6 +683,48 @@ class SmartApplianceAIAnalysisSensor(SmartApplianceEntity, SensorEntity):
         }
 
 
+class SmartApplianceStageLatencySensor(SmartApplianceEntity, SensorEntity):
+    """Sensor de diagnostic pour la latence d'une étape du coordinator."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:timer-cog-outline"
+
+    def __init__(self, coordinator: SmartApplianceCoordinator, stage: str) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, f"{stage}_latency")
+        self._stage = stage
+    
+    @property
+    def native_value(self) -> float | None:
+        """Return the p95 latency of the stage in ms."""
+        return self.coordinator.instrumentation.stages[self._stage].summary()["p95_ms"]
+    
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return additional state attributes."""
+        return self.coordinator.instrumentation.stages[self._stage].summary()
+
+
+class SmartApplianceInstrumentationCounterSensor(SmartApplianceEntity, SensorEntity):
+    """Sensor de diagnostic pour un compteur d'écritures du coordinator."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_icon = "mdi:counter"
+
+    def __init__(self, coordinator: SmartApplianceCoordinator, counter: str) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, counter)
+        self._counter = counter
+    
+    @property
+    def native_value(self) -> int:
+        """Return the value of the counter since startup."""
+        return self.coordinator.instrumentation.counters[self._counter]
+
+
 class EnergyDashboardAIAnalysisSensor(SensorEntity):
     """Sensor for Energy Dashboard AI analysis results."""
 
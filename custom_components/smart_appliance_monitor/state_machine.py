@@ -2,9 +2,15 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime
+from collections.abc import Sequence
+from datetime import UTC, datetime, timedelta
 from typing import Any
 
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel : rejeu échantillon par échantillon
+    np = None
+
 from .const import (
     EVENT_CYCLE_STARTED,
     EVENT_CYCLE_FINISHED,
@@ -14,9 +20,15 @@ from .const import (
     STATE_RUNNING,
     STATE_FINISHED,
 )
+from .cycle_record import CycleRecord
 
 _LOGGER = logging.getLogger(__name__)
 
+# Délai avant le retour automatique de FINISHED vers IDLE (secondes)
+FINISHED_TO_IDLE_DELAY = 600
+
+_ONE_US = timedelta(microseconds=1)
+
 
 class CycleStateMachine:
     """Machine à états pour suivre les cycles d'un appareil."""
@@ -48,8 +60,8 @@ class CycleStateMachine:
         self.unplugged_timeout = unplugged_timeout
         
         self.state = STATE_IDLE
-        self.current_cycle: dict[str, Any] | None = None
-        self.last_cycle: dict[str, Any] | None = None
+        self._current_cycle: CycleRecord | None = None
+        self._last_cycle: CycleRecord | None = None
         
         self._high_power_since: datetime | None = None
         self._low_power_since: datetime | None = None
@@ -57,6 +69,24 @@ class CycleStateMachine:
         self._zero_power_since: datetime | None = None
         self._unplugged = False
     
+    @property
+    def current_cycle(self) -> CycleRecord | None:
+        """Cycle en cours (ou terminé, jusqu'au retour à IDLE)."""
+        return self._current_cycle
+    
+    @current_cycle.setter
+    def current_cycle(self, cycle: CycleRecord | dict[str, Any] | None) -> None:
+        self._current_cycle = CycleRecord.coerce(cycle)
+    
+    @property
+    def last_cycle(self) -> CycleRecord | None:
+        """Dernier cycle terminé."""
+        return self._last_cycle
+    
+    @last_cycle.setter
+    def last_cycle(self, cycle: CycleRecord | dict[str, Any] | None) -> None:
+        self._last_cycle = CycleRecord.coerce(cycle)
+    
     def update(self, power: float, energy: float, now: datetime | None = None) -> str | None:
         """Met à jour l'état de la machine et retourne un événement si nécessaire.
         
@@ -108,14 +138,7 @@ class CycleStateMachine:
                 elapsed = (now - self._high_power_since).total_seconds()
                 if elapsed >= self.start_delay:
                     # Démarrage confirmé !
-                    self.state = STATE_RUNNING
-                    self.current_cycle = {
-                        "start_time": now,
-                        "start_energy": energy,
-                        "peak_power": power,
-                    }
-                    self._high_power_since = None
-                    self._alert_triggered = False
+                    self._start_cycle(power, energy, now)
                     _LOGGER.info(
                         "Cycle démarré (puissance: %.1fW, énergie initiale: %.3f kWh)",
                         power,
@@ -143,15 +166,15 @@ class CycleStateMachine:
             return None
         
         # Mise à jour du pic de puissance
-        if power > self.current_cycle["peak_power"]:
-            self.current_cycle["peak_power"] = power
+        if power > self.current_cycle.peak_power:
+            self.current_cycle.peak_power = power
         
         # Vérification de l'alerte de durée
         if (
             self.alert_duration is not None
             and not self._alert_triggered
         ):
-            elapsed = (now - self.current_cycle["start_time"]).total_seconds()
+            elapsed = (now - self.current_cycle.start_time).total_seconds()
             if elapsed >= self.alert_duration:
                 self._alert_triggered = True
                 _LOGGER.warning(
@@ -174,28 +197,11 @@ class CycleStateMachine:
                 elapsed = (now - self._low_power_since).total_seconds()
                 if elapsed >= self.stop_delay:
                     # Arrêt confirmé !
-                    self.state = STATE_FINISHED
-                    self.current_cycle["end_time"] = now
-                    self.current_cycle["end_energy"] = energy
-                    
-                    # Calcul des statistiques
-                    duration = (
-                        self.current_cycle["end_time"] - self.current_cycle["start_time"]
-                    ).total_seconds() / 60  # en minutes
-                    energy_used = (
-                        self.current_cycle["end_energy"] - self.current_cycle["start_energy"]
-                    )
-                    
-                    self.current_cycle["duration"] = round(duration, 1)
-                    self.current_cycle["energy"] = round(energy_used, 3)
-                    
-                    self.last_cycle = self.current_cycle.copy()
-                    self._low_power_since = None
-                    
+                    self._finish_cycle(energy, now)
                     _LOGGER.info(
                         "Cycle terminé (durée: %.1f min, énergie: %.3f kWh)",
-                        duration,
-                        energy_used,
+                        self.current_cycle.duration,
+                        self.current_cycle.energy,
                     )
                     return EVENT_CYCLE_FINISHED
         else:
@@ -209,6 +215,32 @@ class CycleStateMachine:
         
         return None
     
+    def _start_cycle(self, power: float, energy: float, now: datetime) -> None:
+        """Passe en RUNNING avec un nouveau cycle."""
+        self.state = STATE_RUNNING
+        self.current_cycle = CycleRecord(start_energy=energy, peak_power=power)
+        self.current_cycle.start_time = now
+        self._high_power_since = None
+        self._alert_triggered = False
+    
+    def _finish_cycle(self, energy: float, now: datetime) -> None:
+        """Termine le cycle en cours et calcule ses statistiques."""
+        self.state = STATE_FINISHED
+        cycle = self.current_cycle
+        start_time = cycle.start_time
+        cycle.end_time = now
+        cycle.end_energy = energy
+        
+        # Calcul des statistiques
+        duration = (now - start_time).total_seconds() / 60  # en minutes
+        energy_used = energy - cycle.start_energy
+        
+        cycle.duration = round(duration, 1)
+        cycle.energy = round(energy_used, 3)
+        
+        self.last_cycle = self.current_cycle.copy()
+        self._low_power_since = None
+    
     def _handle_finished_state(self, now: datetime) -> str | None:
         """Gère l'état FINISHED et transition vers IDLE."""
         if self.current_cycle is None:
@@ -216,14 +248,60 @@ class CycleStateMachine:
             return None
         
         # Après 10 minutes, retour à IDLE
-        elapsed = (now - self.current_cycle["end_time"]).total_seconds()
-        if elapsed >= 600:  # 10 minutes
+        elapsed = (now - self.current_cycle.end_time).total_seconds()
+        if elapsed >= FINISHED_TO_IDLE_DELAY:
             _LOGGER.debug("Transition de FINISHED vers IDLE après 10 minutes")
             self.current_cycle = None
             self.state = STATE_IDLE
         
         return None
     
+    def is_transition_pending(self) -> bool:
+        """Retourne True si un démarrage ou un arrêt attend sa confirmation."""
+        return self._high_power_since is not None or self._low_power_since is not None
+    
+    def get_next_deadline(self) -> datetime | None:
+        """Retourne la prochaine échéance temporelle de la machine à états.
+        
+        Un échantillon reçu à cette échéance (même avec une puissance inchangée)
+        peut confirmer un démarrage/arrêt, déclencher une alerte, détecter un
+        débranchement ou ramener l'état FINISHED vers IDLE. Utilisé en mode
+        événementiel pour réévaluer l'état lorsque le capteur ne publie plus
+        de nouvelle valeur.
+        
+        Returns:
+            Datetime de la prochaine échéance, None si aucune n'est en attente
+        """
+        deadlines: list[datetime] = []
+        
+        if self.state == STATE_IDLE and self._high_power_since is not None:
+            deadlines.append(
+                self._high_power_since + timedelta(seconds=self.start_delay)
+            )
+        elif self.state == STATE_RUNNING and self.current_cycle is not None:
+            if self._low_power_since is not None:
+                deadlines.append(
+                    self._low_power_since + timedelta(seconds=self.stop_delay)
+                )
+            start_time = self.current_cycle.start_time
+            if (
+                self.alert_duration is not None
+                and not self._alert_triggered
+                and start_time is not None
+            ):
+                deadlines.append(start_time + timedelta(seconds=self.alert_duration))
+        elif self.state == STATE_FINISHED and self.current_cycle is not None:
+            end_time = self.current_cycle.end_time
+            if end_time is not None:
+                deadlines.append(end_time + timedelta(seconds=FINISHED_TO_IDLE_DELAY))
+        
+        if self._zero_power_since is not None and not self._unplugged:
+            deadlines.append(
+                self._zero_power_since + timedelta(seconds=self.unplugged_timeout)
+            )
+        
+        return min(deadlines) if deadlines else None
+    
     def get_cycle_duration(self, now: datetime | None = None) -> float:
         """Retourne la durée du cycle en cours en minutes.
         
@@ -233,13 +311,13 @@ class CycleStateMachine:
         Returns:
             Durée en minutes, 0 si pas de cycle en cours
         """
-        if self.current_cycle is None or "start_time" not in self.current_cycle:
+        if self.current_cycle is None or self.current_cycle.start_ts is None:
             return 0.0
         
         if now is None:
             now = datetime.now()
         
-        duration = (now - self.current_cycle["start_time"]).total_seconds() / 60
+        duration = (now - self.current_cycle.start_time).total_seconds() / 60
         return round(duration, 1)
     
     def get_cycle_energy(self, current_energy: float) -> float:
@@ -251,10 +329,10 @@ class CycleStateMachine:
         Returns:
             Énergie du cycle en kWh, 0 si pas de cycle en cours
         """
-        if self.current_cycle is None or "start_energy" not in self.current_cycle:
+        if self.current_cycle is None or self.current_cycle.start_energy is None:
             return 0.0
         
-        energy = current_energy - self.current_cycle["start_energy"]
+        energy = current_energy - self.current_cycle.start_energy
         return round(energy, 3)
     
     def _check_unplugged(self, power: float, now: datetime) -> str | None:
@@ -324,3 +402,375 @@ class CycleStateMachine:
         _LOGGER.info("Réinitialisation des statistiques")
         self.last_cycle = None
 
+    
+    def snapshot(self) -> dict[str, Any]:
+        """Retourne l'état de détection sous forme sérialisable en JSON.
+        
+        Permet de reprendre un rejeu (import incrémental) là où il s'est
+        arrêté, cycle en cours et délais de confirmation compris.
+        """
+        return {
+            "state": self.state,
+            "current_cycle": (
+                self.current_cycle.to_tuple() if self.current_cycle is not None else None
+            ),
+            "high_power_since": _isoformat(self._high_power_since),
+            "low_power_since": _isoformat(self._low_power_since),
+            "zero_power_since": _isoformat(self._zero_power_since),
+            "alert_triggered": self._alert_triggered,
+            "unplugged": self._unplugged,
+        }
+    
+    def restore(self, snapshot: dict[str, Any]) -> None:
+        """Restaure un état de détection retourné par snapshot()."""
+        self.state = snapshot.get("state", STATE_IDLE)
+        self.current_cycle = CycleRecord.coerce(snapshot.get("current_cycle"))
+        self._high_power_since = _parse_datetime(snapshot.get("high_power_since"))
+        self._low_power_since = _parse_datetime(snapshot.get("low_power_since"))
+        self._zero_power_since = _parse_datetime(snapshot.get("zero_power_since"))
+        self._alert_triggered = snapshot.get("alert_triggered", False)
+        self._unplugged = snapshot.get("unplugged", False)
+    
+    def replay(
+        self,
+        timestamps: Sequence[datetime] | Any,
+        powers: Sequence[float] | Any,
+        energies: Sequence[float],
+    ) -> list[tuple[datetime, str, CycleRecord | None]]:
+        """Rejoue une série d'échantillons et retourne les événements produits.
+        
+        Équivalent à appeler update() pour chaque échantillon dans l'ordre :
+        mêmes cycles, mêmes événements et même état final. Avec NumPy, les
+        franchissements de seuils et les délais de confirmation sont calculés
+        sur les tableaux et seules les transitions sont traitées en Python ;
+        sans NumPy, les échantillons sont rejoués un par un.
+        
+        Args:
+            timestamps: Horodatages croissants (datetime, ou tableau NumPy
+                datetime64 en UTC)
+            powers: Puissances (W)
+            energies: Énergies totales (kWh), lues seulement aux transitions
+            
+        Returns:
+            Liste de (horodatage, événement, cycle), le cycle étant une copie
+            du cycle démarré ou terminé (None pour les autres événements)
+        """
+        if np is None:
+            return self._replay_samples(timestamps, powers, energies)
+        if not len(timestamps):
+            return []
+        return _Replay(self, timestamps, powers, energies).run()
+    
+    def _replay_samples(
+        self,
+        timestamps: Sequence[datetime],
+        powers: Sequence[float],
+        energies: Sequence[float],
+    ) -> list[tuple[datetime, str, CycleRecord | None]]:
+        """Rejoue les échantillons un par un avec update()."""
+        events = []
+        for index, now in enumerate(timestamps):
+            event = self.update(float(powers[index]), float(energies[index]), now)
+            if event is not None:
+                events.append((now, event, self._event_cycle(event)))
+        return events
+    
+    def _event_cycle(self, event: str) -> CycleRecord | None:
+        """Retourne une copie du cycle concerné par un événement."""
+        if event == EVENT_CYCLE_STARTED and self.current_cycle is not None:
+            return self.current_cycle.copy()
+        if event == EVENT_CYCLE_FINISHED and self.last_cycle is not None:
+            return self.last_cycle.copy()
+        return None
+
+
+def _to_us(seconds: float) -> int:
+    """Convertit une durée en secondes en microsecondes."""
+    return round(seconds * 1_000_000)
+
+
+def _isoformat(value: datetime | None) -> str | None:
+    """Retourne un datetime au format ISO, ou None."""
+    return value.isoformat() if value is not None else None
+
+
+def _parse_datetime(value: str | None) -> datetime | None:
+    """Lit un datetime sérialisé par _isoformat()."""
+    return datetime.fromisoformat(value) if value else None
+
+
+class _Runs:
+    """Plages consécutives d'échantillons vérifiant une condition.
+    
+    Pour chaque plage, l'échantillon qui confirme la condition (maintenue
+    depuis le début de la plage pendant le délai) est précalculé, comme le
+    ferait update() avec un horodatage « depuis » fixé au début de la plage.
+    """
+    
+    def __init__(self, mask: Any, times: Any, delay: int) -> None:
+        """Calcule les plages d'un masque booléen.
+        
+        Args:
+            mask: Condition de chaque échantillon
+            times: Horodatages en microsecondes (int64, croissants)
+            delay: Délai de confirmation en microsecondes
+        """
+        self.mask = mask
+        self.times = times
+        self.delay = delay
+        
+        first = mask & ~np.concatenate(([False], mask[:-1]))
+        last = mask & ~np.concatenate((mask[1:], [False]))
+        starts = np.flatnonzero(first)
+        ends = np.flatnonzero(last) + 1
+        if len(starts):
+            run_index = np.maximum(np.cumsum(first) - 1, 0)
+            self.run_start = np.where(mask, starts[run_index], -1)
+            self.run_end = np.where(mask, ends[run_index], -1)
+        else:
+            self.run_start = self.run_end = np.full(len(mask), -1)
+        
+        self.confirm_starts = self.confirms = np.empty(0, dtype=np.int64)
+        if len(starts):
+            # Le premier échantillon d'une plage ne fait que démarrer le délai
+            confirms = np.maximum(
+                np.searchsorted(times, times[starts] + delay, "left"), starts + 1
+            )
+            valid = confirms < ends
+            self.confirm_starts = starts[valid]
+            self.confirms = confirms[valid]
+    
+    def confirm_in_run(self, index: int, since: int | None) -> int | None:
+        """Retourne la confirmation dans la plage contenant index.
+        
+        Args:
+            index: Premier échantillon traité
+            since: Début de la condition avant index (None : pas en cours)
+        """
+        if not self.mask[index]:
+            return None
+        if since is None:
+            since, first = int(self.times[index]), index + 1
+        else:
+            first = index
+        confirm = max(
+            int(np.searchsorted(self.times, since + self.delay, "left")), first
+        )
+        return confirm if confirm < self.run_end[index] else None
+    
+    def first_confirm(self, index: int, since: int | None, end: int) -> int | None:
+        """Retourne le premier échantillon confirmant la condition avant end."""
+        if index >= end:
+            return None
+        confirm = self.confirm_in_run(index, since)
+        if confirm is None:
+            # Plages suivantes, démarrées après index
+            position = int(np.searchsorted(self.confirm_starts, index, "right"))
+            if position < len(self.confirms):
+                confirm = int(self.confirms[position])
+        return confirm if confirm is not None and confirm < end else None
+    
+    def since_after(self, index: int, since: int | None, last: int) -> int | None:
+        """Retourne le début de la condition après traitement de index..last."""
+        if last < index:
+            return since
+        if not self.mask[last]:
+            return None
+        start = int(self.run_start[last])
+        if start > index:
+            return int(self.times[start])
+        return since if since is not None else int(self.times[index])
+
+
+class _Replay:
+    """Rejeu vectorisé d'une série d'échantillons (voir CycleStateMachine.replay)."""
+    
+    def __init__(
+        self,
+        machine: CycleStateMachine,
+        timestamps: Sequence[datetime] | Any,
+        powers: Sequence[float] | Any,
+        energies: Sequence[float],
+    ) -> None:
+        """Prépare les tableaux du rejeu."""
+        self.machine = machine
+        self.timestamps = timestamps
+        self.energies = energies
+        self.powers = np.asarray(powers, dtype=float)
+        
+        if isinstance(timestamps, np.ndarray):
+            self.epoch = datetime(1970, 1, 1, tzinfo=UTC)
+            self.times = timestamps.astype("datetime64[us]").astype(np.int64)
+            self.datetimes = None
+        else:
+            tzinfo = timestamps[0].tzinfo
+            self.epoch = (
+                datetime(1970, 1, 1, tzinfo=UTC) if tzinfo else datetime(1970, 1, 1)
+            )
+            self.times = np.fromiter(
+                ((timestamp - self.epoch) // _ONE_US for timestamp in timestamps),
+                dtype=np.int64,
+                count=len(timestamps),
+            )
+            self.datetimes = timestamps
+    
+    def _datetime_us(self, value: datetime | None) -> int | None:
+        """Convertit un datetime de l'état en microsecondes."""
+        return None if value is None else (value - self.epoch) // _ONE_US
+    
+    def _to_datetime(self, value: int | None) -> datetime | None:
+        """Convertit des microsecondes en datetime."""
+        return None if value is None else self.epoch + timedelta(microseconds=value)
+    
+    def _at(self, index: int) -> datetime:
+        """Retourne l'horodatage d'un échantillon."""
+        if self.datetimes is not None:
+            return self.datetimes[index]
+        return self._to_datetime(int(self.times[index]))
+    
+    def run(self) -> list[tuple[datetime, str, CycleRecord | None]]:
+        """Rejoue la série et met à jour l'état de la machine."""
+        machine = self.machine
+        count = len(self.times)
+        
+        # Débranchement : indépendant de l'état, et l'échantillon qui le
+        # détecte n'est pas traité par la machine à états
+        zero = _Runs(~(self.powers > 0), self.times, _to_us(machine.unplugged_timeout))
+        zero_since = self._datetime_us(machine._zero_power_since)
+        unplugged_at = [int(index) for index in zero.confirms[zero.confirm_starts > 0]]
+        if not machine._unplugged:
+            confirm = zero.confirm_in_run(0, zero_since)
+            if confirm is not None:
+                unplugged_at.insert(0, confirm)
+        
+        self.above = _Runs(
+            self.powers > machine.start_threshold,
+            self.times,
+            _to_us(machine.start_delay),
+        )
+        self.below = _Runs(
+            self.powers < machine.stop_threshold,
+            self.times,
+            _to_us(machine.stop_delay),
+        )
+        self.high_since = self._datetime_us(machine._high_power_since)
+        self.low_since = self._datetime_us(machine._low_power_since)
+        
+        events: list[tuple[datetime, str, CycleRecord | None]] = []
+        index = 0
+        for boundary in [*unplugged_at, count]:
+            self._run_segment(index, boundary, events)
+            if boundary < count:
+                events.append((self._at(boundary), EVENT_UNPLUGGED, None))
+            index = boundary + 1
+        
+        machine._high_power_since = self._to_datetime(self.high_since)
+        machine._low_power_since = self._to_datetime(self.low_since)
+        # Dernière plage à 0W : débranché si détecté pendant celle-ci
+        last_start = int(zero.run_start[-1])
+        machine._zero_power_since = self._to_datetime(
+            zero.since_after(0, zero_since, count - 1)
+        )
+        machine._unplugged = bool(zero.mask[-1]) and (
+            (bool(unplugged_at) and unplugged_at[-1] >= last_start)
+            or (last_start == 0 and machine._unplugged)
+        )
+        return events
+    
+    def _run_segment(
+        self,
+        index: int,
+        end: int,
+        events: list[tuple[datetime, str, CycleRecord | None]],
+    ) -> None:
+        """Traite les échantillons index..end-1 par la machine à états."""
+        machine = self.machine
+        while index < end:
+            if machine.state == STATE_IDLE:
+                start = self.above.first_confirm(index, self.high_since, end)
+                if start is None:
+                    self.high_since = self.above.since_after(index, self.high_since, end - 1)
+                    return
+                machine._start_cycle(
+                    float(self.powers[start]), float(self.energies[start]), self._at(start)
+                )
+                self.high_since = None
+                events.append(
+                    (self._at(start), EVENT_CYCLE_STARTED, machine.current_cycle.copy())
+                )
+                index = start + 1
+            
+            elif machine.state == STATE_RUNNING:
+                cycle = machine.current_cycle
+                if cycle is None:
+                    machine.state = STATE_IDLE
+                    index += 1
+                    continue
+                
+                stop = self.below.first_confirm(index, self.low_since, end)
+                alert = None
+                if machine.alert_duration is not None and not machine._alert_triggered:
+                    alert = max(
+                        int(
+                            np.searchsorted(
+                                self.times,
+                                self._datetime_us(cycle.start_time)
+                                + _to_us(machine.alert_duration),
+                                "left",
+                            )
+                        ),
+                        index,
+                    )
+                    if alert >= end:
+                        alert = None
+                
+                if alert is not None and (stop is None or alert <= stop):
+                    # L'échantillon de l'alerte ne teste pas l'arrêt
+                    self._update_peak(index, alert)
+                    self.low_since = self.below.since_after(index, self.low_since, alert - 1)
+                    machine._alert_triggered = True
+                    events.append((self._at(alert), EVENT_ALERT_DURATION, None))
+                    index = alert + 1
+                elif stop is None:
+                    self._update_peak(index, end - 1)
+                    self.low_since = self.below.since_after(index, self.low_since, end - 1)
+                    return
+                else:
+                    self._update_peak(index, stop)
+                    machine._finish_cycle(float(self.energies[stop]), self._at(stop))
+                    self.low_since = None
+                    events.append(
+                        (self._at(stop), EVENT_CYCLE_FINISHED, machine.last_cycle.copy())
+                    )
+                    index = stop + 1
+            
+            else:
+                cycle = machine.current_cycle
+                if cycle is None:
+                    machine.state = STATE_IDLE
+                    index += 1
+                    continue
+                idle = max(
+                    int(
+                        np.searchsorted(
+                            self.times,
+                            self._datetime_us(cycle.end_time) + _to_us(FINISHED_TO_IDLE_DELAY),
+                            "left",
+                        )
+                    ),
+                    index,
+                )
+                if idle >= end:
+                    return
+                machine.current_cycle = None
+                machine.state = STATE_IDLE
+                index = idle + 1
+    
+    def _update_peak(self, first: int, last: int) -> None:
+        """Met à jour le pic du cycle avec les échantillons first..last."""
+        if last < first:
+            return
+        # fmax ignore les NaN, que update() ne retient jamais comme pic
+        peak = float(np.fmax.reduce(self.powers[first:last + 1]))
+        if peak > self.machine.current_cycle.peak_power:
+            self.machine.current_cycle.peak_power = peak
@@ -55,6 +55,7 @@ class SmartApplianceMonitoringSwitch(SmartApplianceEntity, SwitchEntity):
     """Switch pour activer/désactiver la surveillance."""
 
     _attr_translation_key = "monitoring"
+    _coordinator_fields = ("state",)
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the switch."""
@@ -102,6 +103,7 @@ class SmartApplianceNotificationsSwitch(SmartApplianceEntity, SwitchEntity):
     """Switch pour activer/désactiver les notifications."""
 
     _attr_translation_key = "notifications"
+    _coordinator_fields = ()
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the switch."""
@@ -142,6 +144,7 @@ class SmartApplianceNotificationCycleStartedSwitch(SmartApplianceEntity, SwitchE
     """Switch pour activer/désactiver les notifications de démarrage de cycle."""
 
     _attr_translation_key = "notification_cycle_started"
+    _coordinator_fields = ()
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the switch."""
@@ -161,13 +164,13 @@ class SmartApplianceNotificationCycleStartedSwitch(SmartApplianceEntity, SwitchE
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on notification type."""
         self.coordinator.notifier.set_notification_type_enabled(NOTIF_TYPE_CYCLE_STARTED, True)
-        await self.coordinator._save_state()
+        self.coordinator._schedule_save("switches")
         self.async_write_ha_state()
     
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off notification type."""
         self.coordinator.notifier.set_notification_type_enabled(NOTIF_TYPE_CYCLE_STARTED, False)
-        await self.coordinator._save_state()
+        self.coordinator._schedule_save("switches")
         self.async_write_ha_state()
 
 
@@ -175,6 +178,7 @@ class SmartApplianceNotificationCycleFinishedSwitch(SmartApplianceEntity, Switch
     """Switch pour activer/désactiver les notifications de fin de cycle."""
 
     _attr_translation_key = "notification_cycle_finished"
+    _coordinator_fields = ()
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the switch."""
@@ -194,13 +198,13 @@ class SmartApplianceNotificationCycleFinishedSwitch(SmartApplianceEntity, Switch
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on notification type."""
         self.coordinator.notifier.set_notification_type_enabled(NOTIF_TYPE_CYCLE_FINISHED, True)
-        await self.coordinator._save_state()
+        self.coordinator._schedule_save("switches")
         self.async_write_ha_state()
     
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off notification type."""
         self.coordinator.notifier.set_notification_type_enabled(NOTIF_TYPE_CYCLE_FINISHED, False)
-        await self.coordinator._save_state()
+        self.coordinator._schedule_save("switches")
         self.async_write_ha_state()
 
 
@@ -208,6 +212,7 @@ class SmartApplianceNotificationAlertDurationSwitch(SmartApplianceEntity, Switch
     """Switch pour activer/désactiver les notifications d'alerte de durée."""
 
     _attr_translation_key = "notification_alert_duration"
+    _coordinator_fields = ()
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the switch."""
@@ -227,13 +232,13 @@ class SmartApplianceNotificationAlertDurationSwitch(SmartApplianceEntity, Switch
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on notification type."""
         self.coordinator.notifier.set_notification_type_enabled(NOTIF_TYPE_ALERT_DURATION, True)
-        await self.coordinator._save_state()
+        self.coordinator._schedule_save("switches")
         self.async_write_ha_state()
     
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off notification type."""
         self.coordinator.notifier.set_notification_type_enabled(NOTIF_TYPE_ALERT_DURATION, False)
-        await self.coordinator._save_state()
+        self.coordinator._schedule_save("switches")
         self.async_write_ha_state()
 
 
@@ -241,6 +246,7 @@ class SmartApplianceNotificationUnpluggedSwitch(SmartApplianceEntity, SwitchEnti
     """Switch pour activer/désactiver les notifications de débranché."""
 
     _attr_translation_key = "notification_unplugged"
+    _coordinator_fields = ()
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the switch."""
@@ -260,13 +266,13 @@ class SmartApplianceNotificationUnpluggedSwitch(SmartApplianceEntity, SwitchEnti
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on notification type."""
         self.coordinator.notifier.set_notification_type_enabled(NOTIF_TYPE_UNPLUGGED, True)
-        await self.coordinator._save_state()
+        self.coordinator._schedule_save("switches")
         self.async_write_ha_state()
     
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off notification type."""
         self.coordinator.notifier.set_notification_type_enabled(NOTIF_TYPE_UNPLUGGED, False)
-        await self.coordinator._save_state()
+        self.coordinator._schedule_save("switches")
         self.async_write_ha_state()
 
 
@@ -274,6 +280,7 @@ class SmartApplianceAutoShutdownSwitch(SmartApplianceEntity, SwitchEntity):
     """Switch pour activer/désactiver l'extinction automatique."""
 
     _attr_translation_key = "auto_shutdown"
+    _coordinator_fields = ()
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the switch."""
@@ -315,6 +322,7 @@ class SmartApplianceEnergyLimitsSwitch(SmartApplianceEntity, SwitchEntity):
     """Switch pour activer/désactiver les limites énergétiques."""
 
     _attr_translation_key = "energy_limits"
+    _coordinator_fields = ()
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the switch."""
@@ -356,6 +364,7 @@ class SmartApplianceSchedulingSwitch(SmartApplianceEntity, SwitchEntity):
     """Switch pour activer/désactiver la planification."""
 
     _attr_translation_key = "scheduling"
+    _coordinator_fields = ()
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the switch."""
@@ -397,6 +406,7 @@ class SmartApplianceAIAnalysisSwitch(SmartApplianceEntity, SwitchEntity):
     """Switch to enable/disable AI analysis."""
 
     _attr_translation_key = "ai_analysis"
+    _coordinator_fields = ()
 
     def __init__(self, coordinator: SmartApplianceCoordinator) -> None:
         """Initialize the switch."""
@@ -0,0 +1,106 @@
+"""Websocket API for Smart Appliance Monitor."""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+
+from .const import DOMAIN
+from .cycle_store import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, ORDER_ASC, ORDER_DESC
+
+_LOGGER = logging.getLogger(__name__)
+
+WS_TYPE_CYCLE_HISTORY = f"{DOMAIN}/cycle_history"
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the websocket commands of the integration."""
+    websocket_api.async_register_command(hass, websocket_cycle_history)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_CYCLE_HISTORY,
+        vol.Required("entity_id"): cv.entity_id,
+        vol.Optional("period_start"): cv.string,
+        vol.Optional("period_end"): cv.string,
+        vol.Optional("min_duration"): vol.Coerce(float),
+        vol.Optional("max_duration"): vol.Coerce(float),
+        vol.Optional("min_energy"): vol.Coerce(float),
+        vol.Optional("max_energy"): vol.Coerce(float),
+        vol.Optional("order", default=ORDER_DESC): vol.In([ORDER_DESC, ORDER_ASC]),
+        vol.Optional("page_size", default=DEFAULT_PAGE_SIZE): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_PAGE_SIZE)
+        ),
+        vol.Optional("cursor"): cv.string,
+    }
+)
+@websocket_api.async_response
+async def websocket_cycle_history(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return one page of the cycle history of an appliance.
+
+    The response carries a next_cursor to pass back in the following
+    request, or None once the last page has been sent.
+    """
+    from . import _get_coordinator_from_entity_id
+    from .history import CycleHistoryManager
+
+    coordinator = _get_coordinator_from_entity_id(hass, msg["entity_id"])
+    if coordinator is None:
+        connection.send_error(
+            msg["id"],
+            websocket_api.ERR_NOT_FOUND,
+            f"No appliance found for {msg['entity_id']}",
+        )
+        return
+
+    try:
+        period_start = (
+            datetime.fromisoformat(msg["period_start"]) if "period_start" in msg else None
+        )
+        period_end = (
+            datetime.fromisoformat(msg["period_end"]) if "period_end" in msg else None
+        )
+    except ValueError as err:
+        connection.send_error(msg["id"], websocket_api.ERR_INVALID_FORMAT, str(err))
+        return
+
+    history_manager = CycleHistoryManager(
+        hass,
+        coordinator.entry.entry_id,
+        coordinator.appliance_name,
+    )
+    try:
+        page = await history_manager.async_get_cycles_page(
+            period_start=period_start,
+            period_end=period_end,
+            min_duration=msg.get("min_duration"),
+            max_duration=msg.get("max_duration"),
+            min_energy=msg.get("min_energy"),
+            max_energy=msg.get("max_energy"),
+            order=msg["order"],
+            page_size=msg["page_size"],
+            cursor=msg.get("cursor"),
+        )
+    except ValueError as err:
+        connection.send_error(msg["id"], "invalid_cursor", str(err))
+        return
+
+    connection.send_result(
+        msg["id"],
+        {
+            "cycles": [cycle.as_dict() for cycle in page["cycles"]],
+            "next_cursor": page["next_cursor"],
+        },
+    )
@@ -52,6 +52,19 @@ def mock_hass() -> HomeAssistant:
     return hass
 
 
+@pytest.fixture(autouse=True)
+def mock_store():
+    """Fixture pour remplacer le stockage des coordinators.
+    
+    Store.async_delay_save lit hass.state, absent du mock de Home Assistant.
+    """
+    with patch("custom_components.smart_appliance_monitor.coordinator.Store") as store_class:
+        store = store_class.return_value
+        store.async_load = AsyncMock(return_value=None)
+        store.async_save = AsyncMock()
+        yield store
+
+
 @pytest.fixture
 def fixed_datetime():
     """Fixture pour fixer la date/heure dans les tests."""
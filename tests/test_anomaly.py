@@ -0,0 +1,98 @@
+"""Tests pour les statistiques incrémentales de cycles."""
+from __future__ import annotations
+
+import random
+import statistics
+
+from custom_components.smart_appliance_monitor.anomaly import (
+    ANOMALY_WINDOW_CYCLES,
+    CycleStatistics,
+    RunningStatistics,
+)
+
+
+def test_running_statistics_match_batch_computation():
+    """Test que Welford donne la même moyenne et variance qu'un calcul complet."""
+    values = [60.0, 72.5, 58.0, 90.0, 65.5, 61.0]
+    stats = RunningStatistics()
+    for value in values:
+        stats.add(value)
+    
+    assert stats.count == len(values)
+    assert abs(stats.mean - statistics.mean(values)) < 1e-9
+    assert abs(stats.variance - statistics.pvariance(values)) < 1e-9
+    assert stats.minimum == 58.0
+    assert stats.maximum == 90.0
+
+
+def test_running_statistics_keep_recent_window():
+    """Test que seules les dernières valeurs comptent dans les statistiques."""
+    rng = random.Random(42)
+    values = [rng.gauss(90, 10) for _ in range(200)]
+    stats = RunningStatistics(window=20)
+    for value in values:
+        stats.add(value)
+    
+    recent = values[-20:]
+    assert stats.count == 20
+    assert abs(stats.mean - statistics.mean(recent)) < 1e-9
+    assert abs(stats.variance - statistics.pvariance(recent)) < 1e-6
+    assert stats.minimum == min(recent)
+    assert stats.maximum == max(recent)
+    assert stats.quantile(0.5) == sorted(recent)[10]
+
+
+def test_running_statistics_quantile_with_few_values():
+    """Test la médiane exacte avec peu de valeurs."""
+    stats = RunningStatistics()
+    assert stats.quantile(0.5) is None
+    
+    for value in (3.0, 1.0, 2.0):
+        stats.add(value)
+    
+    assert stats.quantile(0.5) == 2.0
+
+
+def test_cycle_statistics_score():
+    """Test le score d'anomalie calculé depuis les statistiques."""
+    stats = CycleStatistics()
+    stats.add_cycle(60.0, 1.5)
+    stats.add_cycle(60.0, 1.5)
+    
+    # Pas assez de cycles
+    assert stats.score(120.0, 1.5) == 0
+    
+    stats.add_cycle(60.0, 1.5)
+    
+    assert stats.score(60.0, 1.5) == 0
+    # Durée doublée : écart de 100% sur la durée
+    assert stats.score(120.0, 1.5) == 50.0
+    assert stats.score(180.0, 4.5) == 100
+
+
+def test_cycle_statistics_score_uses_recent_cycles():
+    """Test que le score ne compare qu'aux derniers cycles."""
+    stats = CycleStatistics()
+    # Anciens cycles courts, remplacés par des cycles plus longs
+    for _ in range(ANOMALY_WINDOW_CYCLES):
+        stats.add_cycle(30.0, 0.8)
+    for _ in range(ANOMALY_WINDOW_CYCLES):
+        stats.add_cycle(60.0, 1.5)
+    
+    assert stats.count == ANOMALY_WINDOW_CYCLES
+    assert stats.score(60.0, 1.5) == 0
+    assert stats.score(120.0, 1.5) == 50.0
+
+
+def test_cycle_statistics_round_trip():
+    """Test la sauvegarde et la restauration des statistiques."""
+    stats = CycleStatistics.from_history(
+        {"duration": 60.0 + i, "energy": 1.0 + i / 10} for i in range(20)
+    )
+    
+    restored = CycleStatistics.from_dict(stats.as_dict())
+    restored.add_cycle(75.0, 2.0)
+    stats.add_cycle(75.0, 2.0)
+    
+    assert restored.count == 21
+    assert restored.summary() == stats.summary()
@@ -1,7 +1,7 @@
 """Tests pour le coordinator."""
 from __future__ import annotations
 
-from datetime import timedelta
+from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -9,6 +9,7 @@ from homeassistant.helpers.update_coordinator import UpdateFailed
 
 from custom_components.smart_appliance_monitor.coordinator import (
     SmartApplianceCoordinator,
+    WATCHDOG_INTERVAL,
 )
 from custom_components.smart_appliance_monitor.const import (
     EVENT_CYCLE_STARTED,
@@ -253,3 +254,173 @@ async def test_set_notifications_enabled(mock_hass, mock_config_entry):
     coordinator.set_notifications_enabled(True)
     assert coordinator.notifications_enabled is True
 
+
+
+@pytest.mark.asyncio
+async def test_event_driven_uses_watchdog_interval(mock_hass, mock_config_entry):
+    """Test qu'en mode événementiel le polling n'est plus qu'un garde-fou."""
+    coordinator = SmartApplianceCoordinator(mock_hass, mock_config_entry)
+    
+    assert coordinator.event_driven is True
+    assert coordinator.poll_interval == WATCHDOG_INTERVAL
+    assert coordinator.update_interval == WATCHDOG_INTERVAL
+
+
+@pytest.mark.asyncio
+async def test_sensor_change_pushes_sample(mock_hass, mock_config_entry):
+    """Test qu'un changement d'état du capteur est poussé dans la machine à états."""
+    coordinator = SmartApplianceCoordinator(mock_hass, mock_config_entry)
+    coordinator._last_power = 0.0
+    coordinator._last_energy = 1.0
+    
+    event = MagicMock()
+    event.data = {
+        "entity_id": "sensor.prise_four_power",
+        "new_state": MagicMock(state="1500"),
+    }
+    
+    with patch.object(coordinator, "_async_process_pushed_sample", MagicMock()) as process:
+        coordinator._async_handle_sensor_change(event)
+    
+    process.assert_called_once()
+    assert process.call_args.args[0] == 1500.0
+    assert process.call_args.args[1] == 1.0
+    mock_hass.async_create_task.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_sensor_change_ignores_unavailable(mock_hass, mock_config_entry):
+    """Test que les états indisponibles ne sont pas poussés."""
+    coordinator = SmartApplianceCoordinator(mock_hass, mock_config_entry)
+    coordinator._last_power = 0.0
+    coordinator._last_energy = 1.0
+    
+    event = MagicMock()
+    event.data = {
+        "entity_id": "sensor.prise_four_power",
+        "new_state": MagicMock(state="unavailable"),
+    }
+    
+    coordinator._async_handle_sensor_change(event)
+    
+    mock_hass.async_create_task.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_pushed_samples_detect_cycle_start(mock_hass, mock_config_entry):
+    """Test que les échantillons poussés détectent un démarrage sans attendre le polling."""
+    coordinator = SmartApplianceCoordinator(mock_hass, mock_config_entry)
+    coordinator._on_cycle_started = AsyncMock()
+    coordinator._save_state = AsyncMock()
+    coordinator.async_set_updated_data = MagicMock()
+    
+    now = datetime(2025, 10, 20, 18, 30, 0)
+    start_delay = coordinator.state_machine.start_delay
+    
+    with patch(
+        "custom_components.smart_appliance_monitor.coordinator.async_call_later"
+    ) as call_later:
+        await coordinator._async_process_pushed_sample(1500.0, 1.0, now)
+        # L'échéance de confirmation est programmée
+        assert call_later.call_count == 1
+        
+        await coordinator._async_process_pushed_sample(
+            1500.0, 1.1, now + timedelta(seconds=start_delay)
+        )
+    
+    assert coordinator.state_machine.state == STATE_RUNNING
+    coordinator._on_cycle_started.assert_called_once()
+    assert coordinator.async_set_updated_data.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_poll_interval_adapts_to_state(mock_hass, mock_config_entry):
+    """Test que l'intervalle de polling suit l'état de la machine à états."""
+    coordinator = SmartApplianceCoordinator(mock_hass, mock_config_entry)
+    coordinator.event_driven = False
+    coordinator._on_cycle_started = AsyncMock()
+    
+    now = datetime(2025, 10, 20, 18, 30, 0)
+    
+    # Au repos : intervalle long
+    await coordinator._async_process_sample(0.5, 1.0, now)
+    assert coordinator.poll_interval == coordinator.poll_interval_idle
+    assert coordinator.update_interval == coordinator.poll_interval_idle
+    
+    # Démarrage en attente de confirmation : intervalle court
+    await coordinator._async_process_sample(1500.0, 1.0, now + timedelta(seconds=10))
+    assert coordinator.poll_interval == coordinator.poll_interval_active
+    
+    # Cycle en cours : intervalle court
+    await coordinator._async_process_sample(
+        1500.0, 1.1, now + timedelta(minutes=5)
+    )
+    assert coordinator.state_machine.state == STATE_RUNNING
+    assert coordinator.poll_interval == coordinator.poll_interval_active
+    assert coordinator.poll_interval_active < coordinator.poll_interval_idle
+
+
+@pytest.mark.asyncio
+async def test_listeners_notified_only_on_changed_fields(mock_hass, mock_config_entry):
+    """Test que seules les entités abonnées à un champ modifié sont notifiées."""
+    coordinator = SmartApplianceCoordinator(mock_hass, mock_config_entry)
+    
+    power_listener = MagicMock()
+    stats_listener = MagicMock()
+    default_listener = MagicMock()
+    coordinator.async_add_listener(power_listener, frozenset({"power"}))
+    coordinator.async_add_listener(stats_listener, frozenset({"daily_stats"}))
+    coordinator.async_add_listener(default_listener)
+    
+    now = datetime(2025, 10, 20, 18, 30, 0)
+    
+    with patch(
+        "custom_components.smart_appliance_monitor.coordinator.async_call_later"
+    ):
+        # Premier instantané : toutes les entités sont notifiées
+        await coordinator._async_process_pushed_sample(5.0, 1.0, now)
+        # Aucun changement : seules les entités sans abonnement sont notifiées
+        await coordinator._async_process_pushed_sample(5.0, 1.0, now)
+        # Seule la puissance change
+        await coordinator._async_process_pushed_sample(8.0, 1.0, now)
+    
+    assert power_listener.call_count == 2
+    assert stats_listener.call_count == 1
+    assert default_listener.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_stats_snapshot_detects_in_place_changes(mock_hass, mock_config_entry):
+    """Test que les statistiques modifiées en place sont bien détectées."""
+    coordinator = SmartApplianceCoordinator(mock_hass, mock_config_entry)
+    
+    coordinator.data = coordinator._build_data(5.0, 1.0)
+    coordinator.daily_stats["cycles"] += 1
+    
+    changed = coordinator._diff_data(coordinator._build_data(5.0, 1.0))
+    
+    assert changed == {"daily_stats"}
+
+
+@pytest.mark.asyncio
+async def test_running_cycle_records_power_profile(mock_hass, mock_config_entry):
+    """Test que les échantillons d'un cycle en cours alimentent sa courbe de puissance."""
+    coordinator = SmartApplianceCoordinator(mock_hass, mock_config_entry)
+    coordinator._on_cycle_started = AsyncMock()
+    coordinator._save_state = AsyncMock()
+    coordinator.async_set_updated_data = MagicMock()
+    
+    now = datetime(2025, 10, 20, 18, 30, 0)
+    start_delay = coordinator.state_machine.start_delay
+    
+    with patch(
+        "custom_components.smart_appliance_monitor.coordinator.async_call_later"
+    ):
+        for seconds, power in ((0, 1500.0), (start_delay, 1500.0), (start_delay + 20, 900.0)):
+            await coordinator._async_process_pushed_sample(
+                power, 1.0, now + timedelta(seconds=seconds)
+            )
+    
+    cycle = coordinator.state_machine.current_cycle
+    assert cycle["power_profile"]["values"] == [1500.0, 1500.0]
+    assert cycle.profile.power == 900.0
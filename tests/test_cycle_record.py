@@ -0,0 +1,135 @@
+"""Tests pour les enregistrements compacts des cycles."""
+from __future__ import annotations
+
+import json
+from datetime import UTC, datetime
+
+import pytest
+
+from custom_components.smart_appliance_monitor.cycle_record import (
+    CYCLE_SOURCE_STATISTICS,
+    PROFILE_SIZE,
+    PROFILE_STEP,
+    CycleRecord,
+    PowerProfile,
+)
+
+
+def _finished_cycle() -> CycleRecord:
+    """Crée un cycle terminé."""
+    record = CycleRecord(
+        duration=90.0,
+        energy=1.5,
+        cost=0.38,
+        peak_power=2000.0,
+        start_energy=10.0,
+        end_energy=11.5,
+    )
+    record.start_time = datetime(2025, 10, 20, 10, 0, 0, 250)
+    record.end_time = datetime(2025, 10, 20, 11, 30, 0)
+    return record
+
+
+def test_record_reads_like_cycle_dict():
+    """Test l'accès par clé, les valeurs absentes et la conversion en dict."""
+    record = CycleRecord(start_energy=1.0, peak_power=150.0)
+    record["start_time"] = datetime(2025, 10, 20, 10, 0)
+
+    assert record["start_time"] == datetime(2025, 10, 20, 10, 0)
+    # Un cycle en cours n'a ni fin, ni durée, ni coût
+    assert "end_time" not in record
+    assert "cost" not in record
+    assert record.get("duration", 0) == 0
+    assert dict(record) == {
+        "start_time": datetime(2025, 10, 20, 10, 0),
+        "start_energy": 1.0,
+        "peak_power": 150.0,
+    }
+
+    record["cost_timestamp"] = 1000.0
+    assert record.cost_ts == 1000.0
+    assert not record.imported
+
+
+def test_compact_tuple_round_trip():
+    """Test l'aller-retour par le tuple compact, y compris via JSON."""
+    record = _finished_cycle()
+
+    restored = CycleRecord.from_tuple(json.loads(json.dumps(record.to_tuple())))
+
+    assert restored == record
+    assert restored.start_time == datetime(2025, 10, 20, 10, 0, 0, 250)
+    assert restored["timestamp"] == datetime(2025, 10, 20, 11, 30, 0)
+
+    # Un horodatage avec fuseau horaire le conserve
+    aware = CycleRecord()
+    aware.start_time = datetime(2025, 1, 1, 12, 0, tzinfo=UTC)
+    assert CycleRecord.from_tuple(aware.to_tuple()).start_time == aware.start_time
+    assert CycleRecord.from_tuple(aware.to_tuple()).start_time.tzinfo is not None
+
+
+def test_legacy_dicts_are_converted():
+    """Test la lecture des cycles au format dictionnaire des anciennes versions."""
+    record = CycleRecord.coerce(
+        {
+            "start_time": "2025-10-20T10:00:00.000250",
+            "end_time": "2025-10-20T11:30:00",
+            "duration": 90.0,
+            "energy": 1.5,
+            "cost": 0.38,
+            "peak_power": 2000.0,
+            "start_energy": 10.0,
+            "end_energy": 11.5,
+            "currency": "EUR",
+        }
+    )
+    assert record == _finished_cycle()
+
+    # Ancienne entrée de l'historique des cycles, horodatée à la fin
+    history = CycleRecord.from_dict(
+        {"duration": 60, "energy": 1.2, "timestamp": "2025-10-20T12:00:00"}
+    )
+    assert history.end_time == datetime(2025, 10, 20, 12, 0)
+    assert history.start_ts is None
+
+    imported = CycleRecord.from_dict({"energy": 1.0, "low_precision": True})
+    assert imported.source == CYCLE_SOURCE_STATISTICS
+    assert imported.as_dict()["imported"]
+
+
+def test_power_profile_folds_long_cycles():
+    """Test que la courbe d'un long cycle tient dans le tampon."""
+    profile = PowerProfile()
+    # 2000 W pendant la première heure puis 500 W, un relevé toutes les 8 s
+    for second in range(0, 4 * 3600 + 1, 8):
+        profile.add(2000.0 if second < 3600 else 500.0, second)
+
+    values = profile.values()
+    assert len(values) <= PROFILE_SIZE
+    assert profile.step == PROFILE_STEP * 8
+    assert len(values) == 4 * 3600 / profile.step
+    assert values[0] == pytest.approx(2000.0)
+    assert values[-1] == pytest.approx(500.0)
+    # L'énergie est conservée par le sous-échantillonnage
+    energy = sum(values[:-1]) * profile.step
+    energy += values[-1] * (profile.offset - (len(values) - 1) * profile.step)
+    assert energy / 3_600_000 == pytest.approx(2.0 + 1.5, rel=1e-4)
+
+
+def test_power_profile_persisted_with_cycle():
+    """Test la persistance compacte de la courbe avec le cycle."""
+    record = _finished_cycle()
+    record.profile = PowerProfile()
+    for second, power in ((0, 1800.0), (25, 2100.0), (40, 150.0), (55, 150.0)):
+        record.profile.add(power, second)
+
+    restored = CycleRecord.from_tuple(json.loads(json.dumps(record.to_tuple())))
+
+    assert restored["power_profile"] == record["power_profile"]
+    assert record["power_profile"] == {
+        "step": PROFILE_STEP,
+        "values": [1800.0, 1800.0, 1950.0, 2100.0, 150.0, 150.0],
+    }
+    # Le relevé suivant complète le dernier point
+    restored.profile.add(150.0, 65)
+    assert len(restored["power_profile"]["values"]) == 7
@@ -0,0 +1,263 @@
+"""Tests pour la base compacte des cycles."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from custom_components.smart_appliance_monitor.cycle_record import (
+    CYCLE_SOURCE_IMPORT,
+)
+from custom_components.smart_appliance_monitor.cycle_store import (
+    CycleStore,
+    split_period,
+    totals_from_cycles,
+)
+from custom_components.smart_appliance_monitor.history import CycleHistoryManager
+
+
+def _cycle(start: datetime, duration: float, energy: float) -> dict:
+    """Crée un cycle terminé au format de l'événement cycle_finished."""
+    return {
+        "appliance_name": "Four",
+        "appliance_type": "oven",
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(minutes=duration)).isoformat(),
+        "duration": duration,
+        "energy": energy,
+        "cost": round(energy * 0.25, 2),
+        "peak_power": 2000.0,
+    }
+
+
+@pytest.fixture
+def cycle_store(mock_hass, tmp_path):
+    """Fixture pour créer une base de cycles dans un répertoire temporaire."""
+    mock_hass.async_add_executor_job = AsyncMock(
+        side_effect=lambda func, *args: func(*args)
+    )
+    store = CycleStore(mock_hass, str(tmp_path / "cycles.db"))
+    store._setup()
+    mock_hass.data = {"smart_appliance_monitor": {"cycle_store": store}}
+    yield store
+    store._close()
+
+
+@pytest.mark.asyncio
+async def test_range_query_with_filters(cycle_store):
+    """Test la lecture d'une période avec filtres et limite."""
+    start = datetime(2025, 1, 1, 12, 0)
+    await cycle_store.async_add_cycles(
+        "four",
+        [_cycle(start + timedelta(days=day), 60 + day, 1.0 + day / 10) for day in range(10)],
+    )
+    await cycle_store.async_add_cycle("lave_linge", _cycle(start, 90, 0.8))
+
+    cycles = await cycle_store.async_get_cycles(
+        "four",
+        start,
+        start + timedelta(days=30),
+        min_duration=62,
+        max_energy=1.6,
+        limit=3,
+    )
+
+    assert [cycle["duration"] for cycle in cycles] == [66, 65, 64]
+    assert cycles[0]["timestamp"] == start + timedelta(days=6, minutes=66)
+    assert not cycles[0]["imported"]
+
+
+@pytest.mark.asyncio
+async def test_same_start_replaces_cycle(cycle_store):
+    """Test qu'un cycle réimporté remplace le cycle de même début."""
+    start = datetime(2025, 1, 1, 12, 0)
+    await cycle_store.async_add_cycle("four", _cycle(start, 60, 1.0))
+    await cycle_store.async_add_cycle(
+        "four", _cycle(start, 62, 1.1), source=CYCLE_SOURCE_IMPORT
+    )
+
+    cycles = await cycle_store.async_get_cycles("four", start, start + timedelta(days=1))
+
+    assert len(cycles) == 1
+    assert cycles[0]["duration"] == 62
+    assert cycles[0]["imported"]
+
+    deleted = await cycle_store.async_delete_cycles("four", start, start + timedelta(days=1))
+    assert deleted == 1
+
+
+def test_split_period_uses_largest_buckets():
+    """Test le découpage d'une période en agrégats et bords bruts."""
+    pieces = split_period(datetime(2024, 12, 15, 10, 0), datetime(2026, 2, 10, 8, 0))
+
+    assert pieces == [
+        (None, datetime(2024, 12, 15, 10, 0), datetime(2024, 12, 16)),
+        ("day", datetime(2024, 12, 16), datetime(2025, 1, 1)),
+        ("year", datetime(2025, 1, 1), datetime(2026, 1, 1)),
+        ("month", datetime(2026, 1, 1), datetime(2026, 2, 1)),
+        ("day", datetime(2026, 2, 1), datetime(2026, 2, 10)),
+        (None, datetime(2026, 2, 10), datetime(2026, 2, 10, 8, 0)),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_totals_match_raw_cycles(cycle_store):
+    """Test que les agrégats donnent les mêmes totaux que les cycles bruts."""
+    start = datetime(2024, 11, 3, 7, 0)
+    cycles = [
+        _cycle(start + timedelta(hours=17 * index), 30 + index % 50, 0.5 + index % 7 / 10)
+        for index in range(1200)
+    ]
+    await cycle_store.async_add_cycles("four", cycles)
+    # Un cycle remplacé et des cycles supprimés doivent mettre à jour les agrégats
+    await cycle_store.async_add_cycle("four", _cycle(start, 200, 9.0))
+    await cycle_store.async_delete_cycles(
+        "four", datetime(2025, 3, 1), datetime(2025, 3, 20)
+    )
+    stored = await cycle_store.async_get_cycles(
+        "four", datetime(2024, 1, 1), datetime(2027, 1, 1)
+    )
+
+    period_start = datetime(2024, 12, 15, 10, 0)
+    period_end = datetime(2025, 11, 10, 8, 0)
+    totals = await cycle_store.async_get_totals("four", period_start, period_end)
+    expected = totals_from_cycles(
+        cycle for cycle in stored if period_start <= cycle["timestamp"] <= period_end
+    )
+
+    assert totals["count"] == expected["count"]
+    for field in ("energy", "cost", "duration", "energy_sumsq", "min_energy", "max_duration"):
+        assert totals[field] == pytest.approx(expected[field])
+
+
+@pytest.mark.asyncio
+async def test_history_manager_completes_with_recorder(cycle_store, mock_hass):
+    """Test que les cycles antérieurs à la base sont lus dans le Recorder."""
+    start = datetime(2025, 1, 10, 12, 0)
+    await cycle_store.async_add_cycle("four", _cycle(start, 60, 1.0))
+    older = {"timestamp": datetime(2025, 1, 5, 13, 0), "duration": 45, "energy": 0.7}
+
+    manager = CycleHistoryManager(mock_hass, "four", "Four")
+    with patch.object(
+        manager,
+        "_async_get_cycles_from_recorder",
+        AsyncMock(return_value=[older]),
+    ) as recorder_query:
+        cycles = await manager.async_get_cycles(
+            period_start=datetime(2025, 1, 1), period_end=datetime(2025, 1, 31)
+        )
+
+    assert [cycle["duration"] for cycle in cycles] == [60, 45]
+    # Le Recorder n'est interrogé que jusqu'au premier cycle de la base
+    assert recorder_query.await_args.args[1] == start + timedelta(minutes=60)
+
+
+@pytest.mark.asyncio
+async def test_pages_cover_period_in_both_orders(cycle_store):
+    """Test que les pages successives restituent tous les cycles dans l'ordre."""
+    start = datetime(2025, 1, 1, 12, 0)
+    cycles = [_cycle(start + timedelta(hours=5 * index), 60, 1.0) for index in range(23)]
+    # Deux cycles terminés au même instant ne doivent être ni perdus ni répétés
+    cycles.append(_cycle(start + timedelta(hours=6), 0, 0.5))
+    await cycle_store.async_add_cycles("four", cycles)
+    expected = await cycle_store.async_get_cycles(
+        "four", start, start + timedelta(days=30)
+    )
+
+    for order, reference in (("desc", expected), ("asc", expected[::-1])):
+        pages = []
+        cursor = None
+        while True:
+            page, cursor = await cycle_store.async_get_cycles_page(
+                "four",
+                start,
+                start + timedelta(days=30),
+                order=order,
+                page_size=5,
+                cursor=cursor,
+            )
+            pages.append(page)
+            if cursor is None:
+                break
+
+        assert [len(page) for page in pages] == [5, 5, 5, 5, 4]
+        assert sorted(
+            (cycle["timestamp"], cycle["duration"]) for page in pages for cycle in page
+        ) == sorted((cycle["timestamp"], cycle["duration"]) for cycle in reference)
+        timestamps = [cycle["timestamp"] for page in pages for cycle in page]
+        assert timestamps == [cycle["timestamp"] for cycle in reference]
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_rejected(cycle_store):
+    """Test qu'un curseur invalide ou d'un autre ordre est refusé."""
+    start = datetime(2025, 1, 1, 12, 0)
+    await cycle_store.async_add_cycles(
+        "four", [_cycle(start + timedelta(days=day), 60, 1.0) for day in range(3)]
+    )
+    _, cursor = await cycle_store.async_get_cycles_page(
+        "four", start, start + timedelta(days=30), page_size=1
+    )
+
+    with pytest.raises(ValueError):
+        await cycle_store.async_get_cycles_page(
+            "four", start, start + timedelta(days=30), cursor="pas-un-curseur"
+        )
+    with pytest.raises(ValueError):
+        await cycle_store.async_get_cycles_page(
+            "four", start, start + timedelta(days=30), order="asc", cursor=cursor
+        )
+
+
+@pytest.mark.asyncio
+async def test_bulk_write_for_several_appliances(cycle_store):
+    """Test l'écriture groupée des cycles de plusieurs appareils."""
+    start = datetime(2025, 1, 1, 12, 0)
+    written = await cycle_store.async_add_cycles_bulk(
+        {
+            "four": [_cycle(start, 60, 1.0), _cycle(start + timedelta(days=1), 70, 1.2)],
+            "lave_linge": [_cycle(start, 90, 0.8)],
+        },
+        source=CYCLE_SOURCE_IMPORT,
+    )
+
+    assert written == 3
+    totals = await cycle_store.async_get_totals(
+        "four", start, start + timedelta(days=2)
+    )
+    assert totals["count"] == 2
+    assert totals["energy"] == pytest.approx(2.2)
+
+
+@pytest.mark.asyncio
+async def test_reimport_skips_known_cycles(cycle_store):
+    """Test qu'un cycle qui chevauche un cycle connu n'est pas réimporté."""
+    start = datetime(2025, 1, 1, 12, 0)
+    await cycle_store.async_add_cycle("four", _cycle(start, 60, 1.0))
+    # Même cycle détecté par l'import, terminé au relevé suivant
+    imported = _cycle(start + timedelta(seconds=50), 63, 1.1)
+    other = _cycle(start + timedelta(days=1), 45, 0.6)
+
+    for _ in range(2):
+        await cycle_store.async_add_cycles_bulk(
+            {"four": [imported, other]}, source=CYCLE_SOURCE_IMPORT, replace=False
+        )
+
+    cycles = await cycle_store.async_get_cycles("four", start, start + timedelta(days=2))
+    assert [(cycle["energy"], cycle["imported"]) for cycle in cycles] == [
+        (0.6, True),
+        (1.0, False),
+    ]
+    totals = await cycle_store.async_get_totals("four", start, start + timedelta(days=2))
+    assert totals["count"] == 2
+    assert await cycle_store.async_count_cycles(
+        "four", start, start + timedelta(days=2)
+    ) == 2
+
+    # Un cycle enregistré en direct remplace le cycle importé
+    await cycle_store.async_add_cycle(
+        "four", _cycle(start + timedelta(days=1, seconds=5), 45, 0.7)
+    )
+    cycles = await cycle_store.async_get_cycles("four", start, start + timedelta(days=2))
+    assert [cycle["energy"] for cycle in cycles] == [0.7, 1.0]
@@ -0,0 +1,36 @@
+"""Tests pour les diagnostics de l'intégration."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.smart_appliance_monitor.const import (
+    CONF_CUSTOM_NOTIFY_SERVICE,
+    CONF_NOTIFICATION_SERVICES,
+    CONF_POWER_SENSOR,
+    DOMAIN,
+)
+from custom_components.smart_appliance_monitor.coordinator import (
+    SmartApplianceCoordinator,
+)
+from custom_components.smart_appliance_monitor.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_redact_notify_target(mock_hass, mock_config_entry):
+    """Test que la cible des notifications est masquée dans les diagnostics."""
+    mock_config_entry.options = {
+        CONF_NOTIFICATION_SERVICES: ["custom"],
+        CONF_CUSTOM_NOTIFY_SERVICE: "notify.mobile_app_telephone_de_marie",
+    }
+    coordinator = SmartApplianceCoordinator(mock_hass, mock_config_entry)
+    mock_hass.data = {DOMAIN: {mock_config_entry.entry_id: coordinator}}
+
+    diagnostics = await async_get_config_entry_diagnostics(mock_hass, mock_config_entry)
+
+    options = diagnostics["entry"]["options"]
+    assert options[CONF_CUSTOM_NOTIFY_SERVICE] == "**REDACTED**"
+    assert options[CONF_NOTIFICATION_SERVICES] == ["custom"]
+    assert diagnostics["entry"]["data"][CONF_POWER_SENSOR] == "sensor.prise_four_power"
+    assert diagnostics["coordinator"]["state"] == coordinator.state_machine.state
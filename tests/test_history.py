@@ -0,0 +1,127 @@
+"""Tests pour la requête de l'historique des cycles."""
+from __future__ import annotations
+
+import json
+import sqlite3
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from custom_components.smart_appliance_monitor.history import (
+    CycleHistoryCache,
+    CycleHistoryManager,
+    build_events_query,
+    invalidate_history_cache,
+)
+
+
+@pytest.fixture
+def recorder_db():
+    """Fixture pour créer une base Recorder minimale avec des cycles."""
+    connection = sqlite3.connect(":memory:")
+    connection.executescript(
+        "CREATE TABLE events (event_type_id INTEGER, data_id INTEGER, time_fired_ts REAL);"
+        "CREATE TABLE event_data (data_id INTEGER, shared_data TEXT);"
+    )
+    cycles = [
+        ("four", 60, 1.2),
+        ("four", 90, 2.0),
+        ("four", 20, 0.3),
+        ("lave_linge", 120, 0.9),
+        ("four", 75, None),
+    ]
+    for index, (appliance_id, duration, energy) in enumerate(cycles):
+        data = {"appliance_id": appliance_id, "duration": duration}
+        if energy is not None:
+            data["energy"] = energy
+        connection.execute(
+            "INSERT INTO events VALUES (1, ?, ?)", (index, 1000.0 + index)
+        )
+        connection.execute(
+            "INSERT INTO event_data VALUES (?, ?)", (index, json.dumps(data))
+        )
+    yield connection
+    connection.close()
+
+
+def _run(connection, sql, params):
+    """Exécute la requête avec la période complète."""
+    params = {"event_type_id": 1, "start_time": 0, "end_time": 2000, **params}
+    return [json.loads(row[0]) for row in connection.execute(sql, params)]
+
+
+def test_filters_pushed_down_for_sqlite(recorder_db):
+    """Test que l'appareil, les filtres et la limite sont évalués en SQL."""
+    sql, params, pushed_down = build_events_query(
+        "sqlite", "four", min_duration=30, min_energy=1.0, limit=1
+    )
+
+    assert pushed_down
+    rows = _run(recorder_db, sql, params)
+    # Le plus récent d'abord
+    assert rows == [{"appliance_id": "four", "duration": 90, "energy": 2.0}]
+
+
+def test_missing_energy_counts_as_zero(recorder_db):
+    """Test qu'une énergie absente vaut 0, comme le filtre Python."""
+    sql, params, _ = build_events_query("sqlite", "four", max_energy=0.5)
+
+    rows = _run(recorder_db, sql, params)
+    assert [row["duration"] for row in rows] == [75, 20]
+
+
+def test_unknown_dialect_falls_back_to_python_filtering(recorder_db):
+    """Test qu'un dialecte inconnu sélectionne tous les cycles de la période."""
+    sql, params, pushed_down = build_events_query("mssql", "four", limit=1)
+
+    assert not pushed_down
+    assert params == {}
+    assert len(_run(recorder_db, sql, params)) == 5
+
+
+@pytest.mark.asyncio
+async def test_cache_serves_repeated_queries(mock_hass):
+    """Test que les requêtes répétées sont servies par le cache."""
+    manager = CycleHistoryManager(mock_hass, "four", "Four")
+    cycles = [{"timestamp": datetime(2025, 1, 5, 13, 0), "duration": 45, "energy": 0.7}]
+    with patch.object(
+        manager, "_async_get_cycles_from_recorder", AsyncMock(return_value=cycles)
+    ) as recorder_query:
+        first = await manager.async_get_cycles(min_duration=30)
+        first[0]["duration"] = 0
+        # Un autre gestionnaire du même appareil partage le cache
+        other = CycleHistoryManager(mock_hass, "four", "Four")
+        second = await other.async_get_cycles(min_duration=30.0)
+
+        assert recorder_query.await_count == 1
+        assert second[0]["duration"] == 45
+        assert manager.cache.hits == 1
+        assert manager.cache.misses == 1
+
+        invalidate_history_cache(mock_hass, "four")
+        await manager.async_get_cycles(min_duration=30)
+        assert recorder_query.await_count == 2
+
+
+def test_cache_bounded_by_entries_and_bytes():
+    """Test l'éviction des entrées les moins récemment utilisées."""
+    cache = CycleHistoryCache(max_entries=2, max_bytes=10_000)
+    cache.put(("a",), [1], cache.generation, None)
+    cache.put(("b",), [2], cache.generation, None)
+    cache.get(("a",))
+    cache.put(("c",), [3], cache.generation, None)
+
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == [1]
+    assert cache.evictions == 1
+
+    # Un résultat trop volumineux n'est pas conservé
+    cache.put(("d",), list(range(5000)), cache.generation, None)
+    assert cache.get(("d",)) is None
+
+    # Un résultat calculé avant une invalidation est ignoré
+    generation = cache.generation
+    cache.invalidate()
+    cache.put(("e",), [5], generation, None)
+    assert cache.get(("e",)) is None
@@ -0,0 +1,60 @@
+"""Tests pour le hub de rafraîchissement partagé."""
+from __future__ import annotations
+
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.smart_appliance_monitor.hub import SmartApplianceHub
+
+
+def _make_coordinator(entry_id: str, interval: timedelta) -> MagicMock:
+    """Crée un coordinator factice."""
+    coordinator = MagicMock()
+    coordinator.entry.entry_id = entry_id
+    coordinator.appliance_name = entry_id
+    coordinator.poll_interval = interval
+    coordinator.async_refresh = AsyncMock()
+    return coordinator
+
+
+@pytest.fixture
+def hub(mock_hass):
+    """Fixture pour créer un hub avec un timer factice."""
+    with patch(
+        "custom_components.smart_appliance_monitor.hub.async_call_later"
+    ) as call_later:
+        call_later.return_value = MagicMock()
+        yield SmartApplianceHub(mock_hass)
+
+
+def test_register_takes_over_schedule(hub):
+    """Test que l'enregistrement désactive le timer propre du coordinator."""
+    coordinator = _make_coordinator("a", timedelta(seconds=30))
+
+    unregister = hub.async_register(coordinator)
+
+    assert coordinator.update_interval is None
+    assert hub.coordinator_count == 1
+
+    unregister()
+    assert hub.coordinator_count == 0
+
+
+@pytest.mark.asyncio
+async def test_tick_refreshes_due_coordinators_in_one_batch(hub):
+    """Test qu'un seul réveil rafraîchit tous les coordinators dus."""
+    fast = [_make_coordinator(f"fast_{i}", timedelta(seconds=0)) for i in range(3)]
+    slow = _make_coordinator("slow", timedelta(minutes=5))
+    for coordinator in fast + [slow]:
+        hub.async_register(coordinator)
+
+    await hub._async_tick()
+
+    for coordinator in fast:
+        coordinator.async_refresh.assert_awaited_once()
+    slow.async_refresh.assert_not_awaited()
+    assert hub.last_batch_size == 3
+    assert hub.tick_count == 1
+
@@ -0,0 +1,434 @@
+"""Tests pour l'import des cycles historiques."""
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.smart_appliance_monitor.cycle_record import CycleRecord
+from custom_components.smart_appliance_monitor.cycle_store import CycleStore
+from custom_components.smart_appliance_monitor.import_history import (
+    BatchCycleImporter,
+    HistoricalCycleImporter,
+)
+
+HISTORIES = "custom_components.smart_appliance_monitor.import_history._async_get_histories"
+
+
+@pytest.fixture
+def importer(mock_hass):
+    """Fixture pour créer un importeur avec des seuils simples."""
+    mock_hass.async_add_executor_job = AsyncMock(
+        side_effect=lambda func, *args: func(*args)
+    )
+    # async_fire est synchrone dans Home Assistant
+    mock_hass.bus.async_fire = MagicMock()
+    # Pas de Recorder chargé : Home Assistant lève KeyError
+    with patch(
+        "custom_components.smart_appliance_monitor.import_history.get_instance",
+        side_effect=KeyError("recorder_instance"),
+    ):
+        yield _importer(mock_hass, "four")
+
+
+def _importer(hass, name: str) -> HistoricalCycleImporter:
+    """Crée l'importeur d'un appareil."""
+    return HistoricalCycleImporter(
+        hass,
+        name,
+        name.capitalize(),
+        "oven",
+        f"sensor.{name}_power",
+        f"sensor.{name}_energy",
+        start_threshold=50,
+        stop_threshold=5,
+        start_delay=60,
+        stop_delay=60,
+        price_kwh=0.25,
+    )
+
+
+def test_energy_interpolated_between_samples(importer):
+    """Test l'interpolation entre les deux relevés d'énergie voisins."""
+    start = datetime(2025, 1, 1, 12, 0)
+    times = [(start + timedelta(minutes=10 * index)).timestamp() for index in range(3)]
+    values = [10.0, 11.0, 13.0]
+
+    assert importer._get_energy_at_time(times, values, start) == 10.0
+    assert importer._get_energy_at_time(
+        times, values, start + timedelta(minutes=15)
+    ) == pytest.approx(12.0)
+    # Hors de la plage enregistrée : relevé le plus proche s'il est assez récent
+    assert importer._get_energy_at_time(
+        times, values, start + timedelta(minutes=24)
+    ) == 13.0
+    assert importer._get_energy_at_time(
+        times, values, start - timedelta(hours=1)
+    ) == 0.0
+    assert importer._get_energy_at_time([], [], start) == 0.0
+
+
+def test_cycles_detected_with_unaligned_energy_samples(importer):
+    """Test la détection avec des relevés d'énergie décalés de la puissance."""
+    start = datetime(2025, 1, 1, 12, 0)
+    power_history = [
+        (start + timedelta(seconds=10 * index), 2000.0 if 6 <= index < 366 else 0.0)
+        for index in range(400)
+    ]
+    # Compteur relevé toutes les 7 s, 2 kW pendant une heure
+    energy_history = [
+        (
+            start + timedelta(seconds=7 * index),
+            5.0 + 2.0 * min(max(7 * index - 60, 0), 3600) / 3600,
+        )
+        for index in range(580)
+    ]
+
+    cycles = importer._detect_cycles_from_history(power_history, energy_history)
+
+    assert len(cycles) == 1
+    # Énergie relevée à la confirmation du démarrage (120 s) et de l'arrêt
+    assert cycles[0]["start_energy"] == pytest.approx(5.0 + 2.0 * 60 / 3600, abs=0.001)
+    assert cycles[0]["end_energy"] == pytest.approx(7.0, abs=0.001)
+
+
+def _history_source(samples, queries=None):
+    """Simule le Recorder en renvoyant les relevés d'une fenêtre."""
+
+    async def get_histories(hass, entity_ids, start_time, end_time):
+        if queries is not None:
+            queries.append(sorted(entity_ids))
+        return {
+            entity_id: [
+                (timestamp, value)
+                for timestamp, value in samples.get(entity_id, [])
+                if start_time.timestamp() <= timestamp.timestamp() < end_time.timestamp()
+            ]
+            for entity_id in entity_ids
+        }
+
+    return get_histories
+
+
+@pytest.mark.asyncio
+async def test_import_streams_windows_and_carries_cycles(importer, mock_hass):
+    """Test qu'un cycle à cheval sur deux fenêtres est détecté une seule fois."""
+    start = datetime(2025, 1, 1, 0, 0)
+    # Cycle de 23:00 à 01:00 le lendemain, relevé toutes les minutes
+    power = [
+        (
+            start + timedelta(minutes=minute),
+            1500.0 if 23 * 60 <= minute < 25 * 60 else 0.0,
+        )
+        for minute in range(3 * 24 * 60)
+    ]
+    energy = [
+        (timestamp, minute_index / 60)
+        for minute_index, (timestamp, _power) in enumerate(power)
+    ]
+    samples = {"sensor.four_power": power, "sensor.four_energy": energy}
+
+    with patch(HISTORIES, side_effect=_history_source(samples)):
+        result = await importer.async_import_cycles(
+            start, start + timedelta(days=3), dry_run=True
+        )
+
+    assert result["success"]
+    assert not result["cancelled"]
+    assert result["cycles_detected"] == 1
+    # Début et fin datés à leur confirmation, comme en suivi direct
+    assert result["cycles"][0]["start_time"] == "2025-01-01T23:01:00"
+    assert result["cycles"][0]["duration"] == pytest.approx(120.0)
+
+    progress = [
+        call.args[1]["progress"]
+        for call in mock_hass.bus.async_fire.call_args_list
+        if call.args[0] == "smart_appliance_monitor_import_progress"
+    ]
+    assert progress == [33.3, 66.7, 100.0]
+
+
+@pytest.mark.asyncio
+async def test_import_reads_aware_recorder_times(importer, mock_hass):
+    """Test l'import avec les horodatages UTC avec fuseau renvoyés par le Recorder."""
+    start = datetime(2025, 1, 1, 0, 0)
+    # La période est en heure locale sans fuseau, les relevés en UTC avec fuseau
+    recorder_start = start.astimezone(UTC)
+    power = [
+        (
+            recorder_start + timedelta(minutes=minute),
+            1500.0 if 23 * 60 <= minute < 25 * 60 else 0.0,
+        )
+        for minute in range(2 * 24 * 60)
+    ]
+    energy = [
+        (timestamp, minute_index / 60)
+        for minute_index, (timestamp, _power) in enumerate(power)
+    ]
+    samples = {"sensor.four_power": power, "sensor.four_energy": energy}
+
+    with patch(HISTORIES, side_effect=_history_source(samples)):
+        result = await importer.async_import_cycles(
+            start, start + timedelta(days=2), dry_run=True
+        )
+
+    assert result["success"]
+    assert result["cycles_detected"] == 1
+    assert datetime.fromisoformat(result["cycles"][0]["start_time"]) == (
+        recorder_start + timedelta(hours=23, minutes=1)
+    )
+    assert result["cycles"][0]["energy"] == pytest.approx(2.0, abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_import_cancelled_after_current_window(importer, mock_hass):
+    """Test l'arrêt de l'import à la fin de la fenêtre en cours."""
+    start = datetime(2025, 1, 1, 0, 0)
+    samples = {
+        "sensor.four_power": [
+            (start + timedelta(hours=hour), 0.0) for hour in range(5 * 24)
+        ]
+    }
+    get_histories = _history_source(samples)
+
+    async def cancel_during_first_window(hass, entity_ids, start_time, end_time):
+        importer.cancel()
+        return await get_histories(hass, entity_ids, start_time, end_time)
+
+    with patch(HISTORIES, side_effect=cancel_during_first_window):
+        result = await importer.async_import_cycles(
+            start, start + timedelta(days=5), dry_run=True
+        )
+
+    assert result["cancelled"]
+    assert result["processed_until"] == "2025-01-02T00:00:00"
+
+
+@pytest.mark.asyncio
+async def test_batch_import_uses_one_query_per_window(importer, mock_hass):
+    """Test l'import groupé avec une seule requête Recorder par fenêtre."""
+    start = datetime(2025, 1, 1, 0, 0)
+    samples = {}
+    for name, hour in (("four", 8), ("lave_linge", 14)):
+        power = [
+            (
+                start + timedelta(minutes=minute),
+                1500.0 if hour * 60 <= minute < hour * 60 + 90 else 0.0,
+            )
+            for minute in range(2 * 24 * 60)
+        ]
+        samples[f"sensor.{name}_power"] = power
+        samples[f"sensor.{name}_energy"] = [
+            (timestamp, index / 40) for index, (timestamp, _power) in enumerate(power)
+        ]
+    washer = _importer(mock_hass, "lave_linge")
+    queries = []
+
+    with patch(HISTORIES, side_effect=_history_source(samples, queries)):
+        results = await BatchCycleImporter(mock_hass, [importer, washer]).async_import_cycles(
+            start, start + timedelta(days=2), dry_run=True
+        )
+
+    assert len(queries) == 2
+    assert queries[0] == [
+        "sensor.four_energy",
+        "sensor.four_power",
+        "sensor.lave_linge_energy",
+        "sensor.lave_linge_power",
+    ]
+    assert results["four"]["cycles"][0]["start_time"] == "2025-01-01T08:01:00"
+    assert results["lave_linge"]["cycles"][0]["start_time"] == "2025-01-01T14:01:00"
+
+
+@pytest.mark.asyncio
+async def test_statistics_import_approximates_cycles(importer):
+    """Test l'import approximatif depuis les statistiques horaires."""
+    start = datetime(2022, 3, 1, 0, 0)
+    power, energy = [], []
+    total = 100.0
+    for hour in range(3 * 24):
+        # Cycle de 2 h (8 h - 10 h) chaque jour, avec un pic bref sans cycle à 20 h
+        running = hour % 24 in (8, 9)
+        mean = 1200.0 if running else 2.0
+        peak = 1800.0 if running or hour % 24 == 20 else 3.0
+        total += mean / 1000
+        bucket_start = (start + timedelta(hours=hour)).timestamp()
+        power.append({"start": bucket_start, "mean": mean, "max": peak, "sum": None})
+        energy.append({"start": bucket_start, "mean": None, "max": None, "sum": total})
+    statistics = {"sensor.four_power": power, "sensor.four_energy": energy}
+
+    async def get_statistics(hass, statistic_ids, start_time, end_time, period):
+        if period != "hour":
+            return {}
+        return {
+            statistic_id: [
+                bucket
+                for bucket in statistics[statistic_id]
+                if start_time.timestamp() <= bucket["start"] < end_time.timestamp()
+            ]
+            for statistic_id in statistic_ids
+        }
+
+    with patch(
+        "custom_components.smart_appliance_monitor.import_history._async_get_statistics",
+        side_effect=get_statistics,
+    ):
+        result = await importer.async_import_cycles(
+            start, start + timedelta(days=3), dry_run=True, source="statistics"
+        )
+
+    assert result["cycles_detected"] == 3
+    assert result["low_precision_cycles"] == 3
+    cycle = result["cycles"][0]
+    assert cycle["start_time"] == "2022-03-01T08:00:00"
+    assert cycle["end_time"] == "2022-03-01T10:00:00"
+    assert cycle["energy"] == pytest.approx(2.4)
+    assert cycle["low_precision"]
+
+
+@pytest.mark.asyncio
+async def test_statistics_import_merges_hourly_and_5minute(importer):
+    """Test l'import depuis les statistiques horaires complétées par les 5 minutes."""
+    start = datetime(2022, 3, 1, 0, 0)
+    # 5 minutes conservées seulement pour la fin de la période, depuis 07:35
+    fine_start = (start + timedelta(days=9, hours=7, minutes=35)).timestamp()
+    statistics = {"hour": {}, "5minute": {}}
+    for period, seconds in (("hour", 3600), ("5minute", 300)):
+        power, energy = [], []
+        total = 100.0
+        for index in range(10 * 24 * 3600 // seconds):
+            bucket_start = start.timestamp() + index * seconds
+            # Cycle de 2 h (8 h - 10 h) chaque jour
+            running = 8 <= (index * seconds // 3600) % 24 < 10
+            mean = 1200.0 if running else 2.0
+            total += mean * seconds / 3_600_000
+            if period == "5minute" and bucket_start < fine_start:
+                continue
+            # Pics plus précis dans les statistiques 5 minutes
+            peak = mean * (2.0 if period == "5minute" else 1.5)
+            power.append({"start": bucket_start, "mean": mean, "max": peak, "sum": None})
+            energy.append({"start": bucket_start, "mean": None, "max": None, "sum": total})
+        statistics[period] = {"sensor.four_power": power, "sensor.four_energy": energy}
+
+    async def get_statistics(hass, statistic_ids, start_time, end_time, period):
+        return {
+            statistic_id: [
+                bucket
+                for bucket in statistics[period][statistic_id]
+                if start_time.timestamp() <= bucket["start"] < end_time.timestamp()
+            ]
+            for statistic_id in statistic_ids
+        }
+
+    with patch(
+        "custom_components.smart_appliance_monitor.import_history._async_get_statistics",
+        side_effect=get_statistics,
+    ):
+        result = await importer.async_import_cycles(
+            start, start + timedelta(days=10), dry_run=True, source="statistics"
+        )
+
+    assert result["cycles_detected"] == 10
+    assert [cycle["energy"] for cycle in result["cycles"]] == pytest.approx([2.4] * 10)
+    assert result["cycles"][-2]["peak_power"] == 1800.0
+    # Le dernier cycle est lu dans les statistiques 5 minutes, après 08:00
+    assert result["cycles"][-1]["peak_power"] == 2400.0
+    assert result["cycles"][-1]["start_time"] == "2022-03-10T08:00:00"
+    assert result["cycles"][-1]["end_time"] == "2022-03-10T10:00:00"
+
+
+@pytest.mark.asyncio
+async def test_import_writes_store_without_bus_events(importer, mock_hass, tmp_path):
+    """Test que l'import écrit dans la base des cycles sans événement sur le bus."""
+    store = CycleStore(mock_hass, str(tmp_path / "cycles.db"))
+    store._setup()
+    mock_hass.data = {"smart_appliance_monitor": {"cycle_store": store}}
+    start = datetime(2025, 1, 1, 0, 0)
+    power = [
+        (start + timedelta(minutes=minute), 1500.0 if minute % 240 < 60 else 0.0)
+        for minute in range(3 * 24 * 60)
+    ]
+    samples = {
+        "sensor.four_power": power,
+        "sensor.four_energy": [
+            (timestamp, index / 40) for index, (timestamp, _power) in enumerate(power)
+        ],
+    }
+
+    with patch(HISTORIES, side_effect=_history_source(samples)), patch.object(
+        store, "_write_batches", wraps=store._write_batches
+    ) as write_batches, patch.object(
+        importer, "_fire_cycle_events", MagicMock()
+    ) as fire_cycle_events:
+        result = await importer.async_import_cycles(start, start + timedelta(days=3))
+
+    cycles = await store.async_get_cycles("four", start, start + timedelta(days=4))
+    store._close()
+
+    assert result["cycles_detected"] == len(cycles) == 18
+    # Une seule transaction pour toute la période
+    assert write_batches.call_count == 1
+    assert cycles[-1]["imported"]
+    assert cycles[-1]["timestamp"] == datetime(2025, 1, 1, 1, 1)
+    fire_cycle_events.assert_not_called()
+    fired = [call.args[0] for call in mock_hass.bus.async_fire.call_args_list]
+    assert "smart_appliance_monitor_cycle_finished" not in fired
+
+
+@pytest.mark.asyncio
+async def test_incremental_import_resumes_from_watermark(importer, mock_hass, tmp_path):
+    """Test la reprise d'un import incrémental là où le précédent s'est arrêté."""
+    store = CycleStore(mock_hass, str(tmp_path / "cycles.db"))
+    store._setup()
+    mock_hass.data = {"smart_appliance_monitor": {"cycle_store": store}}
+    start = datetime(2025, 1, 1, 0, 0)
+    # Un cycle de 23:00 à 01:00 puis un autre le surlendemain à 10:00
+    power = [
+        (
+            start + timedelta(minutes=minute),
+            1500.0
+            if 23 * 60 <= minute < 25 * 60 or 58 * 60 <= minute < 59 * 60
+            else 0.0,
+        )
+        for minute in range(3 * 24 * 60)
+    ]
+    samples = {
+        "sensor.four_power": power,
+        "sensor.four_energy": [
+            (timestamp, index / 40) for index, (timestamp, _power) in enumerate(power)
+        ],
+    }
+    get_histories = _history_source(samples)
+    query_starts = []
+
+    async def recorded_histories(hass, entity_ids, start_time, end_time):
+        query_starts.append(start_time)
+        return await get_histories(hass, entity_ids, start_time, end_time)
+
+    watermark = start + timedelta(days=1, minutes=30)
+    with patch(HISTORIES, side_effect=recorded_histories):
+        # Premier import arrêté au milieu du cycle de minuit
+        first = await importer.async_import_cycles(start, watermark, incremental=True)
+        saved = await store.async_get_watermark("four")
+        query_starts.clear()
+        second = await importer.async_import_cycles(
+            start, start + timedelta(days=3), incremental=True
+        )
+
+    cycles = await store.async_get_cycles("four", start, start + timedelta(days=4))
+    final = await store.async_get_watermark("four")
+    store._close()
+
+    assert first["cycles_detected"] == 0
+    assert saved[0] == watermark
+    assert CycleRecord.from_tuple(
+        saved[1]["state_machine"]["current_cycle"]
+    ).start_time == datetime(2025, 1, 1, 23, 1)
+    # Seules les données postérieures à l'arrêt précédent sont relues
+    assert min(query_starts) >= watermark - timedelta(minutes=5)
+    assert second["cycles_detected"] == 2
+    assert second["period_start"] == watermark.isoformat()
+    assert sorted(cycle["timestamp"] for cycle in cycles)[0] == datetime(2025, 1, 2, 1, 1)
+    assert final[0] == start + timedelta(days=3)
+    assert final[1]["state_machine"]["state"] == "idle"
@@ -0,0 +1,69 @@
+"""Tests pour la mesure des performances du coordinator."""
+from __future__ import annotations
+
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custom_components.smart_appliance_monitor.coordinator import (
+    SmartApplianceCoordinator,
+)
+from custom_components.smart_appliance_monitor.instrumentation import (
+    Instrumentation,
+    LatencyHistogram,
+)
+
+
+def test_latency_histogram_percentiles():
+    """Test les percentiles de la fenêtre glissante."""
+    histogram = LatencyHistogram(size=100)
+    for value in range(1, 201):
+        histogram.add(value / 1000)
+
+    # Seules les 100 dernières mesures sont conservées
+    assert histogram.count == 200
+    assert histogram.summary() == {
+        "count": 200,
+        "p50_ms": 150.0,
+        "p95_ms": 195.0,
+        "max_ms": 200.0,
+    }
+
+
+def test_disabled_instrumentation_records_nothing():
+    """Test que la mesure désactivée n'enregistre rien."""
+    instrumentation = Instrumentation()
+
+    with instrumentation.measure("update"):
+        pass
+    instrumentation.increment("store_flushes")
+
+    assert instrumentation.stages["update"].count == 0
+    assert instrumentation.counters["store_flushes"] == 0
+
+
+@pytest.mark.asyncio
+async def test_coordinator_records_stages_and_writes(mock_hass, mock_config_entry):
+    """Test que le coordinator mesure les échantillons et les notifications."""
+    coordinator = SmartApplianceCoordinator(mock_hass, mock_config_entry)
+    coordinator.instrumentation.enabled = True
+
+    coordinator.async_add_listener(MagicMock(), frozenset({"power"}))
+    coordinator.async_add_listener(MagicMock())
+
+    now = datetime(2025, 10, 20, 18, 30, 0)
+    with patch(
+        "custom_components.smart_appliance_monitor.coordinator.async_call_later"
+    ):
+        await coordinator._async_process_pushed_sample(5.0, 1.0, now)
+        await coordinator._async_process_pushed_sample(5.0, 1.0, now)
+        await coordinator._async_process_pushed_sample(8.0, 1.0, now)
+
+    instrumentation = coordinator.instrumentation.as_dict()
+    assert instrumentation["stages"]["sample"]["count"] == 3
+    assert instrumentation["stages"]["notify"]["count"] == 3
+    assert instrumentation["counters"]["state_writes"] == 5
+
+    coordinator._data_to_save()
+    assert coordinator.instrumentation.counters["store_flushes"] == 1
@@ -86,19 +86,22 @@ async def test_cycle_serialization(mock_hass, mock_config_entry):
         "peak_power": 200.0,
     }
     
-    # Sérialiser
+    # Sérialiser en tuple compact
     serialized = coordinator._serialize_cycle(cycle)
-    assert isinstance(serialized["start_time"], str)
-    assert isinstance(serialized["end_time"], str)
-    assert serialized["duration"] == 90.0
+    assert isinstance(serialized, tuple)
+    assert serialized[2] == 90.0
     
     # Désérialiser
-    deserialized = coordinator._deserialize_cycle(serialized)
-    assert isinstance(deserialized["start_time"], datetime)
-    assert isinstance(deserialized["end_time"], datetime)
+    deserialized = coordinator._deserialize_cycle(list(serialized))
     assert deserialized["start_time"] == cycle["start_time"]
     assert deserialized["end_time"] == cycle["end_time"]
     assert deserialized["duration"] == 90.0
+    
+    # Les cycles stockés en dictionnaire par les anciennes versions sont relus
+    legacy = coordinator._deserialize_cycle(
+        {**cycle, "start_time": "2025-10-20T10:00:00", "end_time": "2025-10-20T11:30:00"}
+    )
+    assert legacy == deserialized
 
 
 @pytest.mark.asyncio
@@ -245,12 +248,14 @@ async def test_periodic_save_during_running_cycle(mock_hass, mock_config_entry):
         power_state if "power" in entity_id else energy_state
     )
     
-    # Mock de _save_state pour vérifier qu'il est appelé
-    with patch.object(coordinator, "_save_state", new=AsyncMock()) as mock_save:
+    # L'écriture périodique est différée et regroupée, jamais immédiate
+    with patch.object(coordinator, "_save_state", new=AsyncMock()) as mock_save, \
+            patch.object(coordinator, "_schedule_save") as mock_schedule:
         await coordinator._async_update_data()
         
-        # Vérifier que _save_state a été appelé (car état = RUNNING)
-        mock_save.assert_called()
+        # Vérifier qu'une écriture différée a été programmée (car état = RUNNING)
+        mock_schedule.assert_called_with("state")
+        mock_save.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -272,8 +277,126 @@ async def test_no_periodic_save_when_idle(mock_hass, mock_config_entry):
     )
     
     # Mock de _save_state pour vérifier qu'il n'est PAS appelé
-    with patch.object(coordinator, "_save_state", new=AsyncMock()) as mock_save:
+    with patch.object(coordinator, "_save_state", new=AsyncMock()) as mock_save, \
+            patch.object(coordinator, "_schedule_save") as mock_schedule:
         await coordinator._async_update_data()
         
-        # Vérifier que _save_state n'a PAS été appelé (car état = IDLE)
+        # Vérifier qu'aucune sauvegarde n'a eu lieu (car état = IDLE)
         mock_save.assert_not_called()
+        mock_schedule.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_running_ticks_coalesce_writes(mock_hass, mock_config_entry):
+    """Test que les ticks d'un cycle en cours sont regroupés en écritures différées."""
+    coordinator = SmartApplianceCoordinator(mock_hass, mock_config_entry)
+    coordinator._store = MagicMock()
+    coordinator._store.async_save = AsyncMock()
+    
+    coordinator.state_machine.state = STATE_RUNNING
+    coordinator.state_machine.current_cycle = {
+        "start_time": datetime.now(),
+        "start_energy": 1.0,
+        "peak_power": 150.0,
+    }
+    
+    for _ in range(10):
+        await coordinator._async_process_sample(150.0, 2.0)
+    
+    # Une seule écriture programmée : la reporter à chaque tick la retarderait
+    # jusqu'à la fin du cycle
+    assert coordinator._store.async_delay_save.call_count == 1
+    coordinator._store.async_save.assert_not_called()
+    
+    # Une fois l'écriture effectuée, le tick suivant en programme une nouvelle
+    coordinator._store.async_delay_save.call_args.args[0]()
+    await coordinator._async_process_sample(150.0, 2.0)
+    assert coordinator._store.async_delay_save.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_only_dirty_sections_reserialized(mock_hass, mock_config_entry):
+    """Test que seules les sections modifiées sont resérialisées."""
+    coordinator = SmartApplianceCoordinator(mock_hass, mock_config_entry)
+    coordinator._cycle_history = [
+        {"duration": 60.0, "energy": 1.0, "cost": 0.25, "timestamp": datetime.now()}
+    ]
+    
+    # Première écriture : toutes les sections
+    data = coordinator._data_to_save()
+    assert len(data["cycle_history"]) == 1
+    
+    coordinator.state_machine.state = STATE_RUNNING
+    coordinator._dirty_sections.add("state")
+    
+    with patch.object(
+        coordinator, "_serialize_section", wraps=coordinator._serialize_section
+    ) as serialize:
+        data = coordinator._data_to_save()
+    
+    serialize.assert_called_once_with("state")
+    assert data["state"] == STATE_RUNNING
+    # Les sections inchangées proviennent du cache
+    assert len(data["cycle_history"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_shutdown_flushes_pending_write(mock_hass, mock_config_entry):
+    """Test que l'arrêt écrit immédiatement les modifications en attente."""
+    coordinator = SmartApplianceCoordinator(mock_hass, mock_config_entry)
+    coordinator._store = MagicMock()
+    coordinator._store.async_save = AsyncMock()
+    
+    # Rien en attente après une première écriture
+    coordinator._data_to_save()
+    await coordinator.async_shutdown()
+    coordinator._store.async_save.assert_not_called()
+    
+    # Une modification en attente est écrite à l'arrêt
+    coordinator._schedule_save("switches")
+    await coordinator.async_shutdown()
+    coordinator._store.async_save.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_cycle_statistics_rebuilt_from_history(mock_hass, mock_config_entry):
+    """Test que les statistiques de cycles sont reconstruites pour les anciennes sauvegardes."""
+    coordinator = SmartApplianceCoordinator(mock_hass, mock_config_entry)
+    
+    saved_data = {
+        "state": "idle",
+        "cycle_history": [
+            {"duration": 60.0, "energy": 1.5, "cost": 0.38, "timestamp": "2025-10-20T18:00:00"},
+            {"duration": 70.0, "energy": 1.7, "cost": 0.43, "timestamp": "2025-10-21T18:00:00"},
+        ],
+    }
+    
+    with patch.object(coordinator._store, "async_load", AsyncMock(return_value=saved_data)):
+        await coordinator.restore_state()
+    
+    assert coordinator.cycle_statistics.count == 2
+    assert coordinator.cycle_statistics.duration.mean == 65.0
+
+
+@pytest.mark.asyncio
+async def test_cycle_statistics_rebuilt_from_legacy_aggregates(mock_hass, mock_config_entry):
+    """Test que les anciens agrégats sur tous les cycles sont remplacés par la fenêtre récente."""
+    coordinator = SmartApplianceCoordinator(mock_hass, mock_config_entry)
+    
+    saved_data = {
+        "state": "idle",
+        "cycle_history": [
+            {"duration": 60.0, "energy": 1.5, "cost": 0.38, "timestamp": "2025-10-20T18:00:00"},
+            {"duration": 70.0, "energy": 1.7, "cost": 0.43, "timestamp": "2025-10-21T18:00:00"},
+        ],
+        "cycle_statistics": {
+            "duration": {"count": 500, "mean": 40.0, "m2": 900.0, "min": 20.0, "max": 80.0},
+            "energy": {"count": 500, "mean": 0.9, "m2": 4.0, "min": 0.5, "max": 2.0},
+        },
+    }
+    
+    with patch.object(coordinator._store, "async_load", AsyncMock(return_value=saved_data)):
+        await coordinator.restore_state()
+    
+    assert coordinator.cycle_statistics.count == 2
+    assert coordinator.cycle_statistics.duration.mean == 65.0
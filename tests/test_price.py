@@ -0,0 +1,154 @@
+"""Tests pour le service de prix partagé."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custom_components.smart_appliance_monitor.coordinator import (
+    SmartApplianceCoordinator,
+)
+from custom_components.smart_appliance_monitor.const import STATE_RUNNING
+from custom_components.smart_appliance_monitor.price import (
+    PriceService,
+    PriceTimeline,
+)
+
+
+def _price_state(value: str, last_changed: datetime) -> MagicMock:
+    """Crée un état factice de l'entité de prix."""
+    state = MagicMock()
+    state.state = value
+    state.last_changed = last_changed
+    return state
+
+
+@pytest.fixture
+def price_service(mock_hass):
+    """Fixture pour créer un service de prix sans abonnement réel."""
+    with patch(
+        "custom_components.smart_appliance_monitor.price.async_track_state_change_event"
+    ) as track:
+        track.return_value = MagicMock()
+        yield PriceService(mock_hass)
+
+
+def test_fixed_price(price_service):
+    """Test le prix fixe sans entité."""
+    price_service.async_configure(
+        {"global_price_entity": None, "global_price_fixed": 0.1952}
+    )
+    
+    assert price_service.current_price == 0.1952
+    assert price_service.price_at(datetime(2025, 10, 20, 12, 0)) == 0.1952
+
+
+def test_entity_price_read_once_and_cached(price_service, mock_hass):
+    """Test que l'entité de prix est lue à la configuration puis mise en cache."""
+    mock_hass.states.get.return_value = _price_state("0.2516", datetime.now())
+    
+    price_service.async_configure(
+        {"global_price_entity": "sensor.edf_price", "global_price_fixed": 0.1952}
+    )
+    mock_hass.states.get.reset_mock()
+    
+    assert price_service.current_price == 0.2516
+    assert price_service.current_price == 0.2516
+    mock_hass.states.get.assert_not_called()
+
+
+def test_price_changes_recorded_in_timeline(price_service, mock_hass):
+    """Test que les changements de prix sont horodatés."""
+    peak_start = datetime(2025, 10, 20, 6, 0)
+    offpeak_start = datetime(2025, 10, 20, 22, 0)
+    mock_hass.states.get.return_value = _price_state("0.2700", peak_start)
+    price_service.async_configure(
+        {"global_price_entity": "sensor.edf_price", "global_price_fixed": 0.1952}
+    )
+    price_service.timeline.timestamps[0] = peak_start.timestamp()
+    
+    event = MagicMock()
+    event.data = {"new_state": _price_state("0.2068", offpeak_start)}
+    price_service._async_handle_price_change(event)
+    
+    assert price_service.current_price == 0.2068
+    assert price_service.price_at(datetime(2025, 10, 20, 12, 0)) == 0.27
+    assert price_service.price_at(datetime(2025, 10, 20, 23, 0)) == 0.2068
+    assert price_service.price_changes(
+        datetime(2025, 10, 20, 21, 0), datetime(2025, 10, 20, 23, 0)
+    ) == [
+        (datetime(2025, 10, 20, 21, 0).timestamp(), 0.27),
+        (offpeak_start.timestamp(), 0.2068),
+    ]
+
+
+def test_unavailable_entity_uses_fixed_price(price_service, mock_hass):
+    """Test le repli sur le prix fixe quand l'entité est indisponible."""
+    mock_hass.states.get.return_value = _price_state("unavailable", datetime.now())
+    
+    price_service.async_configure(
+        {"global_price_entity": "sensor.edf_price", "global_price_fixed": 0.1952}
+    )
+    
+    assert price_service.current_price == 0.1952
+
+
+def test_timeline_trimmed_to_retention(price_service):
+    """Test que la chronologie ne conserve que la période de rétention."""
+    start = datetime(2025, 10, 1)
+    for hour in range(24 * 10):
+        price_service._record(
+            0.20 if hour % 2 else 0.27, (start + timedelta(hours=hour)).timestamp()
+        )
+    
+    assert price_service.timeline_size <= 24 * 3 + 1
+
+
+def test_integrate_cost_across_price_change():
+    """Test le coût d'une énergie consommée à cheval sur un changement de tarif."""
+    offpeak_start = datetime(2025, 10, 20, 22, 0)
+    timeline = PriceTimeline.from_history(
+        [(datetime(2025, 10, 20, 6, 0), 0.27), (offpeak_start, 0.20)]
+    )
+    start = (offpeak_start - timedelta(minutes=30)).timestamp()
+    end = (offpeak_start + timedelta(minutes=90)).timestamp()
+    
+    # 1 kWh réparti sur 2 h : 0.25 kWh en heures pleines, 0.75 kWh en creuses
+    assert timeline.integrate_cost(start, end, 1.0) == pytest.approx(0.2175)
+    # Sans changement de tarif, un seul prix s'applique
+    assert timeline.integrate_cost(start, start + 600, 1.0) == pytest.approx(0.27)
+
+
+@pytest.mark.asyncio
+async def test_coordinator_accumulates_cycle_cost(mock_hass, mock_config_entry):
+    """Test que le coût d'un cycle suit les changements de tarif."""
+    coordinator = SmartApplianceCoordinator(mock_hass, mock_config_entry)
+    price_service = PriceService(mock_hass)
+    mock_hass.data = {"smart_appliance_monitor": {"price_service": price_service}}
+    
+    start = datetime(2025, 10, 20, 21, 0)
+    price_service._record(0.27, (start - timedelta(hours=1)).timestamp())
+    price_service._record(0.20, datetime(2025, 10, 20, 22, 0).timestamp())
+    
+    coordinator.state_machine.state = STATE_RUNNING
+    coordinator.state_machine.current_cycle = {
+        "start_time": start,
+        "start_energy": 10.0,
+    }
+    coordinator._accumulate_cycle_cost(10.5, datetime(2025, 10, 20, 22, 0))
+    coordinator._accumulate_cycle_cost(11.5, datetime(2025, 10, 20, 23, 0))
+    
+    cycle = coordinator.state_machine.current_cycle
+    assert cycle["cost"] == pytest.approx(0.5 * 0.27 + 1.0 * 0.20)
+
+
+@pytest.mark.asyncio
+async def test_coordinator_reads_cached_price(mock_hass, mock_config_entry):
+    """Test que le coordinator lit le prix depuis le service partagé."""
+    coordinator = SmartApplianceCoordinator(mock_hass, mock_config_entry)
+    price_service = MagicMock()
+    price_service.current_price = 0.1234
+    mock_hass.data = {"smart_appliance_monitor": {"price_service": price_service}}
+    
+    assert coordinator.price_kwh == 0.1234
@@ -0,0 +1,123 @@
+"""Tests pour le planning hebdomadaire compilé."""
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from custom_components.smart_appliance_monitor.schedule import (
+    MINUTES_PER_DAY,
+    WeeklySchedule,
+    parse_overrides,
+    parse_windows,
+)
+
+
+def test_single_window_with_blocked_day():
+    """Test une plage journalière unique avec un jour bloqué."""
+    schedule = WeeklySchedule.from_options("08:00", "22:00", ["sunday"])
+    
+    assert schedule.is_allowed(datetime(2025, 10, 20, 8, 0)) is True  # Lundi
+    assert schedule.is_allowed(datetime(2025, 10, 20, 22, 0)) is True
+    assert schedule.is_allowed(datetime(2025, 10, 20, 7, 59)) is False
+    assert schedule.is_allowed(datetime(2025, 10, 20, 22, 1)) is False
+    assert schedule.is_allowed(datetime(2025, 10, 26, 14, 0)) is False  # Dimanche
+    assert schedule.allowed_minutes == 6 * (14 * 60 + 1)
+
+
+def test_window_crossing_midnight():
+    """Test une plage qui traverse minuit."""
+    schedule = WeeklySchedule.from_options("22:00", "07:00")
+    
+    assert schedule.is_allowed(datetime(2025, 10, 20, 23, 0)) is True
+    assert schedule.is_allowed(datetime(2025, 10, 20, 6, 0)) is True
+    assert schedule.is_allowed(datetime(2025, 10, 20, 14, 0)) is False
+
+
+def test_multiple_windows_and_overrides():
+    """Test plusieurs plages par jour et des exceptions par jour."""
+    schedule = WeeklySchedule.from_options(
+        "00:00",
+        "23:59",
+        windows="06:00-08:00, 22:00-23:30",
+        overrides="saturday: 10:00-23:00; sunday: off",
+    )
+    
+    monday = datetime(2025, 10, 20, 7, 0)
+    assert schedule.is_allowed(monday) is True
+    assert schedule.is_allowed(monday.replace(hour=12)) is False
+    assert schedule.is_allowed(monday.replace(hour=23)) is True
+    assert schedule.is_allowed(datetime(2025, 10, 25, 12, 0)) is True  # Samedi
+    assert schedule.is_allowed(datetime(2025, 10, 26, 7, 0)) is False  # Dimanche
+
+
+def test_next_allowed_start():
+    """Test la recherche du prochain créneau autorisé."""
+    schedule = WeeklySchedule.from_options("08:00", "22:00", ["saturday", "sunday"])
+    
+    # Déjà autorisé
+    now = datetime(2025, 10, 20, 9, 30, 15)
+    assert schedule.next_allowed_start(now) == now
+    
+    # Plus tard dans la journée
+    assert schedule.next_allowed_start(datetime(2025, 10, 20, 6, 15, 30)) == datetime(
+        2025, 10, 20, 8, 0
+    )
+    
+    # Vendredi soir : lundi matin (en passant par la fin de semaine)
+    assert schedule.next_allowed_start(datetime(2025, 10, 24, 23, 0)) == datetime(
+        2025, 10, 27, 8, 0
+    )
+
+
+def test_next_allowed_start_wraps_week():
+    """Test que la recherche reprend au début de la semaine."""
+    schedule = WeeklySchedule.from_options(
+        "08:00", "22:00", overrides="; ".join(
+            f"{day}: off" for day in ("tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+        )
+    )
+    
+    assert schedule.next_allowed_start(datetime(2025, 10, 26, 12, 0)) == datetime(
+        2025, 10, 27, 8, 0
+    )
+
+
+def test_next_change():
+    """Test la recherche de la prochaine ouverture ou fermeture d'une plage."""
+    schedule = WeeklySchedule.from_options("08:00", "22:00", ["saturday", "sunday"])
+    
+    # Fermeture après la dernière minute autorisée
+    assert schedule.next_change(datetime(2025, 10, 20, 9, 30, 15)) == datetime(
+        2025, 10, 20, 22, 1
+    )
+    assert schedule.next_change(datetime(2025, 10, 20, 6, 15)) == datetime(
+        2025, 10, 20, 8, 0
+    )
+    # Vendredi soir : lundi matin
+    assert schedule.next_change(datetime(2025, 10, 24, 23, 0)) == datetime(
+        2025, 10, 27, 8, 0
+    )
+    # Planning sans changement
+    assert WeeklySchedule.always().next_change(datetime(2025, 10, 20, 12, 0)) is None
+
+
+def test_never_allowed():
+    """Test un planning sans aucun créneau autorisé."""
+    schedule = WeeklySchedule.compile({})
+    
+    assert schedule.next_allowed_start(datetime(2025, 10, 20, 12, 0)) is None
+
+
+def test_invalid_options():
+    """Test que les options invalides lèvent une erreur."""
+    with pytest.raises(ValueError):
+        parse_windows("08:00 12:00")
+    with pytest.raises(ValueError):
+        parse_windows("25:00-26:00")
+    with pytest.raises(ValueError):
+        parse_overrides("someday: 08:00-10:00")
+    
+    assert parse_overrides("sunday: off") == {6: []}
+    assert parse_windows("08:00-09:30") == [(8 * 60, 9 * 60 + 30)]
+    assert MINUTES_PER_DAY == 1440
@@ -410,3 +410,56 @@ async def test_all_days_blocked(mock_hass, mock_config_entry):
             mock_dt.now.return_value = test_time
             assert coordinator._is_usage_allowed() is False
 
+
+
+@pytest.mark.asyncio
+async def test_invalid_schedule_allows_usage(mock_hass, mock_config_entry):
+    """Test qu'une planification invalide n'empêche pas l'utilisation."""
+    mock_config_entry.options = {
+        CONF_ENABLE_SCHEDULING: True,
+        CONF_ALLOWED_HOURS_START: "8h",
+        CONF_ALLOWED_HOURS_END: "22:00",
+        CONF_BLOCKED_DAYS: [],
+    }
+    
+    coordinator = SmartApplianceCoordinator(mock_hass, mock_config_entry)
+    
+    with patch("custom_components.smart_appliance_monitor.coordinator.datetime") as mock_dt:
+        mock_dt.now.return_value = datetime(2025, 10, 20, 3, 0, 0)
+        assert coordinator._is_usage_allowed() is True
+
+
+@pytest.mark.asyncio
+async def test_usage_allowed_updated_at_window_boundary(mock_hass, mock_config_entry):
+    """Test que usage_allowed est mis à jour à l'ouverture d'une plage."""
+    mock_config_entry.options = {
+        CONF_ENABLE_SCHEDULING: True,
+        CONF_ALLOWED_HOURS_START: "08:00",
+        CONF_ALLOWED_HOURS_END: "22:00",
+    }
+    coordinator = SmartApplianceCoordinator(mock_hass, mock_config_entry)
+    coordinator.async_set_updated_data = MagicMock()
+    coordinator._last_power = 0.0
+    coordinator._last_energy = 1.0
+    
+    with patch(
+        "custom_components.smart_appliance_monitor.coordinator.datetime"
+    ) as mock_datetime, patch(
+        "homeassistant.helpers.event.async_track_point_in_time", create=True
+    ) as track_point:
+        mock_datetime.now.return_value = datetime(2025, 10, 20, 7, 30)
+        coordinator.async_track_usage_schedule()
+        
+        hass, action, boundary = track_point.call_args.args
+        assert boundary == datetime(2025, 10, 20, 8, 0)
+        
+        # À l'ouverture, les entités sont notifiées et la fermeture programmée
+        mock_datetime.now.return_value = boundary
+        action(boundary)
+    
+    data = coordinator.async_set_updated_data.call_args.args[0]
+    assert data["usage_allowed"] is True
+    assert track_point.call_args.args[2] == datetime(2025, 10, 20, 22, 1)
+    
+    coordinator.async_stop_usage_schedule_tracking()
+    track_point.return_value.assert_called_once()
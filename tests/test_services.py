@@ -7,6 +7,7 @@ import pytest
 
 from custom_components.smart_appliance_monitor import (
     async_setup_services,
+    _async_stop_nightly_import,
     _get_coordinator_from_entity_id,
 )
 from custom_components.smart_appliance_monitor.const import DOMAIN, STATE_RUNNING
@@ -168,3 +169,24 @@ def test_get_coordinator_from_entity_id_not_found(mock_hass):
     
     assert result is None
 
+
+
+def test_nightly_import_stopped_with_last_appliance(mock_hass, mock_config_entry):
+    """Test que l'import nocturne n'est retiré qu'au déchargement du dernier appareil."""
+    from custom_components.smart_appliance_monitor.coordinator import SmartApplianceCoordinator
+    
+    unsub = MagicMock()
+    coordinator = SmartApplianceCoordinator(mock_hass, mock_config_entry)
+    mock_hass.data[DOMAIN] = {
+        "_nightly_import_unsub": unsub,
+        mock_config_entry.entry_id: coordinator,
+    }
+    
+    # Un autre appareil est encore chargé
+    _async_stop_nightly_import(mock_hass)
+    unsub.assert_not_called()
+    
+    del mock_hass.data[DOMAIN][mock_config_entry.entry_id]
+    _async_stop_nightly_import(mock_hass)
+    unsub.assert_called_once()
+    assert "_nightly_import_unsub" not in mock_hass.data[DOMAIN]
@@ -1,10 +1,13 @@
 """Tests pour la machine à états."""
 from __future__ import annotations
 
+import json
+import random
 from datetime import datetime, timedelta
 
 import pytest
 
+from custom_components.smart_appliance_monitor import state_machine as state_machine_module
 from custom_components.smart_appliance_monitor.state_machine import CycleStateMachine
 from custom_components.smart_appliance_monitor.const import (
     EVENT_CYCLE_STARTED,
@@ -298,3 +301,122 @@ def test_reset_statistics(state_machine):
     
     assert state_machine.last_cycle is None
 
+
+
+def test_next_deadline_none_when_idle(state_machine):
+    """Test qu'aucune échéance n'est en attente à l'état IDLE stable."""
+    now = datetime(2025, 10, 20, 18, 30, 0)
+    
+    state_machine.update(10, 0.0, now)
+    
+    assert state_machine.get_next_deadline() is None
+
+
+def test_next_deadline_start_and_stop_delays(state_machine):
+    """Test que les délais de confirmation exposent leur échéance."""
+    now = datetime(2025, 10, 20, 18, 30, 0)
+    
+    # Démarrage en attente de confirmation
+    state_machine.update(100, 0.0, now)
+    assert state_machine.get_next_deadline() == now + timedelta(seconds=120)
+    
+    # Démarrage confirmé : seule l'alerte de durée reste en attente
+    started = now + timedelta(seconds=120)
+    state_machine.update(100, 0.1, started)
+    assert state_machine.get_next_deadline() == started + timedelta(seconds=7200)
+    
+    # Arrêt en attente de confirmation
+    low = started + timedelta(minutes=30)
+    state_machine.update(2, 0.5, low)
+    assert state_machine.get_next_deadline() == low + timedelta(seconds=300)
+
+
+def test_next_deadline_finished_and_unplugged(state_machine):
+    """Test les échéances de retour à IDLE et de détection débranché."""
+    now = datetime(2025, 10, 20, 18, 30, 0)
+    
+    state_machine.update(100, 0.0, now)
+    state_machine.update(100, 0.1, now + timedelta(seconds=120))
+    state_machine.update(2, 0.5, now + timedelta(minutes=30))
+    end = now + timedelta(minutes=35)
+    event = state_machine.update(2, 0.5, end)
+    assert event == EVENT_CYCLE_FINISHED
+    assert state_machine.get_next_deadline() == end + timedelta(seconds=600)
+    
+    # Passage à 0W : la détection débranché arrive avant le retour à IDLE
+    zero = end + timedelta(seconds=10)
+    state_machine.update(0, 0.5, zero)
+    assert state_machine.get_next_deadline() == zero + timedelta(seconds=300)
+
+
+def test_transition_pending(state_machine):
+    """Test la détection d'une confirmation de démarrage/arrêt en attente."""
+    now = datetime(2025, 10, 20, 18, 30, 0)
+    
+    assert state_machine.is_transition_pending() is False
+    
+    state_machine.update(100, 0.0, now)
+    assert state_machine.is_transition_pending() is True
+    
+    state_machine.update(100, 0.1, now + timedelta(seconds=120))
+    assert state_machine.state == STATE_RUNNING
+    assert state_machine.is_transition_pending() is False
+    
+    state_machine.update(2, 0.5, now + timedelta(minutes=30))
+    assert state_machine.is_transition_pending() is True
+
+
+def _random_samples(seed: int, count: int) -> list[tuple[datetime, float, float]]:
+    """Génère une série d'échantillons irréguliers avec cycles, pics et 0W."""
+    rng = random.Random(seed)
+    now = datetime(2025, 10, 20, 8, 0, 0)
+    level = 0.0
+    energy = 0.0
+    samples = []
+    for _ in range(count):
+        step = rng.choice([1, 10, 30, 60, 61, 120, 300])
+        now += timedelta(seconds=step)
+        if rng.random() < 0.05:
+            level = rng.choice([0.0, 0.0, 3.0, 40.0, 500.0, 2000.0])
+        power = level if rng.random() < 0.9 else rng.choice([0.0, 4.0, 100.0])
+        energy += power * step / 3_600_000
+        samples.append((now, power, energy))
+    return samples
+
+
+@pytest.mark.parametrize("engine", ["numpy", "python"])
+def test_replay_matches_update(engine, monkeypatch):
+    """Test que le rejeu produit les mêmes événements et état que update()."""
+    if engine == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(state_machine_module, "np", None)
+
+    for seed in range(50):
+        samples = _random_samples(seed, 400)
+        timestamps = [sample[0] for sample in samples]
+        powers = [sample[1] for sample in samples]
+        energies = [sample[2] for sample in samples]
+        streaming, replayed = (
+            CycleStateMachine(50, 5, 120, 300, alert_duration=3600, unplugged_timeout=300)
+            for _ in range(2)
+        )
+
+        expected = []
+        for now, power, energy in samples:
+            event = streaming.update(power, energy, now)
+            if event is not None:
+                expected.append((now, event))
+
+        # Rejeu en deux lots, l'état étant sauvegardé entre les deux
+        half = len(samples) // 2
+        events = replayed.replay(timestamps[:half], powers[:half], energies[:half])
+        restored = CycleStateMachine(50, 5, 120, 300, alert_duration=3600, unplugged_timeout=300)
+        restored.restore(json.loads(json.dumps(replayed.snapshot())))
+        events += restored.replay(timestamps[half:], powers[half:], energies[half:])
+
+        assert [(now, event) for now, event, _cycle in events] == expected
+        assert restored.snapshot() == streaming.snapshot()
+        finished = [cycle for _now, event, cycle in events if event == EVENT_CYCLE_FINISHED]
+        if finished:
+            assert finished[-1] == streaming.last_cycle
@@ -0,0 +1,126 @@
+"""Tests pour l'API websocket de l'historique des cycles."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.components import websocket_api
+
+from custom_components.smart_appliance_monitor.const import DOMAIN
+from custom_components.smart_appliance_monitor.coordinator import (
+    SmartApplianceCoordinator,
+)
+from custom_components.smart_appliance_monitor.cycle_store import CycleStore
+from custom_components.smart_appliance_monitor.websocket_api import (
+    WS_TYPE_CYCLE_HISTORY,
+    websocket_cycle_history,
+)
+
+ENTITY_ID = "sensor.four_state"
+PERIOD_START = datetime(2025, 1, 1, 12, 0)
+
+
+def _cycle(start: datetime, duration: float, energy: float) -> dict:
+    """Crée un cycle terminé au format de l'événement cycle_finished."""
+    return {
+        "appliance_name": "Four",
+        "appliance_type": "oven",
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(minutes=duration)).isoformat(),
+        "duration": duration,
+        "energy": energy,
+        "cost": round(energy * 0.25, 2),
+        "peak_power": 2000.0,
+    }
+
+
+def _message(msg_id: int, **fields) -> dict:
+    """Crée un message validé par le schéma de la commande."""
+    return {
+        "id": msg_id,
+        "type": WS_TYPE_CYCLE_HISTORY,
+        "entity_id": ENTITY_ID,
+        "period_start": PERIOD_START.isoformat(),
+        "period_end": (PERIOD_START + timedelta(days=30)).isoformat(),
+        "order": "desc",
+        "page_size": 5,
+        **fields,
+    }
+
+
+async def _send(hass, msg: dict) -> MagicMock:
+    """Exécute la commande et retourne la connexion simulée."""
+    connection = MagicMock()
+    await websocket_cycle_history.__wrapped__(hass, connection, msg)
+    return connection
+
+
+@pytest.fixture
+def coordinator(mock_hass, mock_config_entry, tmp_path):
+    """Fixture pour un appareil avec une base de cycles temporaire."""
+    mock_hass.async_add_executor_job = AsyncMock(
+        side_effect=lambda func, *args: func(*args)
+    )
+    store = CycleStore(mock_hass, str(tmp_path / "cycles.db"))
+    store._setup()
+    coordinator = SmartApplianceCoordinator(mock_hass, mock_config_entry)
+    mock_hass.data = {
+        DOMAIN: {"cycle_store": store, mock_config_entry.entry_id: coordinator}
+    }
+    with patch(
+        "custom_components.smart_appliance_monitor._get_coordinator_from_entity_id",
+        side_effect=lambda hass, entity_id: (
+            coordinator if entity_id == ENTITY_ID else None
+        ),
+    ):
+        yield coordinator
+    store._close()
+
+
+@pytest.mark.asyncio
+async def test_cycle_history_pages(mock_hass, coordinator):
+    """Test que les pages suivent le curseur jusqu'au dernier cycle."""
+    store = mock_hass.data[DOMAIN]["cycle_store"]
+    await store.async_add_cycles(
+        coordinator.entry.entry_id,
+        [_cycle(PERIOD_START + timedelta(days=day), 60, 1.0) for day in range(12)],
+    )
+
+    pages = []
+    cursor = None
+    while True:
+        fields = {"cursor": cursor} if cursor else {}
+        connection = await _send(mock_hass, _message(len(pages) + 1, **fields))
+        connection.send_error.assert_not_called()
+        msg_id, result = connection.send_result.call_args[0]
+        assert msg_id == len(pages) + 1
+        pages.append(result["cycles"])
+        cursor = result["next_cursor"]
+        if cursor is None:
+            break
+
+    assert [len(page) for page in pages] == [5, 5, 2]
+    timestamps = [cycle["timestamp"] for page in pages for cycle in page]
+    assert timestamps == sorted(timestamps, reverse=True)
+    assert len(set(timestamps)) == 12
+
+
+@pytest.mark.asyncio
+async def test_cycle_history_unknown_entity(mock_hass, coordinator):
+    """Test qu'une entité inconnue renvoie une erreur not_found."""
+    connection = await _send(mock_hass, _message(1, entity_id="sensor.inconnu"))
+
+    connection.send_result.assert_not_called()
+    msg_id, code, _ = connection.send_error.call_args[0]
+    assert msg_id == 1
+    assert code == websocket_api.ERR_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_cycle_history_invalid_cursor(mock_hass, coordinator):
+    """Test qu'un curseur invalide est refusé sans résultat."""
+    connection = await _send(mock_hass, _message(1, cursor="pas-un-curseur"))
+
+    connection.send_result.assert_not_called()
+    assert connection.send_error.call_args[0][1] == "invalid_cursor"